@@ -1,22 +1,73 @@
+import io
+import os
+from datetime import timedelta
+from functools import partial
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from pyproj import Transformer
-import glob
-import os
+from matplotlib.colors import ListedColormap
+
+from sbes.basemap import (
+    COASTLINE_ENV,
+    MAP_MODES,
+    bin_soundings,
+    dilate_cells,
+    find_coastline_source,
+    map_extent,
+    plot_sounding_map,
+    raster_shape,
+)
+from sbes.cache import StageCache, content_hash
+from sbes.crossline import IHO_ORDERS, crossline_qc
+from sbes.export import EXPORT_FORMATS, available_formats, item_bytes, plan_export, zip_file
+from sbes.grid import GRID_FORMATS, GRID_METHODS
+from sbes.instrument import StageProbe, start_profile, stop_profile
+from sbes.jobs import CANCELLED, DONE, FAILED, JobManager
+from sbes.ingest import detect_bati_format, detect_pasut_formats, load_bati, load_pasut, stream_bati
+from sbes.lines import LINE_DEFAULTS, line_stats, survey_lines
+from sbes.lod import LOD_METHODS, downsample_indices
+from sbes.outliers import OUTLIER_METHODS, detect_outliers
+from sbes.parsecache import ParseCache
+from sbes.tide import TIDE_DATUM_METHODS, analyze_pasut
+from sbes.thinning import THIN_METHODS
+from sbes.tidecorr import BLEND_METHODS, FLAG_OK, TIDE_FLAGS, TideStation, load_tide_zones
+from sbes.store import BASE_COLUMNS, ProjectStore
+from sbes.survey import count_rows, head_rows, memory_report, process_rss_mb, release_free_memory, select_rows
+from sbes.pipeline import (
+    DATUM_COLUMNS,
+    FORMAT_OPTIONS_BATI,
+    FORMAT_OPTIONS_PASUT_DATE,
+    FORMAT_OPTIONS_PASUT_TIME,
+    export_grid,
+    koreksi_pasut,
+    koreksi_pasut_store,
+    lonlat_to_utm_per_point,
+    utm_store,
+)
 
 # --- Inisialisasi Session State ---
 if 'cleaned_bati_data' not in st.session_state:
     st.session_state['cleaned_bati_data'] = None
 if 'bati_clean' not in st.session_state:
     st.session_state['bati_clean'] = None
+if 'bati_mask' not in st.session_state:
+    st.session_state['bati_mask'] = None # Mask baris yang dipertahankan setelah outlier (None = semua baris)
 if 'data_pasut' not in st.session_state:
     st.session_state['data_pasut'] = None
 if 'datum_pasut' not in st.session_state: # Menyimpan (HWS, MSL, LWS) dari input manual
     st.session_state['datum_pasut'] = None
 if 'final_data' not in st.session_state:
     st.session_state['final_data'] = None
+if 'final_mask' not in st.session_state:
+    st.session_state['final_mask'] = None
+if 'grid_files' not in st.session_state:
+    st.session_state['grid_files'] = None # (kunci hash, file grid DEM) hasil tombol "Buat grid"
+if 'lajur' not in st.session_state:
+    st.session_state['lajur'] = None # (kunci hash, ID lajur per baris data batimetri) jika segmentasi lajur aktif
+if 'crossline_qc' not in st.session_state:
+    st.session_state['crossline_qc'] = None # (kunci hash, hasil QC crossline)
 if 'outlier_action' not in st.session_state:
     st.session_state['outlier_action'] = None  # 'remove', 'keep', atau 'none'
 if 'date_format' not in st.session_state:
@@ -25,6 +76,206 @@ if 'date_format_pasut' not in st.session_state:
     st.session_state['date_format_pasut'] = None # Menyimpan format tanggal pasut
 if 'time_format_pasut' not in st.session_state:
     st.session_state['time_format_pasut'] = None # Menyimpan format waktu pasut
+if 'stage_cache' not in st.session_state:
+    st.session_state['stage_cache'] = StageCache() # Cache hasil tiap tahap (LRU, berdasarkan hash input)
+if 'stage_keys' not in st.session_state:
+    st.session_state['stage_keys'] = {} # Kunci hash hasil tahap yang sedang aktif
+if 'stage_probe' not in st.session_state:
+    st.session_state['stage_probe'] = StageProbe() # Waktu, baris dan puncak memori per tahap
+if 'proyek' not in st.session_state:
+    st.session_state['proyek'] = None # Direktori proyek persisten data aktif (None = tanpa proyek)
+if 'job_proses' not in st.session_state:
+    st.session_state['job_proses'] = None # Id job latar belakang tombol "Proses Data" yang sedang dipantau
+if 'hasil_latar' not in st.session_state:
+    st.session_state['hasil_latar'] = {} # Tahap -> (kunci, hasil) terakhir dari job latar belakang
+if 'job_dibatalkan' not in st.session_state:
+    st.session_state['job_dibatalkan'] = set() # (tahap, kunci) yang dibatalkan pengguna (tidak dijalankan ulang otomatis)
+if 'profil_ingest' not in st.session_state:
+    st.session_state['profil_ingest'] = None # (file .prof, ringkasan) cProfile tombol "Proses Data"
+
+stage_cache = st.session_state['stage_cache']
+probe = st.session_state['stage_probe']
+
+
+@st.cache_resource
+def job_manager():
+    """ Thread pool job latar belakang, dipakai bersama semua sesi (``SBES_JOB_WORKERS``, default jumlah CPU) """
+    return JobManager(max_workers=int(os.environ.get("SBES_JOB_WORKERS", 0)) or None)
+
+
+@st.cache_resource
+def parse_cache():
+    """ Cache parse file batimetri di disk, dipakai bersama semua sesi (``SBES_PARSE_CACHE``; kosong = nonaktif) """
+    path = os.environ.get("SBES_PARSE_CACHE", os.path.join("cache", "parse"))
+    if not path:
+        return None
+    return ParseCache(path, int(os.environ.get("SBES_PARSE_CACHE_MB", 4096)) * 1024 * 1024)
+
+
+jobs = job_manager()
+cache_parse = parse_cache()
+
+# Halaman dimuat ulang saat job "Proses Data" berjalan: sambungkan kembali lewat id di URL
+if st.session_state['job_proses'] is None and jobs.get(st.query_params.get("job")) is not None:
+    st.session_state['job_proses'] = st.query_params["job"]
+
+
+def hitung_tahap(stage, key, compute, rows_in=None):
+    """ Ambil hasil tahap dari cache, atau hitung sambil diukur (waktu, baris masuk/keluar, puncak memori) """
+    return stage_cache.get_or_compute(stage, key, lambda: probe.measure(stage, compute, rows_in))
+
+
+@st.fragment(run_every=1.0)
+def pantau_job(job_id, label):
+    """ Progress job latar belakang (diperbarui tiap detik); seluruh skrip dijalankan ulang saat job selesai """
+    job = jobs.get(job_id)
+    if job is None or not job.running:
+        st.rerun()
+    teks = f"{label}: {job.status} ({job.elapsed:.0f} s)" + (f" - {job.text}" if job.text else "")
+    st.progress(job.fraction or 0.0, text=teks)
+    if st.button("Batalkan", key=f"batal_{job_id}"):
+        jobs.cancel(job_id)
+
+
+def hitung_latar(stage, key, compute, rows_in=None, label=None):
+    """
+    Seperti ``hitung_tahap``, tetapi jika hasil belum ada di cache dihitung di job latar belakang.
+    ``compute(progress)`` melaporkan baris selesai lewat ``progress(selesai, total)`` dan berhenti di
+    laporan berikutnya jika job dibatalkan. Selama job berjalan progress ditampilkan dan sisa skrip
+    dihentikan; hasil disimpan di cache dan session state hanya jika job selesai tanpa dibatalkan.
+    """
+    hasil = st.session_state['hasil_latar'].get(stage)
+    if hasil is not None and hasil[0] == key:
+        return hasil[1]
+    value = stage_cache.get(stage, key)
+    if value is None:
+        if (stage, key) in st.session_state['job_dibatalkan']:
+            st.warning(f"{label or stage} dibatalkan.")
+            if st.button("Hitung ulang", key=f"ulang_{stage}"):
+                st.session_state['job_dibatalkan'].discard((stage, key))
+                st.rerun()
+            st.stop()
+        def hitung(job):
+            job.progress(0, rows_in, text=f"{rows_in:,} baris" if rows_in is not None else None)
+
+            def lapor(selesai, total):
+                job.progress(selesai, total, text=f"{selesai:,} / {total:,} baris")
+
+            # Tidak lewat ``hitung_tahap``: hasil job yang dibatalkan tidak boleh masuk cache tahap
+            return probe.measure(stage, lambda: compute(lapor), rows_in)
+        job = jobs.submit(stage, hitung, key=content_hash(probe.session, stage, key))
+        if job.running:
+            pantau_job(job.id, label or stage)
+            st.stop()
+        jobs.release(job.id)
+        if job.status == CANCELLED:
+            st.session_state['job_dibatalkan'].add((stage, key))
+            st.rerun()
+        if job.status != DONE:
+            raise RuntimeError(job.error)
+        value = job.result
+        stage_cache.put(stage, key, value)
+    st.session_state['hasil_latar'][stage] = (key, value)
+    return value
+
+
+def stage_key(name, data):
+    """ Kunci hash tahap yang tersimpan; jika belum ada (misal data diisi langsung) hitung dari isi data """
+    key = st.session_state['stage_keys'].get(name)
+    if key is None:
+        key = content_hash(data)
+        st.session_state['stage_keys'][name] = key
+    return key
+
+
+PLOT_DPI = 100
+
+
+def tampilkan_plot(stage, key, buat_plot):
+    """ Render plot sekali menjadi PNG dan simpan di cache; rerun hanya menampilkan ulang gambarnya """
+    def render():
+        fig = buat_plot()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", dpi=PLOT_DPI, bbox_inches="tight")
+        plt.close(fig)
+        return buf.getvalue()
+    st.image(hitung_tahap(stage, key, render))
+
+
+def plot_deret_waktu(ax, waktu, nilai, window=None, **kwargs):
+    """
+    Plot deret waktu dengan downsampling sesuai lebar gambar (level of detail).
+
+    Titik dipilih dari data resolusi penuh di dalam ``window`` (zoom) dengan metode pada
+    pengaturan plot, sehingga spike tetap terlihat walau jumlah titik dibatasi.
+    """
+    lebar_px = ax.figure.get_figwidth() * PLOT_DPI
+    idx = downsample_indices(waktu, nilai, lebar_px, method=LOD_METHODS[metode_lod], window=window)
+    ax.plot(np.asarray(waktu)[idx], np.asarray(nilai)[idx], **kwargs)
+    if window is not None:
+        ax.set_xlim(window)
+
+
+def jendela_waktu(label, waktu, key):
+    """ Slider rentang waktu untuk zoom plot; None jika seluruh data yang dipilih """
+    t_min = pd.Timestamp(waktu.min()).to_pydatetime()
+    t_max = pd.Timestamp(waktu.max()).to_pydatetime()
+    if t_min >= t_max:
+        return None
+    window = st.slider(label, min_value=t_min, max_value=t_max, value=(t_min, t_max),
+                       step=timedelta(minutes=1), format="DD/MM/YY HH:mm", key=key)
+    return None if window == (t_min, t_max) else window
+
+
+def deteksi_format(kunci_widget, files, opsi, deteksi):
+    """
+    Pilih otomatis opsi selectbox format dari sampel file, sekali untuk setiap file baru yang
+    di-upload (pilihan manual sesudahnya tidak ditimpa). Mengembalikan label hasil deteksi atau None.
+    """
+    tanda = f"deteksi_{kunci_widget}"
+    file_key = tuple((f.name, f.size) for f in files)
+    if st.session_state.get(tanda, (None,))[0] != file_key:
+        try:
+            fmt = deteksi()
+        except ValueError:
+            fmt = None
+        label = next((k for k, v in opsi.items() if v == fmt), None)
+        st.session_state[tanda] = (file_key, label)
+        if label is not None:
+            st.session_state[kunci_widget] = label
+    return st.session_state[tanda][1]
+
+
+def isi_datum_pasut(hws, msl, lws):
+    """ Callback tombol: isi input HWS/MSL/LWS (sebelum widget dibuat ulang) dan datum yang dipakai """
+    st.session_state['hws_input'] = round(hws, 3)
+    st.session_state['msl_input'] = round(msl, 3)
+    st.session_state['lws_input'] = round(lws, 3)
+    st.session_state['datum_pasut'] = (hws, msl, lws)
+
+
+# --- Pengaturan Plot ---
+with st.sidebar.expander("Pengaturan plot", expanded=False):
+    metode_lod = st.radio(
+        "Downsampling plot deret waktu:",
+        list(LOD_METHODS),
+        key="metode_lod",
+        help="Jumlah titik yang digambar dibatasi oleh lebar gambar; spike/outlier tetap terlihat."
+    )
+
+# --- Instrumentasi Tahapan (tabel hasil diisi di akhir skrip) ---
+panel_instrumentasi = st.sidebar.expander("Instrumentasi tahapan", expanded=False)
+with panel_instrumentasi:
+    tulis_log = st.checkbox(
+        "Tulis log JSON lines", key="log_instrumentasi",
+        help="Satu baris JSON per tahap yang dihitung (waktu, baris, puncak memori), untuk digabung antar sesi."
+    )
+    path_log = st.text_input(
+        "File log", value=os.environ.get("SBES_INSTRUMENT_LOG", "logs/instrumentasi.jsonl"),
+        key="path_log_instrumentasi", disabled=not tulis_log
+    )
+    profil_aktif = st.checkbox("Rekam profil cProfile saat tombol \"Proses Data\" diklik", key="profil_ingest_aktif")
+probe.log_path = path_log if tulis_log else None
 
 # --- Judul Aplikasi ---
 st.title("Aplikasi Pengolahan Data Batimetri SBES")
@@ -34,10 +285,10 @@ st.markdown("""
 Aplikasi ini digunakan untuk mengolah data batimetri dari Single Beam Echosounder.
 Langkah-langkahnya meliputi:
 1. Upload file data batimetri (folder `data_bati/*.txt`).
-2. Pilih format tanggal data batimetri.
+2. Pilih format tanggal data batimetri (dideteksi otomatis dari isi file, dapat diganti).
 3. Upload file data pasang surut (`pasut.txt`) - Kolom Tanggal dan Waktu Terpisah.
 4. Pilih format tanggal dan waktu data pasut.
-5. Input manual datum pasang surut (HWS, MSL, LWS).
+5. Input manual datum pasang surut (HWS, MSL, LWS), atau isi otomatis dari analisis harmonik setelah data pasut diproses.
 6. Proses pembersihan, deteksi outlier, dan koreksi pasang surut.
 7. Transformasi koordinat ke UTM.
 8. Download hasil akhir.
@@ -57,18 +308,15 @@ uploaded_files_bati = st.file_uploader(
 
 # --- Input Format Tanggal Batimetri (ditempatkan setelah upload file bati) ---
 # Pilihan format tanggal umum
-format_options_bati = {
-    "DD-Mon-YY (misal: 01-Jul-23)": "%d-%b-%y", # Format dari file contoh
-    "DD-MM-YY (misal: 01-07-23)": "%d-%m-%y",
-    "DD/MM/YY (misal: 01/07/23)": "%d/%m/%y",
-    "DD-MM-YYYY (misal: 01-07-2023)": "%d-%m-%Y",
-    "DD/MM/YYYY (misal: 01/07/2023)": "%d/%m/%Y",
-    "MM-DD-YY (misal: 07-01-23)": "%m-%d-%y",
-    "MM/DD/YY (misal: 07/01/23)": "%m/%d/%y",
-    "MM-DD-YYYY (misal: 07-01-2023)": "%m-%d-%Y",
-    "MM/DD/YYYY (misal: 07/01-2023)": "%m/%d/%Y",
-    # Tambahkan opsi lain jika diperlukan
-}
+format_options_bati = FORMAT_OPTIONS_BATI
+
+# Format dideteksi otomatis dari baris awal file pertama (tetap bisa diganti manual)
+label_terdeteksi_bati = None
+if uploaded_files_bati:
+    label_terdeteksi_bati = deteksi_format(
+        "date_format_selectbox_bati", uploaded_files_bati, format_options_bati,
+        lambda: detect_bati_format(uploaded_files_bati[:1])
+    )
 
 selected_format_label_bati = st.selectbox(
     "Pilih format tanggal data batimetri:",
@@ -81,7 +329,8 @@ selected_format_label_bati = st.selectbox(
 if selected_format_label_bati:
     selected_format_bati = format_options_bati[selected_format_label_bati]
     st.session_state['date_format'] = selected_format_bati
-    st.write(f"Format tanggal batimetri yang dipilih: `{selected_format_bati}`")
+    st.write(f"Format tanggal batimetri yang dipilih: `{selected_format_bati}`"
+             + (" (terdeteksi otomatis)" if selected_format_label_bati == label_terdeteksi_bati else ""))
 else:
     # Jika belum dipilih, gunakan default (format lama) atau tunda proses
     st.session_state['date_format'] = None # Atau beri nilai default jika diinginkan
@@ -96,22 +345,21 @@ uploaded_file_pasut = st.file_uploader(
 
 # --- Input Format Tanggal dan Waktu Pasut (ditempatkan setelah upload file pasut) ---
 # Pilihan format tanggal umum untuk pasut - SESUAI DENGAN DATA ANDA
-format_options_pasut_date = {
-    "DD/MM/YYYY (misal: 21/06/2023)": "%d/%m/%Y", # Format yang digunakan dalam data Anda
-    "YYYY-MM-DD (misal: 2023-06-21)": "%Y-%m-%d",
-    "DD-MM-YYYY (misal: 21-06-2023)": "%d-%m-%Y",
-    "DD-Mon-YYYY (misal: 21-Jun-2023)": "%d-%b-%Y",
-    # Tambahkan opsi lain jika diperlukan
-}
+format_options_pasut_date = FORMAT_OPTIONS_PASUT_DATE
 
 # Pilihan format waktu umum untuk pasut
-format_options_pasut_time = {
-    "HH:MM:SS (misal: 13:30:00)": "%H:%M:%S",
-    "HH:MM (misal: 13:30)": "%H:%M",
-    # Tambahkan opsi lain jika diperlukan
-}
+format_options_pasut_time = FORMAT_OPTIONS_PASUT_TIME
 
 if uploaded_file_pasut:
+    # Deteksi otomatis format tanggal dan waktu dari baris awal file pasut
+    label_terdeteksi_pasut_date = deteksi_format(
+        "date_format_selectbox_pasut_date", [uploaded_file_pasut], format_options_pasut_date,
+        lambda: detect_pasut_formats(uploaded_file_pasut)[0]
+    )
+    label_terdeteksi_pasut_time = deteksi_format(
+        "time_format_selectbox_pasut_time", [uploaded_file_pasut], format_options_pasut_time,
+        lambda: detect_pasut_formats(uploaded_file_pasut)[1]
+    )
     selected_format_label_pasut_date = st.selectbox(
         "Pilih format kolom Tanggal data pasut:",
         options=list(format_options_pasut_date.keys()),
@@ -129,8 +377,10 @@ if uploaded_file_pasut:
         selected_format_pasut_time = format_options_pasut_time[selected_format_label_pasut_time]
         st.session_state['date_format_pasut'] = selected_format_pasut_date
         st.session_state['time_format_pasut'] = selected_format_pasut_time
-        st.write(f"Format tanggal pasut yang dipilih: `{selected_format_pasut_date}`")
-        st.write(f"Format waktu pasut yang dipilih: `{selected_format_pasut_time}`")
+        st.write(f"Format tanggal pasut yang dipilih: `{selected_format_pasut_date}`"
+                 + (" (terdeteksi otomatis)" if selected_format_label_pasut_date == label_terdeteksi_pasut_date else ""))
+        st.write(f"Format waktu pasut yang dipilih: `{selected_format_pasut_time}`"
+                 + (" (terdeteksi otomatis)" if selected_format_label_pasut_time == label_terdeteksi_pasut_time else ""))
     else:
         st.session_state['date_format_pasut'] = None
         st.session_state['time_format_pasut'] = None
@@ -147,6 +397,23 @@ hws_input = st.number_input("Tinggi Muka Air (HWS) dalam meter (misal: 2.90)", k
 msl_input = st.number_input("Tinggi Muka Air Rata-rata (MSL) dalam meter (misal: 1.59)", key="msl_input", format="%.3f")
 lws_input = st.number_input("Rendah Muka Air (LWS) dalam meter (misal: 0.27)", key="lws_input", format="%.3f")
 
+# Mode streaming untuk file log yang sangat besar: dibaca per chunk dengan anggaran memori tetap
+use_streaming = st.checkbox("Mode hemat memori (baca file batimetri per chunk)", key="streaming_ingest")
+memory_budget_mb = st.number_input(
+    "Anggaran memori parsing (MB)", min_value=16, value=256, step=16,
+    key="memory_budget_mb", disabled=not use_streaming
+)
+
+# Proyek persisten: hari survei baru cukup ditambahkan, file yang sudah ada tidak diproses ulang
+mode_proyek = st.checkbox(
+    "Simpan ke proyek persisten (tambahkan hari survei baru ke data sebelumnya)", key="mode_proyek",
+    help="File yang sudah ada di proyek (isi sama) dilewati; koreksi pasut dan UTM hanya dihitung untuk ping baru."
+)
+path_proyek = st.text_input(
+    "Direktori proyek", value=os.environ.get("SBES_PROJECT_DIR", "proyek"),
+    key="path_proyek", disabled=not mode_proyek
+)
+
 # Tombol untuk memulai proses - tambahkan pengecekan format
 start_processing = st.button("Proses Data", disabled=not all([
     uploaded_files_bati,
@@ -159,103 +426,139 @@ start_processing = st.button("Proses Data", disabled=not all([
     st.session_state.get('time_format_pasut')
 ]))
 
-if start_processing:
-    try:
-        # --- Proses Data Batimetri ---
-        bati_list = []
-        for uploaded_file in uploaded_files_bati:
-            df_temp = pd.read_csv(uploaded_file, dtype=str, encoding='latin1', sep="\t", header=None)
-            bati_list.append(df_temp)
-        bati_compile = pd.concat(bati_list, ignore_index=True)
-
-        # Cleaning seperti di notebook
-        bati = bati_compile.copy()
-        # Gunakan format tanggal yang dipilih dari session state
-        format_tanggal_bati = st.session_state['date_format']
-        if not format_tanggal_bati:
-             st.error("Format tanggal batimetri belum dipilih.")
-             st.stop()
-        # Gabungkan kolom tanggal dan waktu
-        bati["timestamp"] = pd.to_datetime(bati[0] + " " + bati[1], format=f"{format_tanggal_bati} %H:%M:%S", errors='coerce')
-        bati = bati[["timestamp", 2, 3, 4]]
-        bati.columns = ["timestamp", "longitude", "latitude", "kedalaman"]
-
-        def clean_longitude(val):
-            if pd.isna(val): return None
-            s = str(val).strip().replace("°E", "")
-            try: return float(s)
-            except: return None
-
-        def clean_latitude(val):
-            if pd.isna(val): return None
-            s = str(val).strip().upper().replace("°", "")
-            if "S" in s: s = s.replace("S", ""); sign = -1
-            elif "N" in s: s = s.replace("N", ""); sign = 1
-            else: sign = 1
-            try: return float(s) * sign
-            except ValueError: return None
-
-        bati["longitude"] = bati["longitude"].apply(clean_longitude)
-        bati["latitude"] = bati["latitude"].apply(clean_latitude)
-        bati["kedalaman"] = pd.to_numeric(bati["kedalaman"], errors="coerce")
-        bati_drop = bati.dropna(subset=["kedalaman", "longitude", "latitude", "timestamp"]).reset_index(drop=True)
-        bati_drop = bati_drop.sort_values("timestamp").reset_index(drop=True)
-
-        st.session_state['cleaned_bati_data'] = bati_drop
-        st.success(f"Data batimetri berhasil diproses. Jumlah baris: {len(bati_drop)}")
-
-        # --- Proses Data Pasut (dengan kolom terpisah, tanpa header) ---
-        # Baca file tanpa header
-        data_pasut_raw = pd.read_csv(uploaded_file_pasut, dtype=str, sep="\t", encoding='latin1', header=None)
+def salin_upload(f):
+    """ Salinan file upload untuk job latar belakang (posisi baca tidak dibagi dengan skrip) """
+    salinan = io.BytesIO(f.getvalue())
+    salinan.name = f.name
+    return salinan
 
-        # Tampilkan preview data pasut (untuk membantu pengguna)
-        st.subheader("Preview Data Pasang Surut (sebelum pemrosesan):")
-        st.dataframe(data_pasut_raw.head())
 
-        # Ambil format dari session state
-        format_date_pasut = st.session_state['date_format_pasut']
-        format_time_pasut = st.session_state['time_format_pasut']
-
-        if not format_date_pasut or not format_time_pasut:
-             st.error("Format tanggal atau waktu pasut belum dipilih.")
-             st.stop()
-
-        # Gunakan indeks kolom secara eksplisit: [0] untuk Date, [1] untuk Time, [2] untuk Depth
-        date_col_index = 0
-        time_col_index = 1
-        depth_col_index = 2
-
-        # Gabungkan tanggal dan waktu
+if start_processing:
+    # Format dari session state
+    format_tanggal_bati = st.session_state['date_format']
+    format_date_pasut = st.session_state['date_format_pasut']
+    format_time_pasut = st.session_state['time_format_pasut']
+    if not format_tanggal_bati:
+         st.error("Format tanggal batimetri belum dipilih.")
+         st.stop()
+    if not format_date_pasut or not format_time_pasut:
+         st.error("Format tanggal atau waktu pasut belum dipilih.")
+         st.stop()
+
+    # Input dibekukan saat tombol diklik; job tidak membaca widget/session state
+    files_bati = [salin_upload(f) for f in uploaded_files_bati]
+    file_pasut = salin_upload(uploaded_file_pasut)
+    datum_input = (hws_input, msl_input, lws_input)
+    proyek_input = path_proyek if mode_proyek else None
+    budget_input = memory_budget_mb if use_streaming else None
+    profil_input = profil_aktif
+
+    # Kunci cache: isi file, format tanggal dan mode ingest (mode proyek: ditambah revisi isi proyek)
+    bati_key = content_hash(uploaded_files_bati, format_tanggal_bati, use_streaming, budget_input,
+                            ProjectStore(proyek_input).key if proyek_input else None)
+    pasut_key = content_hash(uploaded_file_pasut, format_date_pasut, format_time_pasut)
+
+    def proses_data(job):
+        """ Ingest batimetri + pasut (job latar belakang); progress per file batimetri selesai """
+        # Profil opsional (thread job; worker process pool tidak ikut terprofil)
+        profiler = start_profile() if profil_input else None
         try:
-            # Konversi ke string untuk memastikan operasi gabungan berhasil
-            combined_datetime_str = data_pasut_raw[date_col_index].astype(str) + " " + data_pasut_raw[time_col_index].astype(str)
-            # Ubah menjadi datetime
-            data_pasut_raw["Timestamp"] = pd.to_datetime(combined_datetime_str, format=f"{format_date_pasut} {format_time_pasut}", errors='coerce')
-            # Konversi depth ke numerik
-            data_pasut_raw["Depth"] = pd.to_numeric(data_pasut_raw[depth_col_index], errors="coerce")
-            # Buang baris dengan timestamp atau depth yang error
-            data_pasut = data_pasut_raw.dropna(subset=["Timestamp", "Depth"])[["Timestamp", "Depth"]].reset_index(drop=True)
-
-            # Periksa apakah ada data yang valid
-            if len(data_pasut) == 0:
-                st.error("Tidak ada data pasut yang valid setelah pembersihan. Pastikan format tanggal dan waktu sesuai dengan data.")
-                st.stop()
-
-            st.session_state['data_pasut'] = data_pasut
-            st.success(f"Data pasut berhasil diproses. Jumlah baris: {len(data_pasut)}")
-
-        except Exception as e:
-            st.error(f"Error saat menggabungkan tanggal dan waktu: {e}")
-            st.stop()
+            baris = 0
+
+            def update_progress(done, total, report):
+                nonlocal baris
+                baris += report["baris_valid"]
+                status = "gagal" if report["error"] else f"{report['baris_valid']:,} baris"
+                if report.get("dari_cache"):
+                    status += " dari cache"
+                job.progress(done, total, f"[{done}/{total}] {report['file']}: {status} (total {baris:,} baris)")
+
+            def ingest_bati():
+                if proyek_input:
+                    store = ProjectStore(proyek_input)
+                    report = store.add_files(files_bati, format_tanggal_bati, progress=update_progress,
+                                             memory_budget_mb=budget_input, parse_cache=cache_parse)
+                    if len(store) == 0:
+                        raise ValueError("Tidak ada file batimetri yang berhasil dibaca.")
+                    bati_proyek = store.frame(list(BASE_COLUMNS))
+                    bati_proyek.attrs["ingest_report"] = report
+                    return bati_proyek
+                if budget_input:
+                    return stream_bati(files_bati, format_tanggal_bati, memory_budget_mb=budget_input,
+                                       progress=update_progress, parse_cache=cache_parse)
+                return load_bati(files_bati, format_tanggal_bati, progress=update_progress, parse_cache=cache_parse)
+
+            bati_drop = hitung_tahap("ingest", bati_key, ingest_bati)
+            release_free_memory() # Kembalikan memori tabel string sementara ke OS
+            job.progress(len(files_bati), text=f"{len(files_bati)} file batimetri selesai dibaca; membaca file pasut...")
+
+            # Kolom [0] Date, [1] Time, [2] Depth (tanpa header); preview untuk membantu pengguna
+            data_pasut_raw = pd.read_csv(file_pasut, dtype=str, sep="\t", encoding='latin1', header=None, nrows=5)
+
+            def ingest_pasut():
+                file_pasut.seek(0)
+                return load_pasut(file_pasut, format_date_pasut, format_time_pasut)
+            data_pasut = hitung_tahap("pasut", pasut_key, ingest_pasut)
+            return {"bati": bati_drop, "bati_key": bati_key, "pasut": data_pasut, "pasut_key": pasut_key,
+                    "pasut_raw": data_pasut_raw, "datum": datum_input, "proyek": proyek_input}
+        finally:
+            if profiler is not None:
+                job.info["profil"] = stop_profile(profiler)
+
+    # Job per sesi; id disimpan di URL agar hasil tidak hilang saat halaman dimuat ulang
+    job = jobs.submit("proses_data", proses_data, key=content_hash(probe.session, bati_key, pasut_key),
+                      total=len(files_bati))
+    st.session_state['job_proses'] = job.id
+    st.query_params["job"] = job.id
+
+job_proses = jobs.get(st.session_state['job_proses']) if st.session_state['job_proses'] else None
+if job_proses is not None and job_proses.running:
+    pantau_job(job_proses.id, "Proses data")
+elif job_proses is not None:
+    # Job selesai: pindahkan hasilnya ke session state (sekali), lalu lepaskan dari manajer job
+    jobs.release(job_proses.id)
+    st.session_state['job_proses'] = None
+    st.query_params.pop("job", None)
+    if "profil" in job_proses.info:
+        st.session_state['profil_ingest'] = job_proses.info["profil"]
+    if job_proses.status == CANCELLED:
+        st.warning("Proses data dibatalkan.")
+    elif job_proses.status == FAILED:
+        st.error(f"Error saat membaca atau memproses file: {job_proses.error}")
+    else:
+        hasil = job_proses.result
+        bati_drop = hasil["bati"]
+        st.session_state['cleaned_bati_data'] = bati_drop
+        st.session_state['stage_keys'] = {'bati': hasil["bati_key"], 'pasut': hasil["pasut_key"]}
+        st.session_state['proyek'] = hasil["proyek"]
+        st.success(f"Data batimetri berhasil diproses. Jumlah baris: {len(bati_drop)} ({job_proses.elapsed:.1f} s)")
+
+        # Laporan per file: jumlah baris, koordinat yang ditolak, waktu proses dan error
+        ingest_report = pd.DataFrame(bati_drop.attrs.get("ingest_report", []))
+        failed_files = ingest_report[ingest_report["error"].notna()] if not ingest_report.empty else ingest_report
+        for _, row in failed_files.iterrows():
+            st.error(f"Gagal membaca {row['file']}: {row['error']}")
+        n_rejected = int(ingest_report[["lon_ditolak", "lat_ditolak"]].to_numpy().sum()) if not ingest_report.empty else 0
+        if n_rejected > 0:
+            st.warning(f"Terdapat {n_rejected} nilai koordinat yang tidak dapat dibaca dan dibuang.")
+        n_duplikat = int(ingest_report["duplikat"].sum()) if "duplikat" in ingest_report else 0
+        if n_duplikat > 0:
+            st.warning(f"Terdapat {n_duplikat} ping duplikat (timestamp dan posisi sama dengan file lain) yang dibuang.")
+        with st.expander("Laporan pembacaan per file", expanded=bool(len(failed_files)) or n_rejected > 0 or n_duplikat > 0):
+            st.dataframe(ingest_report)
+        if hasil["proyek"]:
+            with st.expander(f"Isi proyek {hasil['proyek']}: {len(bati_drop.attrs['files'])} file", expanded=False):
+                st.dataframe(ProjectStore(hasil["proyek"]).files)
+
+        # --- Data Pasut (dengan kolom terpisah, tanpa header) ---
+        st.subheader("Preview Data Pasang Surut (sebelum pemrosesan):")
+        st.dataframe(hasil["pasut_raw"])
+        st.session_state['data_pasut'] = hasil["pasut"]
+        st.success(f"Data pasut berhasil diproses. Jumlah baris: {len(hasil['pasut'])}")
 
         # --- Ambil Datum Pasut dari Input Manual ---
-        # Simpan input ke session state
-        st.session_state['datum_pasut'] = (hws_input, msl_input, lws_input)
-        st.success(f"Data datum berhasil disimpan dari input manual. HWS: {hws_input:.3f}, MSL: {msl_input:.3f}, LWS: {lws_input:.3f}")
-
-    except Exception as e:
-        st.error(f"Error saat membaca atau memproses file: {e}")
-        st.stop()
+        hws, msl, lws = st.session_state['datum_pasut'] = hasil["datum"]
+        st.success(f"Data datum berhasil disimpan dari input manual. HWS: {hws:.3f}, MSL: {msl:.3f}, LWS: {lws:.3f}")
 
 # --- Tampilkan Hasil Upload dan Input Datum ---
 if st.session_state.get('cleaned_bati_data') is not None or st.session_state.get('data_pasut') is not None or st.session_state.get('datum_pasut') is not None:
@@ -277,38 +580,80 @@ if st.session_state.get('cleaned_bati_data') is not None or st.session_state.get
             # Ambil data pasut dari session state
             data_pasut_plot = st.session_state['data_pasut']
 
-            # Buat plot
-            fig, ax = plt.subplots(figsize=(12, 5))
+            window_pasut = jendela_waktu("Jendela waktu grafik pasut (zoom):", data_pasut_plot["Timestamp"], "zoom_pasut")
+
+            def plot_pasut():
+                # Buat plot
+                fig, ax = plt.subplots(figsize=(12, 5))
 
-            # Plot garis
-            ax.plot(data_pasut_plot["Timestamp"], data_pasut_plot["Depth"], linewidth=1.5, color='blue')
+                # Plot garis (downsampling sesuai lebar gambar)
+                plot_deret_waktu(ax, data_pasut_plot["Timestamp"], data_pasut_plot["Depth"], window_pasut, linewidth=1.5, color='blue')
 
-            # Set judul
-            start_date = data_pasut_plot["Timestamp"].min().strftime("%d %b %Y")
-            end_date = data_pasut_plot["Timestamp"].max().strftime("%d %b %Y")
-            ax.set_title(f"Grafik Pasang Surut ({start_date} – {end_date})", fontsize=14, fontweight='bold')
+                # Set judul
+                start_date, end_date = window_pasut or (data_pasut_plot["Timestamp"].min(), data_pasut_plot["Timestamp"].max())
+                start_date = start_date.strftime("%d %b %Y")
+                end_date = end_date.strftime("%d %b %Y")
+                ax.set_title(f"Grafik Pasang Surut ({start_date} – {end_date})", fontsize=14, fontweight='bold')
 
-            # Set label sumbu
-            ax.set_xlabel("Waktu Pengamatan", fontsize=12)
-            ax.set_ylabel("Tinggi Muka Air (meter)", fontsize=12)
+                # Set label sumbu
+                ax.set_xlabel("Waktu Pengamatan", fontsize=12)
+                ax.set_ylabel("Tinggi Muka Air (meter)", fontsize=12)
 
-            # Tambahkan grid
-            ax.grid(True, linestyle='--', alpha=0.5)
+                # Tambahkan grid
+                ax.grid(True, linestyle='--', alpha=0.5)
 
-            # Atur rotasi label x-axis agar tidak tumpang tindih
-            plt.xticks(rotation=45, ha='right')
+                # Atur rotasi label x-axis agar tidak tumpang tindih
+                plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+                return fig
 
             # Tampilkan plot
-            st.pyplot(fig)
-            plt.clf() # Bersihkan plot agar tidak mengganggu plot berikutnya
+            tampilkan_plot("plot_pasut", content_hash(stage_key('pasut', data_pasut_plot), metode_lod, window_pasut), plot_pasut)
 
             st.success("Grafik pasang surut berhasil dibuat.")
 
         except Exception as e:
             st.error(f"Terjadi error saat membuat grafik pasang surut: {e}")
 
+        # --- Analisis Harmonik Pasut ---
+        st.subheader("Analisis Harmonik Pasut")
+        pasut_key = stage_key('pasut', data_pasut_plot)
+        try:
+            analisis = hitung_tahap("analisis_pasut", pasut_key, lambda: analyze_pasut(data_pasut_plot), len(data_pasut_plot))
+        except ValueError as e:
+            st.warning(str(e))
+            analisis = None
+
+        if analisis is not None:
+            metode_datum = TIDE_DATUM_METHODS[st.selectbox(
+                "Penentuan HWS/LWS dari konstanta harmonik:", list(TIDE_DATUM_METHODS), key="metode_datum_pasut",
+                help="MSL = Z0 hasil fit. Admiralty dan pasang purnama menjumlahkan amplitudo konstanta; "
+                     "prediksi memakai muka air maksimum/minimum prediksi selama satu tahun."
+            )]
+            HWS_h, MSL_h, LWS_h = analisis.datums(metode_datum)
+            col_hws, col_msl, col_lws, col_rms = st.columns(4)
+            col_hws.metric("HWS", f"{HWS_h:.3f} m")
+            col_msl.metric("MSL", f"{MSL_h:.3f} m")
+            col_lws.metric("LWS", f"{LWS_h:.3f} m")
+            col_rms.metric("RMS residual", f"{analisis.rms:.3f} m")
+            st.dataframe(analisis.constituents.round(4))
+
+            def plot_residual():
+                fig, ax = plt.subplots(figsize=(12, 3))
+                plot_deret_waktu(ax, analisis.timestamps, analisis.residual, window_pasut, linewidth=0.8, color='red')
+                ax.axhline(0.0, color='black', linewidth=0.5)
+                ax.set_title("Residual (observasi - prediksi harmonik)")
+                ax.set_ylabel("Residual (meter)")
+                ax.grid(True, linestyle='--', alpha=0.5)
+                plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+                return fig
+
+            tampilkan_plot("plot_residual_pasut", content_hash(pasut_key, metode_lod, window_pasut), plot_residual)
+
+            st.button("Isi input HWS/MSL/LWS dari analisis harmonik", key="isi_datum_pasut",
+                      on_click=isi_datum_pasut, args=(HWS_h, MSL_h, LWS_h))
+
     if st.session_state.get('datum_pasut') is not None:
-        st.subheader("Datum Pasang Surut (Input Manual)")
+        st.subheader("Datum Pasang Surut")
         HWS, MSL, LWS = st.session_state['datum_pasut']
         st.write(f"**HWS:** {HWS:.3f} m")
         st.write(f"**MSL:** {MSL:.3f} m")
@@ -320,34 +665,107 @@ st.header("2. Deteksi dan Penanganan Outlier")
 
 if st.session_state['cleaned_bati_data'] is not None:
     bati_drop = st.session_state['cleaned_bati_data']
+    bati_key = stage_key('bati', bati_drop)
+
+    window_kedalaman = jendela_waktu("Jendela waktu plot kedalaman (zoom):", bati_drop["timestamp"], "zoom_kedalaman")
+
+    def plot_kedalaman(data, mask=None):
+        fig, ax = plt.subplots()
+        waktu, kedalaman = data["timestamp"].to_numpy(), data["kedalaman"].to_numpy()
+        if mask is not None:
+            waktu, kedalaman = waktu[mask], kedalaman[mask]
+        plot_deret_waktu(ax, waktu, kedalaman, window_kedalaman, color='black', linewidth=0.8)
+        ax.set_xlabel('Date')
+        ax.set_ylabel('Depth [m]')
+        ax.grid(True)
+        return fig
 
     # Plot sebelum deteksi outlier
     st.subheader("Data Sebelum Penanganan Outlier:")
-    fig, ax = plt.subplots()
-    ax.plot(bati_drop["timestamp"], bati_drop["kedalaman"], color='black', linewidth=0.8)
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Depth [m]')
-    ax.grid(True)
-    st.pyplot(fig)
-    plt.clf()
-
-    # Hitung IQR dan batas
-    Q1 = bati_drop['kedalaman'].quantile(0.25)
-    Q3 = bati_drop['kedalaman'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-
-    # Temukan outlier
-    outliers = bati_drop[(bati_drop['kedalaman'] < lower_bound) | (bati_drop['kedalaman'] > upper_bound)]
-    num_outliers = len(outliers)
-
-    st.write(f"**Jumlah outlier yang terdeteksi (berdasarkan IQR):** {num_outliers}")
+    tampilkan_plot("plot_outlier", content_hash(bati_key, metode_lod, window_kedalaman), lambda: plot_kedalaman(bati_drop))
+
+    # Segmentasi lajur survei (opsional): outlier dideteksi per lajur, statistik dan export per lajur
+    st.subheader("Segmentasi Lajur Survei")
+    pakai_lajur = st.checkbox(
+        "Pisahkan track menjadi lajur survei", key="segmentasi_lajur",
+        help="Lajur diputus pada jeda waktu, belokan dan kecepatan di luar rentang. Outlier dideteksi "
+             "per lajur (paralel) dan file XYZ dapat diunduh per lajur."
+    )
+    lajur_key, line_id = None, None
+    if pakai_lajur:
+        col_l1, col_l2, col_l3, col_l4, col_l5 = st.columns(5)
+        with col_l1:
+            jeda_lajur = st.number_input("Jeda (detik)", min_value=1.0, value=LINE_DEFAULTS["max_gap_s"], step=5.0, key="jeda_lajur")
+        with col_l2:
+            belok_lajur = st.number_input("Belokan (derajat)", min_value=5.0, value=LINE_DEFAULTS["max_turn_deg"], step=5.0, key="belok_lajur")
+        with col_l3:
+            min_ping_lajur = st.number_input("Ping minimum", min_value=2, value=LINE_DEFAULTS["min_pings"], step=10, key="min_ping_lajur")
+        with col_l4:
+            v_min_lajur = st.number_input("Kecepatan min. (m/s)", min_value=0.0, value=LINE_DEFAULTS["min_speed"], step=0.1, key="v_min_lajur")
+        with col_l5:
+            v_maks_lajur = st.number_input("Kecepatan maks. (m/s)", min_value=0.5, value=LINE_DEFAULTS["max_speed"], step=1.0, key="v_maks_lajur")
+        line_params = {"max_gap_s": float(jeda_lajur), "max_turn_deg": float(belok_lajur), "min_pings": int(min_ping_lajur),
+                       "min_speed": float(v_min_lajur), "max_speed": float(v_maks_lajur)}
+        lajur_key = content_hash(bati_key, line_params)
+        line_id = hitung_tahap("lajur", lajur_key, lambda: survey_lines(bati_drop, **line_params), len(bati_drop))
+        statistik_lajur = hitung_tahap("lajur_statistik", lajur_key, lambda: line_stats(bati_drop, line_id))
+        di_luar = int((line_id < 0).sum())
+        st.write(f"**Jumlah lajur:** {len(statistik_lajur)} — **ping di luar lajur (belokan/segmen pendek):** {di_luar}")
+        st.dataframe(statistik_lajur, hide_index=True)
+    st.session_state['lajur'] = (lajur_key, line_id) if pakai_lajur else None
+
+    # Pilih metode deteksi outlier
+    st.subheader("Metode Deteksi Outlier")
+    metode_outlier = OUTLIER_METHODS[st.radio(
+        "Metode deteksi outlier:", list(OUTLIER_METHODS), key="metode_outlier", horizontal=True,
+        help="IQR memakai batas global seluruh survei; median/MAD bergulir menilai spike terhadap "
+             "kedalaman lokal di sepanjang lintasan (per file)."
+    )]
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        satuan_jendela = st.selectbox("Satuan jendela", ["ping", "detik"], key="satuan_jendela")
+    with col_b:
+        lebar_jendela = st.number_input(
+            f"Lebar jendela ({satuan_jendela})", min_value=3, value=51 if satuan_jendela == "ping" else 30,
+            step=2, key=f"lebar_jendela_{satuan_jendela}"
+        )
+    with col_c:
+        k_mad = st.number_input("Ambang (x MAD)", min_value=1.0, value=3.5, step=0.5, key="k_mad")
+    rolling_params = {"k": float(k_mad)}
+    if satuan_jendela == "ping":
+        rolling_params["window"] = int(lebar_jendela)
+    else:
+        rolling_params["window_seconds"] = float(lebar_jendela)
+
+    # Mask outlier per metode (di-cache berdasarkan data dan parameter)
+    def deteksi_outlier(method, params):
+        if line_id is not None:
+            params = {**params, "workers": None} if method == "rolling" else params
+        mask = detect_outliers(bati_drop, method, lines=line_id, **params)
+        return mask, int(mask.sum())
+
+    hasil_outlier = {
+        "iqr": hitung_tahap("outlier_iqr", content_hash(bati_key, lajur_key), lambda: deteksi_outlier("iqr", {}), len(bati_drop)),
+        "rolling": hitung_tahap(
+            "outlier_rolling", content_hash(bati_key, rolling_params, lajur_key),
+            lambda: deteksi_outlier("rolling", rolling_params), len(bati_drop)
+        ),
+    }
+    metode_key = content_hash(metode_outlier, rolling_params if metode_outlier == "rolling" else None, lajur_key)
+    outlier_mask, num_outliers = hasil_outlier[metode_outlier]
+
+    st.write("**Jumlah outlier per metode:**")
+    st.table(pd.DataFrame({
+        "Metode": list(OUTLIER_METHODS),
+        "Jumlah outlier": [hasil_outlier[m][1] for m in OUTLIER_METHODS.values()],
+    }).set_index("Metode"))
+    label_metode = next(label for label, m in OUTLIER_METHODS.items() if m == metode_outlier)
+    st.write(f"**Jumlah outlier yang terdeteksi (berdasarkan {label_metode}):** {num_outliers}")
 
     if num_outliers > 0:
         # Tampilkan data outlier jika ditemukan
         st.write("Contoh data outlier:")
-        st.dataframe(outliers[['timestamp', 'longitude', 'latitude', 'kedalaman']].head(10))
+        st.dataframe(head_rows(bati_drop, outlier_mask, 10)[['timestamp', 'longitude', 'latitude', 'kedalaman']])
 
         # --- DUA TOMBOL PILIHAN ---
         st.subheader("Apakah anda ingin menghapus data outlier?")
@@ -355,48 +773,55 @@ if st.session_state['cleaned_bati_data'] is not None:
 
         with col1:
             if st.button("✅ Ya, hapus semua data outlier", key="remove_outliers_btn_new"):
-                # Simpan keputusan dan hasilnya
-                bati_clean = bati_drop[(bati_drop['kedalaman'] >= lower_bound) & (bati_drop['kedalaman'] <= upper_bound)].copy()
-                st.session_state['bati_clean'] = bati_clean
+                # Simpan keputusan sebagai mask baris (data asli tidak disalin)
+                bati_mask = hitung_tahap(
+                    "outlier_remove", content_hash(bati_key, metode_key), lambda: ~outlier_mask
+                )
+                st.session_state['bati_clean'] = bati_drop
+                st.session_state['bati_mask'] = bati_mask
                 st.session_state['outlier_action'] = 'remove'
-                st.success(f"Outlier telah dihapus. Jumlah baris sekarang: {len(bati_clean)}")
+                st.session_state['stage_keys']['bati_clean'] = content_hash(bati_key, 'remove', metode_key)
+                st.success(f"Outlier telah dihapus. Jumlah baris sekarang: {count_rows(bati_drop, bati_mask)}")
 
         with col2:
             if st.button("❌ Tidak, lanjutkan dengan data outlier", key="keep_outliers_btn_new"):
-                # Simpan data asli
-                st.session_state['bati_clean'] = bati_drop.copy()
+                # Simpan data asli (tanpa salinan; data tidak diubah di tahap berikutnya)
+                st.session_state['bati_clean'] = bati_drop
+                st.session_state['bati_mask'] = None
                 st.session_state['outlier_action'] = 'keep'
+                st.session_state['stage_keys']['bati_clean'] = content_hash(bati_key, 'keep')
                 st.warning("Penghapusan outlier dibatalkan. Proses akan dilanjutkan dengan data termasuk outlier.")
 
     else:
         # Jika tidak ada outlier
-        st.info("Tidak ditemukan outlier berdasarkan metode IQR.")
+        st.info(f"Tidak ditemukan outlier berdasarkan metode {label_metode}.")
         # Langsung simpan data asli
-        st.session_state['bati_clean'] = bati_drop.copy()
+        st.session_state['bati_clean'] = bati_drop
+        st.session_state['bati_mask'] = None
         st.session_state['outlier_action'] = 'none' # Tidak ada aksi karena tidak ada outlier
+        st.session_state['stage_keys']['bati_clean'] = content_hash(bati_key, 'none')
         st.success("Tidak ada outlier ditemukan. Proses akan dilanjutkan.")
 
 # --- Tampilkan hasil penanganan outlier ---
 if st.session_state.get('bati_clean') is not None and st.session_state.get('outlier_action') is not None:
     st.header("Hasil Setelah Penanganan Outlier")
     bati_clean = st.session_state['bati_clean']
+    bati_mask = st.session_state['bati_mask']
     action = st.session_state['outlier_action']
+    jumlah_baris = count_rows(bati_clean, bati_mask)
 
     st.subheader("Plot Kedalaman Setelah Penanganan Outlier:")
-    fig, ax = plt.subplots()
-    ax.plot(bati_clean["timestamp"], bati_clean["kedalaman"], color='black', linewidth=0.8)
-    ax.set_xlabel('Date')
-    ax.set_ylabel('Depth [m]')
-    ax.grid(True)
-    st.pyplot(fig)
-    plt.clf()
+    tampilkan_plot(
+        "plot_outlier", content_hash(stage_key('bati_clean', bati_clean), metode_lod, window_kedalaman),
+        lambda: plot_kedalaman(bati_clean, bati_mask)
+    )
 
     if action == 'remove':
-        st.write(f"Outlier telah dihapus. Jumlah baris sekarang: {len(bati_clean)}")
+        st.write(f"Outlier telah dihapus. Jumlah baris sekarang: {jumlah_baris}")
     elif action == 'keep':
-        st.write(f"Data outlier dipertahankan. Jumlah baris: {len(bati_clean)}")
+        st.write(f"Data outlier dipertahankan. Jumlah baris: {jumlah_baris}")
     elif action == 'none':
-        st.write(f"Tidak ada outlier ditemukan. Jumlah baris: {len(bati_clean)}")
+        st.write(f"Tidak ada outlier ditemukan. Jumlah baris: {jumlah_baris}")
 
 
 # --- Tahap 3: Koreksi Pasut dan Transformasi UTM ---
@@ -404,23 +829,89 @@ st.header("3. Koreksi Pasang Surut dan Transformasi UTM")
 
 if all(v is not None for v in [st.session_state['bati_clean'], st.session_state['data_pasut'], st.session_state['datum_pasut']]):
     bati_clean = st.session_state['bati_clean']
+    bati_mask = st.session_state['bati_mask']
     data_pasut_koreksi = st.session_state['data_pasut']
+    proyek = st.session_state['proyek']
     HWS, MSL, LWS = st.session_state['datum_pasut'] # Ambil dari input manual
 
+    # --- Pengaturan koreksi pasut: jeda rekaman dan multi-stasiun ---
+    with st.expander("Pengaturan koreksi pasut (jeda rekaman, multi-stasiun)", expanded=False):
+        jeda_pasut = st.number_input(
+            "Jeda rekaman pasut maksimum (menit, 0 = otomatis 3 x interval sampling)",
+            min_value=0.0, value=0.0, step=5.0, key="jeda_pasut",
+            help="Ping di jeda yang lebih panjang atau di luar rentang rekaman pasut tidak dikoreksi dan dibuang."
+        )
+        max_gap_s = jeda_pasut * 60.0 if jeda_pasut > 0 else None
+        stasiun_pasut, blend, kunci_stasiun = None, {}, None
+        if st.checkbox("Gabungkan beberapa stasiun pasut", key="multi_stasiun"):
+            files_stasiun = st.file_uploader(
+                "File stasiun pasut tambahan (format sama dengan file pasut utama)",
+                type=["txt"], accept_multiple_files=True, key="stasiun_tambahan"
+            )
+            metode_blend = BLEND_METHODS[st.radio("Penggabungan stasiun:", list(BLEND_METHODS), key="metode_blend", horizontal=True)]
+            file_zona = None
+            if metode_blend == "zona":
+                file_zona = st.file_uploader(
+                    "Zona pasut (GeoJSON, properti: stasiun, beda_waktu [menit], rasio)",
+                    type=["geojson", "json"], key="zona_pasut"
+                )
+            st.caption("Posisi stasiun (derajat). Datum stasiun tambahan diturunkan dari analisis harmonik; "
+                       "nama stasiun = nama file tanpa ekstensi.")
+            format_date_pasut = st.session_state.get('date_format_pasut')
+            format_time_pasut = st.session_state.get('time_format_pasut')
+            nama_utama = os.path.splitext(uploaded_file_pasut.name)[0] if uploaded_file_pasut else "pasut"
+            daftar = [(nama_utama, data_pasut_koreksi, (HWS, MSL, LWS), stage_key('pasut', data_pasut_koreksi))]
+            for f in files_stasiun or []:
+                def baca_stasiun(f=f):
+                    f.seek(0)
+                    return load_pasut(f, format_date_pasut, format_time_pasut)
+                key_f = content_hash(f, format_date_pasut, format_time_pasut)
+                daftar.append((os.path.splitext(f.name)[0], hitung_tahap("pasut", key_f, baca_stasiun), None, key_f))
+            stasiun_pasut, kunci_stasiun = [], []
+            for i, (nama, data_st, datum_st, key_st) in enumerate(daftar):
+                col_lon, col_lat = st.columns(2)
+                lon_st = col_lon.number_input(f"Longitude {nama}", value=0.0, format="%.6f", key=f"lon_stasiun_{i}")
+                lat_st = col_lat.number_input(f"Latitude {nama}", value=0.0, format="%.6f", key=f"lat_stasiun_{i}")
+                stasiun_pasut.append(TideStation.from_frame(nama, data_st, lon_st, lat_st, datum_st))
+                kunci_stasiun.append((nama, key_st, lon_st, lat_st))
+            blend = {"method": metode_blend, "datum_method": TIDE_DATUM_METHODS[st.session_state.get('metode_datum_pasut', list(TIDE_DATUM_METHODS)[0])]}
+            if file_zona is not None:
+                file_zona.seek(0)
+                blend["zones"] = load_tide_zones(file_zona)
+            kunci_stasiun.append((blend["datum_method"], file_zona))
+
+    # Koreksi dan UTM dihitung untuk semua baris; mask outlier diterapkan saat data dipakai,
+    # sehingga kunci cache tidak bergantung pada keputusan outlier
+    koreksi_key = content_hash(stage_key('bati', bati_clean), stage_key('pasut', data_pasut_koreksi), HWS, MSL, LWS,
+                               max_gap_s, kunci_stasiun, blend.get("method"))
+
+    def koreksi_proyek(progress):
+        # Mode proyek: hanya ping dari file yang belum terkoreksi yang dihitung, hasil dibaca dari proyek
+        store = ProjectStore(proyek)
+        koreksi_pasut_store(store, data_pasut_koreksi, HWS, MSL, LWS, stations=stasiun_pasut, max_gap_s=max_gap_s,
+                            progress=progress, **blend)
+        return store.frame()
+
     # --- Koreksi Pasut ---
     st.subheader("Melakukan Koreksi Pasang Surut...")
     try:
-        bati_koreksi = bati_clean.copy()
-        # Interpolasi nilai pasut ke waktu pengukuran batimetri
-        bati_koreksi["pasut_interp"] = np.interp(
-            bati_koreksi["timestamp"].astype(np.int64),
-            data_pasut_koreksi["Timestamp"].astype(np.int64),
-            data_pasut_koreksi["Depth"].values  # Gunakan .values untuk numpy array
+        # Interpolasi nilai pasut ke waktu pengukuran batimetri lalu koreksi untuk setiap datum
+        bati_koreksi = hitung_latar(
+            "koreksi_pasut", koreksi_key,
+            koreksi_proyek if proyek else
+            lambda progress: koreksi_pasut(bati_clean, data_pasut_koreksi, HWS, MSL, LWS, stations=stasiun_pasut,
+                                           max_gap_s=max_gap_s, progress=progress, **blend),
+            len(bati_clean), "Koreksi pasut"
         )
-        # Koreksi Pasang Surut untuk setiap Datum
-        bati_koreksi['D_LWS'] = -(bati_koreksi['kedalaman'] + (LWS - bati_koreksi["pasut_interp"]))
-        bati_koreksi['D_MSL'] = -(bati_koreksi['kedalaman'] + (MSL - bati_koreksi["pasut_interp"]))
-        bati_koreksi['D_HWS'] = -(bati_koreksi['kedalaman'] + (HWS - bati_koreksi["pasut_interp"]))
+
+        # Ping tanpa pasut valid (jeda / di luar rekaman) tidak dikoreksi: dikeluarkan lewat mask
+        pasut_flag = bati_koreksi["pasut_flag"].to_numpy()
+        jumlah_flag = np.bincount(pasut_flag, minlength=len(TIDE_FLAGS))
+        if jumlah_flag[1:].any():
+            pasut_valid = pasut_flag == FLAG_OK
+            bati_mask = pasut_valid if bati_mask is None else bati_mask & pasut_valid
+            rincian = ", ".join(f"{jumlah_flag[k]} {TIDE_FLAGS[k]}" for k in TIDE_FLAGS if k != FLAG_OK and jumlah_flag[k])
+            st.warning(f"Ping tanpa data pasut valid tidak dikoreksi dan dibuang: {rincian}.")
 
         st.success("Koreksi pasang surut berhasil.")
 
@@ -430,42 +921,38 @@ if all(v is not None for v in [st.session_state['bati_clean'], st.session_state[
 
     # --- Transformasi UTM ---
     st.subheader("Melakukan Transformasi Koordinat ke UTM...")
+    # Mode satu zona: lajur yang melintasi batas zona tetap dalam satu sistem koordinat
+    mode_zona = st.radio(
+        "Mode zona UTM:",
+        ("Otomatis per titik", "Satu zona (zona dengan titik terbanyak)"),
+        key="mode_zona_utm"
+    )
+    force_zone = "dominant" if mode_zona.startswith("Satu zona") else None
+    utm_key = content_hash(koreksi_key, force_zone)
+
+    def utm_proyek(progress):
+        store = ProjectStore(proyek)
+        utm_store(store, force_zone=force_zone, progress=progress)
+        return store.frame()
+
     try:
-        def lonlat_to_utm_per_point(df, lon_col="longitude", lat_col="latitude"):
-            """ Konversi koordinat(lon/lat) ke UTM dengan deteksi zona otomatis untuk setiap titik """
-            lon = df[lon_col].values
-            lat = df[lat_col].values
-            # 1. Hitung zona UTM tiap titik
-            utm_zones = np.floor((lon + 180) / 6).astype(int) + 1
-            # 2. Tentukan belahan bumi
-            hemispheres = np.where(lat >= 0, "N", "S")
-            # 3. Buat EPSG code per titik
-            epsg_codes = np.where(lat >= 0, 32600 + utm_zones, 32700 + utm_zones)
-            # 4. Siapkan kolom kosong untuk hasil UTM
-            x_utm = np.zeros(len(df))
-            y_utm = np.zeros(len(df))
-            # 5. Loop per zona unik agar efisien
-            for epsg in np.unique(epsg_codes):
-                mask = epsg_codes == epsg
-                transformer = Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
-                x_tmp, y_tmp = transformer.transform(lon[mask], lat[mask])
-                x_utm[mask] = x_tmp
-                y_utm[mask] = y_tmp
-            # 6. Gabungkan zona dan hemisphere jadi satu kolom, misal '49 S'
-            utm_zone_str = [f"{z}{h}" for z, h in zip(utm_zones, hemispheres)]
-            # 7. Tambahkan ke DataFrame
-            df["Zona_UTM"] = utm_zone_str
-            df["X_UTM"] = x_utm
-            df["Y_UTM"] = y_utm
-            # 8. Info ringkasan zona
-            unique_zones = sorted(df["Zona_UTM"].unique())
-            st.write(f"Ditemukan {len(unique_zones)} zona UTM: {', '.join(unique_zones)}")
-            return df
-
-        bati_koreksi_utm = lonlat_to_utm_per_point(bati_koreksi, lon_col="longitude", lat_col="latitude")
+        # Salinan dangkal: UTM hanya menambah kolom, kolom hasil koreksi tidak disalin
+        bati_koreksi_utm = hitung_latar(
+            "utm", utm_key,
+            utm_proyek if proyek else
+            lambda progress: lonlat_to_utm_per_point(bati_koreksi.copy(deep=False), lon_col="longitude", lat_col="latitude",
+                                                     force_zone=force_zone, progress=progress),
+            len(bati_koreksi), "Transformasi UTM"
+        )
+        # Info ringkasan zona
+        unique_zones = sorted(select_rows(bati_koreksi_utm["Zona_UTM"], bati_mask).unique())
+        st.write(f"Ditemukan {len(unique_zones)} zona UTM: {', '.join(unique_zones)}")
 
         # Simpan hasil akhir
         st.session_state['final_data'] = bati_koreksi_utm
+        st.session_state['final_mask'] = bati_mask
+        st.session_state['stage_keys']['final'] = content_hash(utm_key, stage_key('bati_clean', bati_clean))
+        release_free_memory()
         st.success("Transformasi UTM berhasil!")
 
     except Exception as e:
@@ -478,126 +965,240 @@ else:
 # --- Tampilkan Hasil Akhir (Koreksi dan Transformasi) ---
 if st.session_state.get('final_data') is not None:
     st.header("Hasil Akhir: Data Terkoreksi dan Tertransformasi")
-    final_df = st.session_state['final_data']
+    final_all = st.session_state['final_data']
+    final_mask = st.session_state['final_mask']
     st.write("Contoh data setelah koreksi dan transformasi:")
-    st.dataframe(final_df.head())
+    st.dataframe(head_rows(final_all, final_mask))
+
+    final_key = stage_key('final', final_all)
 
     # Plot lintasan (longitude vs latitude) - versi sederhana
     st.subheader("Sebaran Titik Pengukuran (Longitude vs Latitude)")
-    fig, ax = plt.subplots(figsize=(8,6))
-    ax.scatter(final_df['longitude'], final_df['latitude'])
-    ax.set_xlabel('Longitude')
-    ax.set_ylabel('Latitude')
-    ax.set_title('Sebaran Titik Pengukuran Batimetri')
-    ax.grid(True, linestyle='--', alpha=0.5)
-    ax.axis('equal')
-    st.pyplot(fig)
-    plt.clf()
-
-    # --- Plot dengan Cartopy (Sebaran Titik Pengukuran dengan Peta dan Garis Pantai) ---
-    st.subheader("Sebaran Titik Pengukuran dengan Peta (Menggunakan Cartopy)")
+    def plot_sebaran():
+        # Piksel yang berisi titik (binning O(n)), bukan satu marker per titik
+        final_df = select_rows(final_all[['longitude', 'latitude']], final_mask)
+        lon, lat = final_df['longitude'].to_numpy(), final_df['latitude'].to_numpy()
+        extent = map_extent(lon, lat, pad_fraction=0.02, min_pad=1e-4, step=1e-4)
+        jumlah = dilate_cells(bin_soundings(lon, lat, None, extent, raster_shape(extent, 800), statistic="count"))
+        fig, ax = plt.subplots(figsize=(8,6))
+        ax.imshow(np.where(np.isnan(jumlah), np.nan, 1.0), origin='lower', extent=list(extent),
+                  cmap=ListedColormap(['tab:blue']), interpolation='nearest')
+        ax.set_xlabel('Longitude')
+        ax.set_ylabel('Latitude')
+        ax.set_title('Sebaran Titik Pengukuran Batimetri')
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.axis('equal')
+        return fig
+    tampilkan_plot("plot_sebaran", final_key, plot_sebaran)
+
+    # --- Peta Sebaran Titik Pengukuran (offline, garis pantai lokal) ---
+    st.subheader("Sebaran Titik Pengukuran dengan Peta")
 
     try:
-        import cartopy.crs as ccrs
-        import cartopy.feature as cfeature
-        # Impor formatter dari cartopy.mpl.ticker, bukan dari ccrs
-        from cartopy.mpl.ticker import LongitudeFormatter, LatitudeFormatter
-
-        # Buat figure dan axis dengan proyeksi peta
-        fig = plt.figure(figsize=(10, 8))
-        ax = fig.add_subplot(1, 1, 1, projection=ccrs.PlateCarree())
-
-        # Tambahkan fitur peta dasar: daratan, laut, dan garis pantai
-        ax.add_feature(cfeature.LAND, color='lightgreen')
-        ax.add_feature(cfeature.OCEAN, color='lightblue')
-        ax.add_feature(cfeature.COASTLINE, linewidth=0.5, edgecolor='black') # Garis pantai tebal
-        ax.add_feature(cfeature.BORDERS, linestyle=':', linewidth=0.5)
-
-        # Plot titik-titik pengukuran
-        # Gunakan kedalaman sebagai warna (colorbar)
-        sc = ax.scatter(
-            final_df['longitude'],
-            final_df['latitude'],
-            c=-final_df['kedalaman'],  # Warna berdasarkan kedalaman (negatif untuk sesuai 'turbo_r')
-            cmap='turbo_r',           # Palet warna
-            s=8,                     # Ukuran titik
-            transform=ccrs.PlateCarree(), # Transformasi koordinat
-            edgecolors='none',       # Garis pinggir
-            linewidth=0.1
-        )
-
-        # Tambahkan colorbar
-        cbar = plt.colorbar(sc, ax=ax, shrink=0.7)
-        cbar.set_label('Kedalaman (m)')
-
-        # Set batas peta agar fokus pada area pengukuran
-        # Hitung batas otomatis dari data
-        min_lon = final_df['longitude'].min() - 0.2
-        max_lon = final_df['longitude'].max() + 0.2
-        min_lat = final_df['latitude'].min() - 0.2
-        max_lat = final_df['latitude'].max() + 0.2
-
-        ax.set_extent([min_lon, max_lon, min_lat, max_lat], crs=ccrs.PlateCarree())
-
-        # Tambahkan grid dan label
-        gl = ax.gridlines(draw_labels=True, linewidth=0.5, color='gray', alpha=0.5, linestyle='--')
-
-        # Atur formatter untuk label longitude dan latitude
-        gl.xformatter = LongitudeFormatter()
-        gl.yformatter = LatitudeFormatter()
-
-        # Atur ukuran font untuk label koordinat
-        gl.xlabel_style = {'size': 8}  # Ukuran font untuk label longitude
-        gl.ylabel_style = {'size': 8}  # Ukuran font untuk label latitude
-
-        # Matikan label di atas dan kanan jika ingin tampilan lebih bersih
-        gl.top_labels = False
-        gl.right_labels = False
-
-        # Atur ukuran font untuk judul plot
-        ax.set_title('Sebaran Titik Pengukuran Batimetri', fontsize=14, weight='bold')
-
-        # Tampilkan plot
-        st.pyplot(fig)
-        plt.clf()
-
-        st.success("Plot Cartopy berhasil dibuat.")
-
-    except ImportError:
-        st.warning("Library 'cartopy' belum terinstal. Plot peta tidak dapat ditampilkan.")
-        st.info("Untuk menampilkan plot peta, silakan instal cartopy dengan perintah: `pip install cartopy` atau `conda install -c conda-forge cartopy`")
+        mode_peta = st.radio("Warna peta:", list(MAP_MODES), key="mode_peta", horizontal=True)
+        sumber_pantai = find_coastline_source()
+
+        def plot_peta():
+            # Titik di-bin per piksel (bukan satu marker per titik); garis pantai dari file lokal
+            final_df = select_rows(final_all[['longitude', 'latitude', 'kedalaman']], final_mask)
+            return plot_sounding_map(
+                final_df['longitude'].to_numpy(),
+                final_df['latitude'].to_numpy(),
+                final_df['kedalaman'].to_numpy(),
+                mode=MAP_MODES[mode_peta],
+                source=sumber_pantai,
+                title='Sebaran Titik Pengukuran Batimetri'
+            )
+
+        tampilkan_plot("plot_peta", content_hash(final_key, mode_peta, sumber_pantai), plot_peta)
+
+        if sumber_pantai is None:
+            st.info(
+                "Garis pantai lokal tidak ditemukan, peta ditampilkan tanpa garis pantai. "
+                f"Letakkan file GeoJSON/shapefile garis pantai di folder `data/coastline/` "
+                f"atau atur variabel lingkungan `{COASTLINE_ENV}`."
+            )
+        else:
+            st.caption(f"Garis pantai: {sumber_pantai}")
+        st.success("Peta sebaran berhasil dibuat.")
 
     except Exception as e:
-        st.error(f"Terjadi error saat membuat plot Cartopy: {e}")
+        st.error(f"Terjadi error saat membuat peta sebaran: {e}")
+
+    # --- Statistik per lajur (baris data akhir sejajar dengan data batimetri tahap 2) ---
+    lajur_aktif = st.session_state['lajur']
+    if lajur_aktif is not None and len(lajur_aktif[1]) == len(final_all):
+        st.subheader("Statistik per Lajur Survei")
+        lajur_final = lajur_aktif[1] if final_mask is None else lajur_aktif[1][final_mask]
+        statistik_final = hitung_tahap(
+            "lajur_statistik", content_hash(final_key, lajur_aktif[0]),
+            lambda: line_stats(select_rows(final_all, final_mask), lajur_final), len(lajur_final)
+        )
+        st.dataframe(statistik_final, hide_index=True)
+        st.download_button(
+            label="📥 Download statistik per lajur (CSV)",
+            data=statistik_final.to_csv(index=False, float_format='%.3f'),
+            file_name="Lajur_statistik.csv",
+            mime="text/csv"
+        )
+
+    # --- QC Crossline: selisih kedalaman di perpotongan lajur ---
+    st.subheader("QC Crossline (Perpotongan Lajur)")
+    col_q1, col_q2, col_q3, col_q4 = st.columns(4)
+    with col_q1:
+        toleransi_qc = st.number_input("Toleransi jarak (m)", min_value=0.1, value=1.0, step=0.5, key="toleransi_qc")
+    with col_q2:
+        jeda_qc = st.number_input("Jeda pemisah lajur (detik)", min_value=1.0, value=30.0, step=5.0, key="jeda_qc")
+    with col_q3:
+        belok_qc = st.number_input("Belokan maks. (derajat)", min_value=5.0, value=30.0, step=5.0, key="belok_qc")
+    with col_q4:
+        orde_qc = st.selectbox("Orde IHO", list(IHO_ORDERS), index=1, key="orde_qc")
+    qc_params = {"tolerance": float(toleransi_qc), "max_gap_s": float(jeda_qc),
+                 "max_turn_deg": float(belok_qc), "order": orde_qc}
+    qc_key = content_hash(final_key, qc_params)
+
+    if st.button("🔍 Jalankan QC crossline", key="crossline_btn"):
+        with st.spinner("Mencari perpotongan lajur..."):
+            hasil_qc = hitung_tahap(
+                "crossline", qc_key,
+                lambda: crossline_qc(select_rows(final_all, final_mask), DATUM_COLUMNS, **qc_params),
+                count_rows(final_all, final_mask)
+            )
+        st.session_state['crossline_qc'] = (qc_key, hasil_qc)
+
+    if st.session_state['crossline_qc'] is not None and st.session_state['crossline_qc'][0] == qc_key:
+        pairs_qc, stats_qc, lajur_qc = st.session_state['crossline_qc'][1]
+        jumlah_lajur = int(lajur_qc.max()) + 1 if len(lajur_qc) else 0
+        st.write(f"**Jumlah lajur:** {jumlah_lajur} — **pasangan sounding berdekatan:** {len(pairs_qc)}")
+        if pairs_qc.empty:
+            st.info("Tidak ditemukan perpotongan lajur dalam toleransi jarak.")
+        else:
+            st.dataframe(stats_qc.round(3))
+
+            def plot_crossline():
+                kolom = f"dZ_{DATUM_COLUMNS[0].split('_')[1]}"
+                fig, ax = plt.subplots(figsize=(8, 6))
+                sc = ax.scatter(pairs_qc['X_UTM'], pairs_qc['Y_UTM'], c=pairs_qc[kolom], cmap='RdBu', s=12)
+                fig.colorbar(sc, ax=ax, label=f'{kolom} [m]')
+                ax.set_xlabel('X UTM [m]')
+                ax.set_ylabel('Y UTM [m]')
+                ax.set_title('Selisih Kedalaman di Perpotongan Lajur')
+                ax.axis('equal')
+                ax.grid(True, linestyle='--', alpha=0.5)
+                return fig
+            tampilkan_plot("plot_crossline", qc_key, plot_crossline)
+            st.download_button(
+                label="📥 Download pasangan perpotongan (CSV)",
+                data=pairs_qc.to_csv(index=False, float_format='%.3f'),
+                file_name="QC_crossline.csv",
+                mime="text/csv"
+            )
 
 
 # --- Tahap 4: Download ---
 st.header("4. Download Hasil")
 
 if st.session_state.get('final_data') is not None:
-    final_df = st.session_state['final_data']
+    final_all = st.session_state['final_data']
+    final_mask = st.session_state['final_mask']
     st.success("✅ Proses Pengolahan Data Selesai! Data siap untuk diunduh.")
 
-    # Buat file-file output
-    output_files = {}
-    for zona in final_df["Zona_UTM"].unique():
-        subset_zone = final_df[final_df["Zona_UTM"] == zona]
-        for datum in ["D_LWS", "D_MSL", "D_HWS"]:
-            file_name = f"Batimetri_{zona.replace(' ', '')}_{datum.split('_')[1]}.txt"
-            subset_xyz = subset_zone[["X_UTM", "Y_UTM", datum]].copy()
-            subset_xyz.columns = ["X", "Y", "Z"]
-            output_files[file_name] = subset_xyz.to_csv(sep=' ', index=False, header=False, float_format='%.3f')
+    # Daftar file output saja; isi file dibuat per chunk ketika tombol download diklik
+    format_export = st.multiselect(
+        "Format file XYZ", list(available_formats()), default=list(EXPORT_FORMATS)[:1], key="format_export",
+        help="Teks XYZ sama seperti sebelumnya; format biner jauh lebih kecil dan cepat dibaca."
+    )
+    kode_format = tuple(EXPORT_FORMATS[f] for f in format_export)
+    jumlah_final = count_rows(final_all, final_mask)
+    lajur_aktif = st.session_state['lajur']
+    per_lajur = (
+        lajur_aktif is not None and len(lajur_aktif[1]) == len(final_all)
+        and st.checkbox("File XYZ per lajur survei (ZIP)", key="export_per_lajur")
+    )
+    kunci_lajur, lajur_export = lajur_aktif if per_lajur else (None, None)
+
+    # Thinning untuk peta laut/CAD: satu sounding (terdangkal/median) per sel, per datum
+    col_t1, col_t2, col_t3 = st.columns(3)
+    with col_t1:
+        pakai_tipis = st.checkbox(
+            "Thinning sounding", key="thinning_export",
+            help="File XYZ hanya berisi satu sounding per sel. Terdangkal sesuai aturan seleksi sounding peta laut."
+        )
+    with col_t2:
+        radius_tipis = st.number_input("Ukuran sel thinning (m)", min_value=0.1, value=5.0, step=1.0, key="radius_tipis")
+    with col_t3:
+        metode_tipis = st.selectbox("Sounding wakil sel", list(THIN_METHODS), key="metode_tipis")
+    thin_params = {"radius": float(radius_tipis), "method": THIN_METHODS[metode_tipis]} if pakai_tipis else None
+
+    export_items = hitung_tahap(
+        "export", content_hash(stage_key('final', final_all), kode_format, kunci_lajur, thin_params),
+        lambda: plan_export(final_all, DATUM_COLUMNS, kode_format, final_mask, lajur_export, thin_params), jumlah_final
+    )
+    if thin_params is not None and export_items:
+        for datum in DATUM_COLUMNS:
+            jumlah_tipis = sum(len(item.rows) for item in export_items if item.datum == datum and item.fmt == kode_format[0])
+            st.write(f"Thinning {datum}: {jumlah_tipis:,} dari {jumlah_final:,} sounding")
 
     # Tawarkan download
     st.subheader("Pilih file yang ingin Anda unduh:")
-    for file_name, file_content in output_files.items():
+    if export_items:
+        st.download_button(
+            label=f"📦 Download semua file ({len(export_items)} file, ZIP)",
+            data=probe.wrap("export_zip", partial(zip_file, final_all, export_items), jumlah_final),
+            file_name="Batimetri_SBES.zip",
+            mime="application/zip"
+        )
+    # File per lajur bisa ratusan: hanya diunduh sebagai ZIP
+    for item in ([] if per_lajur else export_items):
         st.download_button(
-            label=f"📥 Download {file_name}",
-            data=file_content,
-            file_name=file_name,
-            mime="text/plain"
+            label=f"📥 Download {item.file_name}",
+            data=probe.wrap(f"export {item.file_name}", partial(item_bytes, final_all, item), jumlah_final if item.rows is None else len(item.rows)),
+            file_name=item.file_name,
+            mime=item.mime
         )
 
+    # --- Grid DEM per datum ---
+    st.subheader("Grid DEM (raster kedalaman)")
+    col_g1, col_g2, col_g3 = st.columns(3)
+    with col_g1:
+        ukuran_sel = st.number_input("Ukuran sel (m)", min_value=0.1, value=5.0, step=1.0, key="ukuran_sel")
+    with col_g2:
+        metode_grid = GRID_METHODS[st.selectbox("Metode grid", list(GRID_METHODS), key="metode_grid")]
+    with col_g3:
+        radius_grid = st.number_input(
+            "Radius pencarian (m)", min_value=0.1, value=15.0, step=1.0, key="radius_grid",
+            disabled=metode_grid == "bin", help="Sel kosong diisi dari sel berisi dalam radius ini."
+        )
+    format_grid = st.multiselect("Format file grid", list(GRID_FORMATS), default=list(GRID_FORMATS)[:1], key="format_grid")
+    grid_params = {
+        "cell_size": float(ukuran_sel), "method": metode_grid,
+        "radius": float(radius_grid) if metode_grid != "bin" else None,
+        "formats": tuple(GRID_FORMATS[f] for f in format_grid),
+    }
+    grid_key = content_hash(stage_key('final', final_all), grid_params)
+
+    if st.button("🗺️ Buat grid", key="buat_grid_btn", disabled=not format_grid):
+        try:
+            with st.spinner("Membuat grid..."):
+                grid_files = hitung_tahap(
+                    "grid", grid_key, lambda: export_grid(select_rows(final_all, final_mask), **grid_params),
+                    jumlah_final
+                )
+            st.session_state['grid_files'] = (grid_key, grid_files)
+        except ValueError as e:
+            st.error(f"Grid gagal dibuat: {e}")
+
+    # Tombol download hanya untuk grid dari data dan parameter yang sedang aktif
+    if st.session_state['grid_files'] is not None and st.session_state['grid_files'][0] == grid_key:
+        mime_grid = {"asc": "text/plain", "tif": "image/tiff", "npz": "application/octet-stream"}
+        for file_name, file_content in st.session_state['grid_files'][1].items():
+            st.download_button(
+                label=f"📥 Download {file_name}",
+                data=file_content,
+                file_name=file_name,
+                mime=mime_grid[file_name.rsplit('.', 1)[1]]
+            )
+
     # Tombol untuk proses ulang
     if st.button("🔄 Proses Ulang"):
         # Reset session state
@@ -615,4 +1216,63 @@ else:
 if st.session_state.get('final_data') is not None:
     st.button("↩️ Kembali ke Awal", on_click=lambda: st.session_state.clear() or st.rerun())
 
+# --- Job Latar Belakang (semua sesi) ---
+with st.sidebar.expander("Job latar belakang", expanded=False):
+    tabel_job = jobs.summary()
+    if tabel_job.empty:
+        st.caption("Tidak ada job yang berjalan atau menunggu diambil.")
+    else:
+        st.dataframe(tabel_job.set_index("id"))
+    st.caption(f"Maksimal {jobs.max_workers} job berjalan bersamaan (dibagi semua sesi).")
+
+# --- Cache Parse File (disk, semua sesi) ---
+if cache_parse is not None:
+    with st.sidebar.expander("Cache parse file", expanded=False):
+        st.dataframe(cache_parse.summary())
+        st.caption(f"{cache_parse.nbytes / 1024 / 1024:.1f} MB dari {cache_parse.max_bytes / 1024 / 1024:.0f} MB "
+                   f"di {cache_parse.path}; hit/miss server ini: {cache_parse.stats['hit']}/{cache_parse.stats['miss']}")
+        if st.button("Kosongkan cache parse"):
+            cache_parse.clear()
+            st.rerun()
+
+# --- Statistik Cache Tahapan ---
+if 'stage_cache' in st.session_state:
+    with st.sidebar.expander("Cache tahapan (hit/miss)", expanded=False):
+        st.dataframe(stage_cache.summary())
+        st.caption(f"Memori cache: {stage_cache.nbytes / 1024 / 1024:.1f} MB dari {stage_cache.max_bytes / 1024 / 1024:.0f} MB")
+
+# --- Memori Sesi ---
+with st.sidebar.expander("Memori sesi", expanded=False):
+    # Kolom yang dibagi antar tahap (salinan dangkal, cache) dihitung sekali pada "MB unik";
+    # cache dihitung terakhir sehingga hanya isi yang tidak dipakai sesi yang tercatat di sana
+    isi_sesi = {k: v for k, v in st.session_state.items() if v is not None and k != 'stage_cache'}
+    isi_sesi['stage_cache'] = stage_cache
+    laporan_memori = memory_report(isi_sesi)
+    laporan_memori = laporan_memori[laporan_memori["MB"] >= 0.01]
+    st.dataframe(laporan_memori.round(2))
+    st.caption(f"Total memori data sesi: {laporan_memori['MB unik'].sum():.1f} MB")
+    rss = process_rss_mb()
+    if rss is not None:
+        st.caption(f"Resident memory server (semua sesi): {rss:.0f} MB")
+
+# --- Instrumentasi: pengukuran terakhir per tahap ---
+with panel_instrumentasi:
+    tabel_tahap = probe.to_frame()
+    if tabel_tahap.empty:
+        st.caption("Belum ada tahap yang dihitung pada sesi ini (hasil dari cache tidak diukur ulang).")
+    else:
+        st.dataframe(tabel_tahap.drop(columns="sumber_puncak").round(3))
+        st.caption(
+            f"Total {tabel_tahap['detik'].sum():.2f} s. Puncak memori = kenaikan RSS proses server selama tahap "
+            "(semua sesi ikut terhitung)."
+        )
+        st.button("Kosongkan tabel", key="kosongkan_instrumentasi", on_click=probe.clear)
+    if st.session_state['profil_ingest'] is not None:
+        st.download_button(
+            label="📥 Download profil Proses Data (.prof)",
+            data=st.session_state['profil_ingest'][0],
+            file_name="profil_proses_data.prof",
+            mime="application/octet-stream"
+        )
+        st.caption("Buka dengan `python -m pstats profil_proses_data.prof` atau snakeviz.")
 
@@ -0,0 +1,59 @@
+"""
+Benchmark parser koordinat: ``Series.apply(clean_longitude/clean_latitude)`` vs ``sbes.coords``.
+
+    python benchmarks/bench_coords.py --sizes 1000000 10000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.coords import parse_coordinates  # noqa: E402
+from sbes.ingest import clean_latitude, clean_longitude  # noqa: E402
+
+
+def make_columns(n, seed=0):
+    """ Kolom longitude/latitude string seperti pada file logger (°E dan S), 0.1% rusak """
+    rng = np.random.default_rng(seed)
+    lon = pd.Series(np.round(110.0 + rng.random(n), 7)).astype(str) + "°E"
+    lat = pd.Series(np.round(6.0 + rng.random(n), 7)).astype(str) + "S"
+    bad = rng.random(n) < 0.001
+    lon[bad] = "xx.x"
+    lat[bad] = ""
+    return lon.astype(str), lat.astype(str)
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'baris':>12} {'apply (s)':>10} {'vektor (s)':>11} {'speedup':>8} {'maks selisih':>13}")
+    for n in args.sizes:
+        lon, lat = make_columns(n)
+        t_apply, (lon_a, lat_a) = timed(lambda: (
+            lon.apply(clean_longitude).astype(float).to_numpy(),
+            lat.apply(clean_latitude).astype(float).to_numpy(),
+        ))
+        t_vec, (lon_v, lat_v) = timed(lambda: (
+            parse_coordinates(lon, "lon")[0],
+            parse_coordinates(lat, "lat")[0],
+        ))
+        diff = max(np.nanmax(np.abs(lon_a - lon_v)), np.nanmax(np.abs(lat_a - lat_v)))
+        print(f"{n:>12,} {t_apply:>10.2f} {t_vec:>11.2f} {t_apply / t_vec:>7.1f}x {diff:>13.2e}")
+
+
+if __name__ == "__main__":
+    main()
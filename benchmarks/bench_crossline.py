@@ -0,0 +1,77 @@
+"""
+Benchmark QC crossline: segmentasi lajur + spatial hash pada survei lawnmower sintetis.
+
+Lajur utama timur-barat dan lajur silang utara-selatan (bias +10 cm); waktu harus naik
+hampir linear terhadap jumlah ping.
+
+    python benchmarks/bench_crossline.py --sizes 1000000 5000000 10000000 --tolerance 1
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.crossline import crossline_qc  # noqa: E402
+from sbes.projection import zone_categorical  # noqa: E402
+
+
+def make_survey(n, n_main=40, n_cross=8, width=4000.0, spacing=25.0, seed=0):
+    """ Ping 10 Hz; lajur utama bolak-balik lalu lajur silang setelah jeda 2 menit """
+    rng = np.random.default_rng(seed)
+    height = spacing * (n_main - 1)
+    lengths = np.r_[np.full(n_main, width), np.full(n_cross, height)]
+    per_line = np.maximum((lengths / lengths.sum() * n).astype(int), 2)
+    xs, ys, ts, biases = [], [], [], []
+    t = 0.0
+    for k, m in enumerate(per_line):
+        s = np.linspace(0, 1, m)
+        if k < n_main:
+            x, y = (s if k % 2 == 0 else 1 - s) * width, np.full(m, k * spacing)
+            bias = 0.0
+        else:
+            if k == n_main:
+                t += 120.0
+            c = k - n_main
+            x, y = np.full(m, (c + 0.5) * width / n_cross), (s if c % 2 == 0 else 1 - s) * height
+            bias = 0.1
+        xs.append(x)
+        ys.append(y)
+        ts.append(t + np.arange(m) * 0.1)
+        biases.append(np.full(m, bias))
+        t = ts[-1][-1] + 60.0
+    x, y = np.concatenate(xs) + 500_000, np.concatenate(ys) + 9_300_000
+    seconds = np.concatenate(ts)
+    depth = 10 + (x - 500_000) / 400 + np.concatenate(biases) + rng.normal(0, 0.05, len(x))
+    return pd.DataFrame({
+        "timestamp": np.datetime64("2024-01-01", "ns") + (seconds * 1e9).astype("timedelta64[ns]"),
+        "X_UTM": x, "Y_UTM": y,
+        "Zona_UTM": zone_categorical(np.full(len(x), 32749, dtype=np.int32)),
+        "D_LWS": (-depth).astype(np.float32),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000, 10_000_000])
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Toleransi jarak (m)")
+    args = parser.parse_args(argv)
+
+    print(f"{'ping':>12} {'waktu (s)':>10} {'us/ping':>8} {'pasangan':>9} {'rata2 dZ utama-silang':>22}")
+    for n in args.sizes:
+        df = make_survey(n)
+        t0 = time.perf_counter()
+        pairs, stats, _ = crossline_qc(df, ["D_LWS"], tolerance=args.tolerance)
+        elapsed = time.perf_counter() - t0
+        row = stats[stats["jenis"] == "utama-silang"]
+        mean = row["rata2"].iloc[0] if len(row) else float("nan")
+        print(f"{len(df):>12,} {elapsed:>10.2f} {elapsed / len(df) * 1e6:>8.2f} {len(pairs):>9,} {mean:>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark export XYZ: ``to_csv`` per zona/datum (cara lama) vs export chunked ``sbes.export``.
+
+Mengukur waktu dan puncak memori (tracemalloc) untuk menulis ketiga datum ke file di
+direktori sementara, serta ukuran file per format.
+
+    python benchmarks/bench_export.py --sizes 1000000 2000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.export import available_formats, plan_export, write_export  # noqa: E402
+from sbes.pipeline import DATUM_COLUMNS  # noqa: E402
+from sbes.projection import zone_categorical  # noqa: E402
+
+
+def make_final(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = 480_000 + rng.random(n) * 40_000
+    y = 9_230_000 + rng.random(n) * 40_000
+    depth = (5 + rng.random(n) * 40).astype(np.float32)
+    df = pd.DataFrame({
+        "X_UTM": x, "Y_UTM": y,
+        "Zona_UTM": zone_categorical(np.full(n, 32749, dtype=np.int32)),
+    })
+    for datum, offset in zip(DATUM_COLUMNS, (0.27, 1.59, 2.9)):
+        df[datum] = -(depth + np.float32(offset))
+    return df
+
+
+def legacy_export(final_df, out_dir):
+    """ Cara lama: subset + salinan + to_csv ke string di memori, baru ditulis """
+    files = {}
+    zones = final_df["Zona_UTM"]
+    for zona in zones.unique():
+        subset_zone = final_df[(zones == zona).to_numpy()]
+        for datum in DATUM_COLUMNS:
+            subset_xyz = subset_zone[["X_UTM", "Y_UTM", datum]].copy()
+            subset_xyz.columns = ["X", "Y", "Z"]
+            name = f"Batimetri_{zona}_{datum.split('_')[1]}.txt"
+            files[name] = subset_xyz.to_csv(sep=' ', index=False, header=False, float_format='%.3f')
+    for name, text in files.items():
+        with open(os.path.join(out_dir, name), "w") as f:
+            f.write(text)
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def dir_size_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1024 / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>12} {'metode':>16} {'waktu (s)':>10} {'puncak (MB)':>12} {'ukuran (MB)':>12}")
+    for n in args.sizes:
+        final = make_final(n)
+        runs = [("to_csv (lama)", lambda d: legacy_export(final, d))]
+        for fmt in available_formats().values():
+            runs.append((fmt, lambda d, fmt=fmt: write_export(final, plan_export(final, DATUM_COLUMNS, (fmt,)), d)))
+        runs.append(("zip (txt)", lambda d: write_export(
+            final, plan_export(final, DATUM_COLUMNS, ("txt",)), d, zip_name="semua.zip")))
+        for label, run in runs:
+            with tempfile.TemporaryDirectory() as out_dir:
+                elapsed, peak = measure(lambda: run(out_dir))
+                size = dir_size_mb(out_dir)
+            print(f"{n:>12,} {label:>16} {elapsed:>10.2f} {peak:>12.1f} {size:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
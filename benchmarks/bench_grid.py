@@ -0,0 +1,63 @@
+"""
+Benchmark gridding DEM: binning, IDW dan tetangga terdekat untuk survei lajur sintetis.
+
+    python benchmarks/bench_grid.py --sizes 1000000 10000000 --cell 5 --radius 30
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.grid import Grid, bin_mean, grid_index, interpolate, to_esri_ascii, to_geotiff  # noqa: E402
+
+
+def make_survey(n, width=5000, height=3000, line_spacing=50, seed=0):
+    """ Lajur survei timur-barat tiap ``line_spacing`` m; dasar laut menurun ke timur """
+    rng = np.random.default_rng(seed)
+    x = 500_000 + rng.random(n) * width
+    y = 9_300_000 + np.round(rng.random(n) * height / line_spacing) * line_spacing + rng.normal(0, 1, n)
+    z = -(10 + (x - 500_000) / 1000 + rng.normal(0, 0.1, n))
+    return x, y, z
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--cell", type=float, default=5.0, help="Ukuran sel (m)")
+    parser.add_argument("--radius", type=float, default=30.0, help="Radius pencarian (m)")
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>12} {'sel':>11} {'binning (s)':>12} {'IDW (s)':>8} {'nearest (s)':>12} "
+          f"{'ASC (s)':>8} {'TIF (s)':>8} {'terisi IDW':>11}")
+    for n in args.sizes:
+        x, y, z = make_survey(n)
+        t0 = time.perf_counter()
+        index = grid_index(x, y, args.cell)
+        mean = bin_mean(index, z)
+        t_bin = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        idw = interpolate(index, mean, "idw", args.radius)
+        t_idw = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        interpolate(index, mean, "nearest", args.radius)
+        t_nearest = time.perf_counter() - t0
+
+        grid = Grid(idw.astype(np.float32), index.x0, index.y_top, index.cell_size, 32749, index.counts)
+        t0 = time.perf_counter()
+        to_esri_ascii(grid)
+        t_asc = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        to_geotiff(grid)
+        t_tif = time.perf_counter() - t0
+        print(f"{n:>12,} {index.counts.size:>11,} {t_bin:>12.2f} {t_idw:>8.2f} {t_nearest:>12.2f} "
+              f"{t_asc:>8.2f} {t_tif:>8.2f} {np.isfinite(idw).mean():>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
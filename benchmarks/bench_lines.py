@@ -0,0 +1,77 @@
+"""
+Benchmark segmentasi lajur survei (``sbes.lines``) dan deteksi outlier per lajur.
+
+Dataset sintetis ``--pings`` ping (``benchmarks/synth.py``, lajur bolak-balik 2000 m dengan
+belokan) dibaca dengan ``load_bati``, lalu diukur: segmentasi lajur, statistik per lajur, dan
+median/MAD bergulir per file vs per lajur (berurutan dan di thread pool ``--workers``).
+
+    python benchmarks/bench_lines.py --pings 5000000 --files 8 --data-dir /tmp/sbes_sintetis
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synth import make_dataset  # noqa: E402
+from sbes.ingest import load_bati  # noqa: E402
+from sbes.lines import line_stats, segment_lines, survey_lines  # noqa: E402
+from sbes.outliers import detect_outliers  # noqa: E402
+
+DATE_FORMAT = "%d-%b-%y"
+
+
+def _timed(label, fn):
+    t0 = time.perf_counter()
+    value = fn()
+    print(f"{label:<32} {time.perf_counter() - t0:>9.3f} s")
+    return value
+
+
+def check_file_boundary(pings=300, window=15):
+    """ Dua file lurus dengan heading berbeda: awal file kedua tidak boleh dianggap belokan """
+    ts = np.datetime64("2023-07-01T00:00:00", "ns") + np.arange(2 * pings) * np.timedelta64(1, "s")
+    x = np.r_[np.arange(pings) * 2.0, np.full(pings, 2.0 * pings)]
+    y = np.r_[np.zeros(pings), np.arange(pings) * 2.0]
+    groups = np.repeat([0, 1], pings)
+    line_id = segment_lines(ts, x, y, groups=groups, heading_window=window)
+    assert (line_id >= 0).all(), f"{int((line_id < 0).sum())} ping di batas file dianggap belokan"
+    assert len(np.unique(line_id)) == 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pings", type=int, default=5_000_000)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="Thread per lajur (default: jumlah CPU)")
+    parser.add_argument("--window", type=int, default=51, help="Lebar jendela median bergulir (ping)")
+    parser.add_argument("--data-dir", help="Folder dataset sintetis (dipakai ulang antar run); default folder sementara")
+    args = parser.parse_args(argv)
+
+    check_file_boundary()
+    with tempfile.TemporaryDirectory() as tmp:
+        files, _ = make_dataset(args.data_dir or os.path.join(tmp, "data"), args.pings, args.files)
+        bati = load_bati(files, DATE_FORMAT)
+    print(f"{len(bati):,} ping dalam {len(files)} file, {os.cpu_count()} CPU\n")
+
+    line_id = _timed("segmentasi lajur", lambda: survey_lines(bati))
+    stats = _timed("statistik per lajur", lambda: line_stats(bati, line_id))
+    rolling = {"window": args.window}
+    per_file = _timed("rolling per file", lambda: detect_outliers(bati, "rolling", **rolling))
+    serial = _timed("rolling per lajur (1 thread)", lambda: detect_outliers(bati, "rolling", lines=line_id, **rolling))
+    pooled = _timed("rolling per lajur (pool)",
+                    lambda: detect_outliers(bati, "rolling", lines=line_id, workers=args.workers, **rolling))
+    assert (serial == pooled).all()
+    print(f"\n{len(stats):,} lajur, {int((line_id < 0).sum()):,} ping di luar lajur, "
+          f"kecepatan median {stats['kecepatan_ms'].median():.2f} m/s; "
+          f"outlier per file {int(per_file.sum()):,}, per lajur {int(serial.sum()):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark render plot kedalaman: semua titik vs downsampling (min/max per piksel, LTTB).
+
+    python benchmarks/bench_lod.py --sizes 1000000 5000000 --save /tmp/lod
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.lod import downsample_indices  # noqa: E402
+
+DPI = 100
+
+
+def make_series(n, seed=0):
+    """ Kedalaman 5 Hz dengan gelombang, noise dan beberapa spike """
+    rng = np.random.default_rng(seed)
+    t = np.datetime64("2023-07-01T00:00:00", "ns") + np.arange(n) * np.timedelta64(200, "ms")
+    depth = 12 + 3 * np.sin(np.arange(n) / (n / 7)) + rng.normal(0, 0.05, n)
+    spikes = rng.choice(n, 20, replace=False)
+    depth[spikes] += rng.uniform(10, 40, 20)
+    return t, depth.astype(np.float32), spikes
+
+
+def visible_spikes(t, depth, idx, spikes, width_px=640):
+    """ Jumlah spike yang kolom pikselnya memuat titik tergambar setinggi spike tersebut """
+    x = t.view(np.int64)
+    column = (x - x[0]) * (width_px / max(x[-1] - x[0], 1))
+    col_idx, col_spike = column[idx].astype(int), column[spikes].astype(int)
+    return sum(
+        (depth[idx][col_idx == c] >= depth[s]).any() for s, c in zip(spikes, col_spike)
+    )
+
+
+def render(t, depth, method):
+    """ Render ke PNG; kembalikan (detik, ukuran byte, jumlah titik, PNG, indeks titik) """
+    t0 = time.perf_counter()
+    fig, ax = plt.subplots()
+    if method == "semua":
+        idx = np.arange(len(t))
+    else:
+        idx = downsample_indices(t, depth, fig.get_figwidth() * DPI, method=method)
+    ax.plot(t[idx], depth[idx], color="black", linewidth=0.8)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=DPI, bbox_inches="tight")
+    plt.close(fig)
+    return time.perf_counter() - t0, buf.getbuffer().nbytes, len(idx), buf.getvalue(), idx
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--save", help="Simpan PNG hasil render ke direktori ini")
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>12} {'metode':>8} {'digambar':>9} {'render (s)':>11} {'PNG (kB)':>9} {'spike':>6}")
+    for n in args.sizes:
+        t, depth, spikes = make_series(n)
+        for method in ("semua", "minmax", "lttb"):
+            elapsed, size, drawn, png, idx = render(t, depth, method)
+            kept = visible_spikes(t, depth, idx, spikes)
+            print(f"{n:>12,} {method:>8} {drawn:>9,} {elapsed:>11.2f} {size / 1024:>9.0f} {kept:>3}/{len(spikes)}")
+            if args.save:
+                os.makedirs(args.save, exist_ok=True)
+                with open(os.path.join(args.save, f"kedalaman_{n}_{method}.png"), "wb") as f:
+                    f.write(png)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark peta sebaran: scatter satu marker per titik vs raster binning ``sbes.basemap``.
+
+    python benchmarks/bench_map.py --sizes 1000000 5000000 --coastline ne_10m_coastline.shp
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.basemap import plot_sounding_map  # noqa: E402
+
+
+def make_survey(n, n_lines=40, seed=0):
+    """ Lajur survei paralel sepanjang ~11 km dengan kedalaman yang bertambah ke timur """
+    rng = np.random.default_rng(seed)
+    line = np.arange(n) % n_lines
+    t = rng.random(n)
+    lon = 113.95 + 0.1 * t
+    lat = -6.45 - 0.0025 * line + 0.0003 * np.sin(t * 50)
+    depth = (10 + 30 * t + rng.normal(0, 0.2, n)).astype(np.float32)
+    return lon, lat, depth
+
+
+def timed_png(make_fig):
+    t0 = time.perf_counter()
+    fig = make_fig()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches="tight")
+    plt.close(fig)
+    return time.perf_counter() - t0, buf.getbuffer().nbytes
+
+
+def scatter_map(lon, lat, depth):
+    fig, ax = plt.subplots(figsize=(10, 8))
+    sc = ax.scatter(lon, lat, c=-depth, cmap="turbo_r", s=8, edgecolors="none")
+    fig.colorbar(sc, ax=ax, shrink=0.7)
+    return fig
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--coastline", default=None, help="File garis pantai lokal (GeoJSON/shapefile)")
+    parser.add_argument("--skip-scatter", action="store_true", help="Lewati pembanding scatter (lambat)")
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>12} {'scatter (s)':>12} {'binning (s)':>12} {'PNG binning (kB)':>17}")
+    for n in args.sizes:
+        lon, lat, depth = make_survey(n)
+        t_scatter = float("nan")
+        if not args.skip_scatter:
+            t_scatter, _ = timed_png(lambda: scatter_map(lon, lat, depth))
+        t_bin, size = timed_png(lambda: plot_sounding_map(lon, lat, depth, source=args.coastline))
+        print(f"{n:>12,} {t_scatter:>12.2f} {t_bin:>12.2f} {size / 1024:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark penggabungan tabel per file: ``concat`` + ``sort_values`` (lama) vs ``merge_frames``.
+
+Setiap file sudah urut waktu. Skenario ``berurutan``: file tidak bertumpang tindih (diacak
+urutannya seperti daftar file dari folder); ``tumpang``: setiap file disalin dua kali (file
+terunggah ulang / ekspor log bertumpang tindih) sehingga ada duplikat yang dibuang.
+
+    python benchmarks/bench_merge.py --files 200 --per-file 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.merge import merge_frames  # noqa: E402
+
+
+def make_parts(n_files, per_file, duplicated=False, seed=0):
+    """ Tabel per file 1 Hz dengan kolom sama seperti hasil ``parse_bati_file`` """
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2023-07-01T00:00:00", "ns")
+    parts = []
+    for rank in rng.permutation(n_files):
+        ts = start + (rank * per_file + np.arange(per_file)) * np.timedelta64(1, "s")
+        parts.append(pd.DataFrame({
+            "timestamp": ts,
+            "longitude": 112.5 + rng.normal(0, 0.01, per_file),
+            "latitude": -7.2 + rng.normal(0, 0.01, per_file),
+            "kedalaman": rng.uniform(2, 30, per_file).astype(np.float32),
+        }))
+    if duplicated:
+        parts = parts + [p.copy() for p in parts[: n_files // 2]]
+    for i, p in enumerate(parts):
+        p["file"] = np.int16(i)
+    return parts
+
+
+def concat_sort(parts):
+    merged = pd.concat(parts, ignore_index=True)
+    return merged.sort_values("timestamp", kind="stable").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--per-file", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'skenario':>10} {'ping':>12} {'metode':>14} {'waktu (s)':>10} {'baris hasil':>12}")
+    for label, duplicated in (("berurutan", False), ("tumpang", True)):
+        parts = make_parts(args.files, args.per_file, duplicated)
+        n = sum(len(p) for p in parts)
+        runs = (("concat+sort", concat_sort),
+                ("merge_frames", lambda p: merge_frames(p, len(p))[0]))
+        for method, fn in runs:
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                out = fn(parts)
+                best = min(best, time.perf_counter() - t0)
+            print(f"{label:>10} {n:>12,} {method:>14} {best:>10.3f} {len(out):>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark deteksi outlier: IQR global vs median/MAD bergulir sepanjang lintasan.
+
+Data sintetis berupa beberapa lajur dengan dasar laut yang menurun (5 -> 40 m) dan spike
+yang kecil terhadap rentang survei tetapi besar terhadap kedalaman lokal.
+
+    python benchmarks/bench_outliers.py --sizes 1000000 10000000 --window 51
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.outliers import detect_outliers  # noqa: E402
+
+
+def make_survey(n, n_files=20, spike_fraction=0.001, seed=0):
+    """ Ping 5 Hz per file; kedalaman menurun sepanjang lajur dengan noise dan spike +/- 2-8 m """
+    rng = np.random.default_rng(seed)
+    per_file = n // n_files
+    file_id = np.repeat(np.arange(n_files, dtype=np.int16), per_file)
+    along = np.tile(np.linspace(0, 1, per_file), n_files)
+    ts = (np.datetime64("2023-07-01T00:00:00", "ns")
+          + np.arange(len(file_id)) * np.timedelta64(200, "ms"))
+    depth = 5 + 35 * along + 0.5 * np.sin(along * 200) + rng.normal(0, 0.05, len(file_id))
+    spikes = rng.choice(len(file_id), int(len(file_id) * spike_fraction), replace=False)
+    depth[spikes] += rng.choice([-1, 1], len(spikes)) * rng.uniform(2, 8, len(spikes))
+    bati = pd.DataFrame({"timestamp": ts, "kedalaman": depth.astype(np.float32), "file": file_id}, copy=False)
+    truth = np.zeros(len(file_id), dtype=bool)
+    truth[spikes] = True
+    return bati, truth
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--window", type=int, default=51, help="Lebar jendela (ping)")
+    parser.add_argument("--window-seconds", type=float, default=None, help="Lebar jendela (detik)")
+    parser.add_argument("--k", type=float, default=3.5)
+    args = parser.parse_args(argv)
+
+    rolling = {"window": args.window, "window_seconds": args.window_seconds, "k": args.k}
+    print(f"{'ping':>12} {'metode':>8} {'waktu (s)':>10} {'ditandai':>9} {'spike terdeteksi':>17} {'salah tanda':>12}")
+    for n in args.sizes:
+        bati, truth = make_survey(n)
+        for method, params in (("iqr", {}), ("rolling", rolling)):
+            t0 = time.perf_counter()
+            mask = detect_outliers(bati, method, **params)
+            elapsed = time.perf_counter() - t0
+            hit = int((mask & truth).sum())
+            false = int((mask & ~truth).sum())
+            print(f"{len(bati):>12,} {method:>8} {elapsed:>10.2f} {int(mask.sum()):>9,} "
+                  f"{hit:>8,}/{int(truth.sum()):<8,} {false:>12,}")
+
+
+if __name__ == "__main__":
+    main()
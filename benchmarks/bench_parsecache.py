@@ -0,0 +1,57 @@
+"""
+Benchmark cache parse (``sbes.parsecache``): membuka ulang kampanye yang file-nya tidak berubah.
+
+Dataset sintetis ``--pings`` ping dalam ``--files`` file (``benchmarks/synth.py``) dibaca dengan
+``load_bati`` tanpa cache, lalu dua kali dengan cache: run pertama mengisi cache (parse + tulis
+``.npy``), run kedua hanya menghitung hash file dan membuka memmap lalu menggabungkan file.
+
+    python benchmarks/bench_parsecache.py --pings 5000000 --files 8 --data-dir /tmp/sbes_sintetis
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synth import make_dataset  # noqa: E402
+from sbes.cache import file_hash  # noqa: E402
+from sbes.ingest import load_bati, stream_bati  # noqa: E402
+from sbes.parsecache import ParseCache  # noqa: E402
+
+DATE_FORMAT = "%d-%b-%y"
+
+
+def _timed(label, fn):
+    t0 = time.perf_counter()
+    value = fn()
+    print(f"{label:<24} {time.perf_counter() - t0:>9.3f} s")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pings", type=int, default=5_000_000)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None, help="Proses parsing paralel (default: jumlah CPU)")
+    parser.add_argument("--data-dir", help="Folder dataset sintetis (dipakai ulang antar run); default folder sementara")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files, _ = make_dataset(args.data_dir or os.path.join(tmp, "data"), args.pings, args.files)
+        cache = ParseCache(os.path.join(tmp, "cache"))
+        print(f"{args.pings:,} ping dalam {len(files)} file ({sum(os.path.getsize(f) for f in files) / 1e6:,.0f} MB)\n")
+
+        _timed("hash file", lambda: [file_hash(f) for f in files])
+        _timed("tanpa cache", lambda: load_bati(files, DATE_FORMAT, workers=args.workers))
+        _timed("isi cache", lambda: load_bati(files, DATE_FORMAT, workers=args.workers, parse_cache=cache))
+        bati = _timed("dari cache", lambda: load_bati(files, DATE_FORMAT, workers=args.workers, parse_cache=cache))
+        _timed("dari cache (streaming)", lambda: stream_bati(files, DATE_FORMAT, parse_cache=cache))
+        print(f"\n{len(bati):,} baris, cache {cache.nbytes / 1e6:,.0f} MB di disk, {cache.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Benchmark seluruh tahapan pengolahan pada data SBES sintetis (``benchmarks/synth.py``).
+
+Waktu dan puncak memori diukur per tahap: baca + gabung file, parsing koordinat, parsing
+timestamp, buang baris rusak + urutkan, baca pasut, IQR, koreksi pasut (``np.interp``),
+transformasi UTM, plot kedalaman dan peta sebaran, serta export XYZ. Puncak memori adalah
+kenaikan puncak RSS selama tahap (VmHWM direset lewat ``/proc/self/clear_refs``); jika tidak
+tersedia, puncak alokasi tracemalloc. Kolom ``nilai`` adalah ringkasan hasil tahap (jumlah baris,
+nilai ditolak/NaT, outlier, byte gambar/file) untuk memastikan versi yang dibandingkan
+mengerjakan hal yang sama. Hasil ditulis sebagai JSON agar regresi antar versi
+dapat dibandingkan dengan ``--compare``.
+
+    python benchmarks/bench_pipeline.py --sizes 10000 1000000 --json hasil_baru.json
+    python benchmarks/bench_pipeline.py --compare hasil_lama.json hasil_baru.json
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synth import make_dataset  # noqa: E402
+from sbes.basemap import plot_sounding_map  # noqa: E402
+from sbes.coords import parse_coordinates  # noqa: E402
+from sbes.export import plan_export, write_export  # noqa: E402
+from sbes.ingest import BATI_COLUMNS, load_pasut, read_bati_files  # noqa: E402
+from sbes.instrument import measure_peak  # noqa: E402
+from sbes.lod import downsample_indices  # noqa: E402
+from sbes.outliers import iqr_outliers  # noqa: E402
+from sbes.pipeline import DATUM_COLUMNS, koreksi_pasut, lonlat_to_utm_per_point  # noqa: E402
+from sbes.survey import compact_frame, select_rows  # noqa: E402
+from sbes.timeparse import parse_timestamps  # noqa: E402
+
+STAGES = ["baca_gabung", "koordinat", "timestamp", "buang_urut", "baca_pasut", "iqr",
+          "koreksi_pasut", "utm", "plot_kedalaman", "plot_peta", "export_xyz"]
+HWS, MSL, LWS = 2.90, 1.59, 0.27
+
+
+def _plot_kedalaman(bati, width_px=1200, dpi=100):
+    """ Plot kedalaman vs waktu seperti di aplikasi (downsampling min/max per piksel) """
+    waktu, kedalaman = bati["timestamp"].to_numpy(), bati["kedalaman"].to_numpy()
+    fig, ax = plt.subplots(figsize=(width_px / dpi, 5), dpi=dpi)
+    idx = downsample_indices(waktu, kedalaman, width_px)
+    ax.plot(waktu[idx], kedalaman[idx], color="black", linewidth=0.8)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+
+def _plot_peta(final):
+    fig = plot_sounding_map(final["longitude"].to_numpy(), final["latitude"].to_numpy(),
+                            final["kedalaman"].to_numpy(), source=None)
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    plt.close(fig)
+    return buf.getbuffer().nbytes
+
+
+def run_pipeline(files, pasut_file, out_dir, stages, use_tracemalloc=False):
+    """ Jalankan tahapan berurutan; tahap di luar ``stages`` tetap dijalankan tetapi tidak dicatat """
+    state = {}
+
+    def bati_table():
+        raw = read_bati_files(files)
+        state["raw"] = raw
+        return len(raw)
+
+    def coordinates():
+        raw = state["raw"]
+        state["lon"], lon_rejected = parse_coordinates(raw[2], "lon")
+        state["lat"], lat_rejected = parse_coordinates(raw[3], "lat")
+        return int(lon_rejected + lat_rejected)
+
+    def timestamps():
+        raw = state["raw"]
+        state["timestamp"] = parse_timestamps(raw[0], raw[1], "%d-%b-%y")
+        return int(np.isnat(state["timestamp"]).sum())
+
+    def drop_sort():
+        raw = state.pop("raw")
+        bati = pd.DataFrame({
+            "timestamp": state.pop("timestamp"),
+            "longitude": state.pop("lon"),
+            "latitude": state.pop("lat"),
+            "kedalaman": pd.to_numeric(raw[4], errors="coerce").to_numpy(),
+            "file": raw["file"].to_numpy(),
+        })
+        del raw
+        bati = bati.dropna(subset=BATI_COLUMNS).reset_index(drop=True)
+        state["bati"] = compact_frame(bati.sort_values("timestamp", kind="stable").reset_index(drop=True))
+        return len(state["bati"])
+
+    def tide_table():
+        state["pasut"] = load_pasut(pasut_file, "%d/%m/%Y", "%H:%M:%S")
+        return len(state["pasut"])
+
+    def iqr():
+        outlier = iqr_outliers(state["bati"]["kedalaman"])
+        state["clean"] = select_rows(state["bati"], ~outlier)
+        return int(outlier.sum())
+
+    def tide_correction():
+        state["koreksi"] = koreksi_pasut(state["clean"], state["pasut"], HWS, MSL, LWS)
+        return int(state["koreksi"]["pasut_flag"].to_numpy().astype(bool).sum())
+
+    def utm():
+        state["final"] = lonlat_to_utm_per_point(state.pop("koreksi"))
+        return int(state["final"]["Zona_UTM"].nunique())
+
+    def export():
+        items = plan_export(state["final"], DATUM_COLUMNS, ("txt",))
+        paths = write_export(state["final"], items, out_dir)
+        return sum(os.path.getsize(p) for p in paths.values())
+
+    steps = {
+        "baca_gabung": bati_table,
+        "koordinat": coordinates,
+        "timestamp": timestamps,
+        "buang_urut": drop_sort,
+        "baca_pasut": tide_table,
+        "iqr": iqr,
+        "koreksi_pasut": tide_correction,
+        "utm": utm,
+        "plot_kedalaman": lambda: _plot_kedalaman(state["bati"]),
+        "plot_peta": lambda: _plot_peta(state["final"]),
+        "export_xyz": export,
+    }
+    results = []
+    for name in STAGES:
+        if name not in stages:
+            steps[name]()
+            continue
+        value, elapsed, peak, source = measure_peak(steps[name], use_tracemalloc)
+        results.append({"tahap": name, "detik": round(elapsed, 4), "puncak_mb": round(peak, 1),
+                        "sumber_puncak": source, "nilai": value})
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                             text=True, timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(old_path, new_path, threshold=1.2, min_seconds=0.05):
+    """
+    Bandingkan dua file JSON hasil benchmark; tandai tahap yang melambat > ``threshold`` x dan
+    lebih dari ``min_seconds`` detik (tahap sangat singkat terlalu berisik untuk rasio saja).
+    """
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    old_rows = {(r["ping"], s["tahap"]): s for r in old["hasil"] for s in r["tahap"]}
+    print(f"lama: {old.get('commit')}  baru: {new.get('commit')}")
+    print(f"{'ping':>12} {'tahap':<15} {'lama (s)':>9} {'baru (s)':>9} {'rasio':>7} "
+          f"{'lama MB':>8} {'baru MB':>8}")
+    regressions = 0
+    for r in new["hasil"]:
+        for s in r["tahap"]:
+            o = old_rows.get((r["ping"], s["tahap"]))
+            if o is None:
+                continue
+            ratio = s["detik"] / o["detik"] if o["detik"] > 0 else float("nan")
+            slower = ratio > threshold and s["detik"] - o["detik"] > min_seconds
+            flag = "  <-- lebih lambat" if slower else ""
+            regressions += bool(flag)
+            print(f"{r['ping']:>12,} {s['tahap']:<15} {o['detik']:>9.3f} {s['detik']:>9.3f} {ratio:>6.2f}x "
+                  f"{o['puncak_mb']:>8.1f} {s['puncak_mb']:>8.1f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--files", type=int, default=4, help="Jumlah file batimetri per dataset")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, help="Tahap yang dicatat")
+    parser.add_argument("--data-dir", help="Folder dataset sintetis (dipakai ulang antar run); default folder sementara")
+    parser.add_argument("--json", help="Tulis hasil ke file JSON")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Ukur puncak alokasi dengan tracemalloc (lebih lambat) alih-alih RSS")
+    parser.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"), help="Bandingkan dua file JSON")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Rasio waktu yang dianggap regresi")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Selisih waktu minimum regresi")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold, min_seconds=args.min_seconds) else 0)
+
+    report = {
+        "commit": _git_commit(),
+        "waktu": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu": os.cpu_count(),
+        "hasil": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or os.path.join(tmp, "data")
+        for n in args.sizes:
+            t0 = time.perf_counter()
+            files, pasut = make_dataset(data_dir, n, args.files, seed=args.seed)
+            print(f"dataset {n:,} ping: {time.perf_counter() - t0:.1f} s")
+            out_dir = os.path.join(tmp, f"hasil_{n}")
+            stages = run_pipeline(files, pasut, out_dir, args.stages, args.tracemalloc)
+            report["hasil"].append({"ping": n, "file": args.files, "tahap": stages,
+                                    "total_detik": round(sum(s["detik"] for s in stages), 4)})
+            print(f"{'tahap':<15} {'detik':>9} {'puncak MB':>10} {'nilai':>14}")
+            for s in stages:
+                print(f"{s['tahap']:<15} {s['detik']:>9.3f} {s['puncak_mb']:>10.1f} {s['nilai']:>14,}")
+            print(f"{'total':<15} {report['hasil'][-1]['total_detik']:>9.3f}\n")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"hasil ditulis ke {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark transformasi UTM: implementasi lama (mask per zona + label string per titik)
+vs ``sbes.projection`` (transformer ter-cache, zona kategorikal, chunk paralel).
+
+    python benchmarks/bench_projection.py --sizes 10000000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.projection import project_utm, zone_categorical  # noqa: E402
+
+
+def legacy_utm(lon, lat):
+    """ Salinan ``lonlat_to_utm_per_point`` sebelum mesin proyeksi baru (sebagai pembanding) """
+    utm_zones = np.floor((lon + 180) / 6).astype(int) + 1
+    hemispheres = np.where(lat >= 0, "N", "S")
+    epsg_codes = np.where(lat >= 0, 32600 + utm_zones, 32700 + utm_zones)
+    x_utm = np.zeros(len(lon))
+    y_utm = np.zeros(len(lon))
+    for epsg in np.unique(epsg_codes):
+        mask = epsg_codes == epsg
+        transformer = Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
+        x_tmp, y_tmp = transformer.transform(lon[mask], lat[mask])
+        x_utm[mask] = x_tmp
+        y_utm[mask] = y_tmp
+    zone_str = [f"{z}{h}" for z, h in zip(utm_zones, hemispheres)]
+    return x_utm, y_utm, zone_str
+
+
+def new_utm(lon, lat, workers):
+    x, y, epsg = project_utm(lon, lat, workers=workers)
+    return x, y, zone_categorical(epsg)
+
+
+def make_points(n, seed=0):
+    """ Titik survei di sekitar batas zona 49S/50S (lon 114°) """
+    rng = np.random.default_rng(seed)
+    lon = 113.5 + rng.random(n)
+    lat = -(6.0 + rng.random(n))
+    return lon, lat
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - t0, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000_000])
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah thread (default: jumlah CPU)")
+    args = parser.parse_args(argv)
+
+    print(f"{'titik':>12} {'lama (s)':>9} {'baru (s)':>9} {'speedup':>8} {'maks selisih (m)':>17} {'zona':>10}")
+    for n in args.sizes:
+        lon, lat = make_points(n)
+        t_old, (x_old, y_old, zone_old) = timed(lambda: legacy_utm(lon, lat))
+        t_new, (x_new, y_new, zones) = timed(lambda: new_utm(lon, lat, args.workers))
+        diff = max(np.abs(x_old - x_new).max(), np.abs(y_old - y_new).max())
+        assert (pd.Series(zone_old) == pd.Series(zones)).all()
+        print(f"{n:>12,} {t_old:>9.2f} {t_new:>9.2f} {t_old / t_new:>7.1f}x {diff:>17.2e} "
+              f"{','.join(zones.categories):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark proyek persisten (``sbes.store``): menambah satu hari survei ke proyek besar.
+
+Proyek dasar dibangun dari dataset sintetis ``--base`` ping (``benchmarks/synth.py``), lalu satu
+file ``--new`` ping yang waktunya setelah isi proyek ditambahkan. Yang diukur: parse + gabung
+file baru, koreksi pasut dan UTM inkremental, serta pembacaan hasil akhir dari memmap.
+``--full`` ikut mengukur pengolahan ulang seluruh file dari awal sebagai pembanding.
+
+    python benchmarks/bench_store.py --base 20000000 --new 100000 --data-dir /tmp/sbes_sintetis
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synth import bati_block, make_dataset, write_pasut  # noqa: E402
+from sbes.ingest import load_bati, load_pasut  # noqa: E402
+from sbes.pipeline import koreksi_pasut, koreksi_pasut_store, lonlat_to_utm_per_point, utm_store  # noqa: E402
+from sbes.store import ProjectStore  # noqa: E402
+from sbes.tidecorr import FLAG_OK  # noqa: E402
+
+HWS, MSL, LWS = 2.90, 1.59, 0.27
+DATE_FORMAT = "%d-%b-%y"
+
+
+def _timed(label, fn, results):
+    t0 = time.perf_counter()
+    value = fn()
+    results.append((label, time.perf_counter() - t0))
+    print(f"{label:<22} {results[-1][1]:>9.3f} s")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", type=int, default=20_000_000, help="Jumlah ping proyek dasar")
+    parser.add_argument("--new", type=int, default=100_000, help="Jumlah ping hari survei baru")
+    parser.add_argument("--files", type=int, default=8, help="Jumlah file batimetri proyek dasar")
+    parser.add_argument("--data-dir", help="Folder dataset sintetis (dipakai ulang antar run); default folder sementara")
+    parser.add_argument("--full", action="store_true", help="Ukur juga pengolahan ulang seluruh file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or os.path.join(tmp, "data")
+        t0 = time.perf_counter()
+        files, _ = make_dataset(data_dir, args.base, args.files)
+        new_file = os.path.join(tmp, "hari_baru.txt")
+        bati_block(args.base, args.base + args.new).to_csv(new_file, sep="\t", header=False, index=False)
+        pasut_file = os.path.join(tmp, "pasut.txt")
+        write_pasut(pasut_file, args.base + args.new)
+        data_pasut = load_pasut(pasut_file, "%d/%m/%Y", "%H:%M:%S")
+        print(f"dataset {args.base:,} + {args.new:,} ping: {time.perf_counter() - t0:.1f} s")
+
+        store = ProjectStore(os.path.join(tmp, "proyek"))
+        t0 = time.perf_counter()
+        store.add_files(files, DATE_FORMAT)
+        koreksi_pasut_store(store, data_pasut, HWS, MSL, LWS)
+        utm_store(store)
+        print(f"proyek dasar {len(store):,} ping: {time.perf_counter() - t0:.1f} s\n")
+
+        results = []
+        _timed("tambah_file", lambda: store.add_files([new_file], DATE_FORMAT), results)
+        rows = _timed("koreksi_pasut", lambda: koreksi_pasut_store(store, data_pasut, HWS, MSL, LWS), results)
+        _timed("utm", lambda: utm_store(store), results)
+        final = _timed("baca_final", lambda: store.frame(
+            rows=np.flatnonzero(store.column("pasut_flag") == FLAG_OK)), results)
+        print(f"{'total inkremental':<22} {sum(s for _, s in results):>9.3f} s "
+              f"({rows:,} baris dihitung, {len(final):,} baris final)")
+        _timed("tambah_file_ulang", lambda: store.add_files([new_file], DATE_FORMAT), results)
+
+        if args.full:
+            print()
+            full = []
+            bati = _timed("penuh_baca", lambda: load_bati(files + [new_file], DATE_FORMAT), full)
+            koreksi = _timed("penuh_koreksi_pasut", lambda: koreksi_pasut(bati, data_pasut, HWS, MSL, LWS), full)
+            _timed("penuh_utm", lambda: lonlat_to_utm_per_point(koreksi), full)
+            print(f"{'total penuh':<22} {sum(s for _, s in full):>9.3f} s")
+
+
+if __name__ == "__main__":
+    main()
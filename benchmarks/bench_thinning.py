@@ -0,0 +1,57 @@
+"""
+Benchmark thinning sounding (``sbes.thinning``): grid-hash tervektorisasi vs ``groupby`` pandas.
+
+Titik acak di area ``--area`` km x km dengan kedalaman 2-30 m; untuk tiap ukuran sel diukur
+``thin_indices`` (terdangkal dan median) dan pembanding ``sort_values`` + ``groupby().head(1)``
+(hasil terdangkal harus identik).
+
+    python benchmarks/bench_thinning.py --sizes 1000000 10000000 --radius 1 5 25
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.thinning import thin_indices  # noqa: E402
+
+
+def shoal_groupby(x, y, z, radius):
+    """ Pembanding: urutkan per sel lalu kedalaman, ambil baris pertama tiap sel """
+    df = pd.DataFrame({"cx": np.floor(x / radius), "cy": np.floor(y / radius), "z": z})
+    df = df.sort_values(["cx", "cy", "z"], ascending=[True, True, False], kind="stable")
+    return np.sort(df.groupby(["cx", "cy"], sort=False).head(1).index.to_numpy())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 10_000_000])
+    parser.add_argument("--radius", type=float, nargs="+", default=[1.0, 5.0, 25.0])
+    parser.add_argument("--area", type=float, default=10.0, help="Sisi area survei (km)")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    print(f"{'ping':>12} {'sel (m)':>8} {'metode':>8} {'waktu (s)':>10} {'sounding':>12}")
+    for n in args.sizes:
+        x = 500_000 + rng.uniform(0, args.area * 1000, n)
+        y = 9_200_000 + rng.uniform(0, args.area * 1000, n)
+        z = -rng.uniform(2, 30, n).astype(np.float32)
+        for radius in args.radius:
+            results = {}
+            runs = (("groupby", lambda: shoal_groupby(x, y, z, radius)),
+                    ("shoal", lambda: thin_indices(x, y, z, radius, "shoal")),
+                    ("median", lambda: thin_indices(x, y, z, radius, "median")))
+            for method, fn in runs:
+                t0 = time.perf_counter()
+                results[method] = fn()
+                print(f"{n:>12,} {radius:>8g} {method:>8} {time.perf_counter() - t0:>10.2f} {len(results[method]):>12,}")
+            assert np.array_equal(results["shoal"], results["groupby"])
+
+
+if __name__ == "__main__":
+    main()
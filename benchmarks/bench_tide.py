@@ -0,0 +1,49 @@
+"""
+Benchmark analisis harmonik pasut: fit kuadrat terkecil untuk rekaman sintetis sampling 1 menit.
+
+    python benchmarks/bench_tide.py --days 30 90 180
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.tide import CONSTITUENTS, harmonic_analysis  # noqa: E402
+
+# Amplitudo (m) dan fase (derajat) sintetis, campuran tipe semi-diurnal
+TRUE_CONSTITUENTS = {"M2": (0.80, 30), "S2": (0.35, 60), "K1": (0.40, 100), "O1": (0.30, 200),
+                     "N2": (0.15, 10), "M4": (0.05, 0)}
+
+
+def make_record(days, step_min=1, msl=1.6, noise=0.05, seed=0):
+    ts = np.datetime64("2023-01-01") + np.arange(0, days * 1440, step_min) * np.timedelta64(1, "m")
+    hours = np.arange(len(ts)) * step_min / 60.0
+    z = np.full(len(ts), msl)
+    for name, (amp, phase) in TRUE_CONSTITUENTS.items():
+        z += amp * np.cos(2 * np.pi * CONSTITUENTS[name] * hours - np.radians(phase))
+    return ts, z + np.random.default_rng(seed).normal(0, noise, len(ts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 90, 180])
+    args = parser.parse_args(argv)
+
+    print(f"{'hari':>6} {'sampel':>10} {'konstanta':>10} {'fit (s)':>8} {'MSL':>7} {'M2':>7} {'RMS':>7}")
+    for days in args.days:
+        ts, z = make_record(days)
+        t0 = time.perf_counter()
+        result = harmonic_analysis(ts, z)
+        elapsed = time.perf_counter() - t0
+        n_fit = int((~result.constituents["inferensi"]).sum())
+        print(f"{days:>6} {len(ts):>10,} {n_fit:>10} {elapsed:>8.3f} {result.msl:>7.3f} "
+              f"{result.amplitude('M2'):>7.3f} {result.rms:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark koreksi pasut: satu stasiun vs beberapa stasiun (IDW/terdekat) untuk jutaan ping.
+
+    python benchmarks/bench_tidecorr.py --sizes 1000000 5000000 --stations 1 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.tidecorr import TideStation, station_tide  # noqa: E402
+
+
+def make_stations(count, days=120, seed=0):
+    """ Rekaman 1 menit dengan jeda 2 jam di tengah; nol rambu tiap stasiun berbeda """
+    rng = np.random.default_rng(seed)
+    ts = np.datetime64("2023-01-01") + np.arange(0, days * 1440) * np.timedelta64(1, "m")
+    keep = np.ones(len(ts), dtype=bool)
+    keep[len(ts) // 2:len(ts) // 2 + 120] = False
+    hours = np.arange(len(ts)) / 60.0
+    stations = []
+    for k in range(count):
+        zero = rng.random()
+        z = zero + 1.5 + np.cos(2 * np.pi * 0.0805114007 * hours - k)
+        stations.append(TideStation(f"st{k}", ts[keep], z[keep], 110 + k * 0.5, -6.0,
+                                    (zero + 2.5, zero + 1.5, zero + 0.5)))
+    return stations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    parser.add_argument("--stations", type=int, nargs="+", default=[1, 3])
+    args = parser.parse_args(argv)
+
+    print(f"{'ping':>12} {'stasiun':>8} {'metode':>8} {'waktu (s)':>10} {'ter-flag':>9}")
+    for n in args.sizes:
+        rng = np.random.default_rng(1)
+        ping = np.datetime64("2023-01-01") + np.sort(rng.integers(0, 121 * 86400, n)).astype("timedelta64[s]")
+        lon, lat = 110 + rng.random(n) * 1.5, -6.0 + rng.random(n) * 0.1
+        for count in args.stations:
+            stations = make_stations(count)
+            for method in (["idw", "nearest"] if count > 1 else ["idw"]):
+                t0 = time.perf_counter()
+                _, _, flags = station_tide(ping, stations, lon, lat, method=method)
+                elapsed = time.perf_counter() - t0
+                print(f"{n:>12,} {count:>8} {method:>8} {elapsed:>10.2f} {int((flags > 0).sum()):>9,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark parsing timestamp: gabungan string + ``pd.to_datetime`` vs ``parse_timestamps``.
+
+    python benchmarks/bench_timeparse.py --sizes 1000000 5000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sbes.timeparse import parse_timestamps  # noqa: E402
+
+MONTHS = np.array(["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"])
+
+
+def make_columns(n, rate_hz=10, start="2023-07-01"):
+    """ Kolom tanggal (DD-Mon-YY) dan waktu (HH:MM:SS) ping berurutan, ``rate_hz`` ping per detik """
+    seconds = np.arange(n) // rate_hz
+    days = np.datetime64(start, "D") + (seconds // 86400).astype("timedelta64[D]")
+    day_text = pd.Series(pd.DatetimeIndex(np.unique(days)).strftime("%d-%b-%y"), dtype=object)
+    dates = day_text.to_numpy()[np.searchsorted(np.unique(days), days)]
+    sod = seconds % 86400
+    hms = np.char.zfill((sod // 3600).astype(str), 2)
+    times = np.char.add(np.char.add(np.char.add(np.char.add(
+        hms, ":"), np.char.zfill((sod // 60 % 60).astype(str), 2)), ":"), np.char.zfill((sod % 60).astype(str), 2))
+    return pd.Series(dates, dtype=str), pd.Series(times, dtype=str)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000_000, 5_000_000])
+    args = parser.parse_args(argv)
+
+    print(f"{'baris':>12} {'lama (s)':>9} {'baru (s)':>9} {'percepatan':>11} {'sama':>5}")
+    for n in args.sizes:
+        dates, times = make_columns(n)
+        t0 = time.perf_counter()
+        old = pd.to_datetime(dates + " " + times, format="%d-%b-%y %H:%M:%S", errors="coerce")
+        t_old = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        new = parse_timestamps(dates, times, "%d-%b-%y")
+        t_new = time.perf_counter() - t0
+        same = np.array_equal(old.to_numpy(dtype="datetime64[ns]"), new)
+        print(f"{n:>12,} {t_old:>9.2f} {t_new:>9.2f} {t_old / t_new:>10.1f}x {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Memori data per sesi: alur lama (salinan per tahap, float64, zona string) vs representasi
+ringkas (kolom dibagi antar tahap, float32, zona kategorikal, mask outlier).
+
+    python benchmarks/check_session_memory.py --rows 5000000
+"""
+
+import argparse
+import gc
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_projection import legacy_utm  # noqa: E402
+from sbes.pipeline import iqr_bounds, koreksi_pasut, lonlat_to_utm_per_point  # noqa: E402
+from sbes.survey import compact_frame, process_rss_mb, release_free_memory, total_nbytes  # noqa: E402
+
+HWS, MSL, LWS = 2.90, 1.59, 0.27
+
+
+def make_survey(n, seed=0):
+    """ Survei sintetis seperti hasil ingest lama (timestamp, lon/lat, kedalaman float64) """
+    rng = np.random.default_rng(seed)
+    t0 = np.datetime64("2023-07-01T00:00:00", "ns")
+    bati = pd.DataFrame({
+        "timestamp": t0 + np.arange(n) * np.timedelta64(200, "ms"),
+        "longitude": 113.5 + rng.random(n),
+        "latitude": -(6.0 + rng.random(n)),
+        "kedalaman": 5 + 20 * rng.random(n),
+    })
+    bati.loc[rng.random(n) < 0.001, "kedalaman"] = 500.0
+    pasut = pd.DataFrame({
+        "Timestamp": pd.date_range("2023-06-30", periods=24 * 40, freq="h"),
+        "Depth": 1.5 + np.sin(np.arange(24 * 40) / 2),
+    })
+    return bati, pasut
+
+
+def legacy_session(bati_drop, pasut):
+    """ Isi session state dengan alur lama: .copy() di setiap tahap, kolom float64, zona string """
+    lower, upper = iqr_bounds(bati_drop["kedalaman"])
+    inlier = (bati_drop["kedalaman"] >= lower) & (bati_drop["kedalaman"] <= upper)
+    bati_clean = bati_drop[inlier].copy()
+    bati_koreksi = bati_clean.copy()
+    bati_koreksi["pasut_interp"] = np.interp(
+        bati_koreksi["timestamp"].to_numpy().view(np.int64),
+        pasut["Timestamp"].to_numpy().astype("datetime64[ns]").view(np.int64),
+        pasut["Depth"].to_numpy(),
+    )
+    for col, datum in (("D_LWS", LWS), ("D_MSL", MSL), ("D_HWS", HWS)):
+        bati_koreksi[col] = -(bati_koreksi["kedalaman"] + (datum - bati_koreksi["pasut_interp"]))
+    final = bati_koreksi.copy()
+    x, y, zones = legacy_utm(final["longitude"].to_numpy(), final["latitude"].to_numpy())
+    final["Zona_UTM"] = zones
+    final["X_UTM"] = x
+    final["Y_UTM"] = y
+    return {"cleaned_bati_data": bati_drop, "bati_clean": bati_clean, "koreksi": bati_koreksi, "final_data": final}
+
+
+def compact_session(bati_drop, pasut):
+    """ Isi session state dengan alur baru: satu tabel dasar, kolom turunan dibagi, mask outlier """
+    bati_drop = compact_frame(bati_drop)
+    lower, upper = iqr_bounds(bati_drop["kedalaman"])
+    mask = ((bati_drop["kedalaman"] >= lower) & (bati_drop["kedalaman"] <= upper)).to_numpy()
+    bati_koreksi = koreksi_pasut(bati_drop, pasut, HWS, MSL, LWS)
+    final = lonlat_to_utm_per_point(bati_koreksi.copy(deep=False))
+    return {"cleaned_bati_data": bati_drop, "bati_mask": mask, "koreksi": bati_koreksi, "final_data": final}
+
+
+def _child(mode, rows):
+    """ Dijalankan di subprocess: resident memory setelah session state terisi (data mentah dilepas) """
+    base = process_rss_mb()
+    bati, pasut = make_survey(rows)
+    session = (legacy_session if mode == "lama" else compact_session)(bati, pasut)
+    del bati
+    gc.collect()
+    release_free_memory()
+    print(f"{process_rss_mb() - base:.0f}")
+
+
+def _child_rss(mode, rows):
+    out = subprocess.run(
+        [sys.executable, __file__, "--rows", str(rows), "--child", mode],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout.split()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--child", choices=["lama", "ringkas"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.rows)
+        return
+
+    bati, pasut = make_survey(args.rows)
+    legacy = total_nbytes(legacy_session(bati, pasut)) / 1024 / 1024
+    compact = total_nbytes(compact_session(bati, pasut)) / 1024 / 1024
+    print(f"{args.rows:,} ping, data sesi: lama {legacy:,.0f} MB, ringkas {compact:,.0f} MB, "
+          f"pengurangan {legacy / compact:.1f}x")
+    if process_rss_mb() is not None:
+        rss_legacy, rss_compact = _child_rss("lama", args.rows), _child_rss("ringkas", args.rows)
+        print(f"{args.rows:,} ping, resident memory: lama {rss_legacy:,.0f} MB, ringkas {rss_compact:,.0f} MB, "
+              f"pengurangan {rss_legacy / rss_compact:.1f}x")
+    assert legacy / compact >= 3, "target pengurangan memori 3x tidak tercapai"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Uji ingest streaming: proses file batimetri yang lebih besar dari anggaran memori
+dan pastikan puncak memori (RSS) tetap di bawah anggaran + ukuran kolom numerik hasil.
+
+    python benchmarks/check_streaming.py --rows 2000000 --budget-mb 32
+"""
+
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def write_log(path, n, seed=0, block=500_000):
+    """ Tulis file logger SBES sintetis (tab, tanpa header, °E/S) sebanyak ``n`` baris """
+    rng = np.random.default_rng(seed)
+    t0 = pd.Timestamp("2023-07-01 00:00:00")
+    with open(path, "w", encoding="latin1") as f:
+        for start in range(0, n, block):
+            m = min(block, n - start)
+            t = t0 + pd.to_timedelta(np.arange(start, start + m), unit="s")
+            df = pd.DataFrame({
+                "tanggal": t.strftime("%d-%b-%y"),
+                "waktu": t.strftime("%H:%M:%S"),
+                "lon": pd.Series(np.round(110.9 + rng.random(m) * 0.01, 7)).astype(str) + "°E",
+                "lat": pd.Series(np.round(6.9 + rng.random(m) * 0.01, 7)).astype(str) + "S",
+                "kedalaman": np.round(10 + rng.random(m) * 5, 2),
+            })
+            df.to_csv(f, sep="\t", header=False, index=False)
+
+
+def check_corrupt(tmp, rows=50_000, bad_row=40_000):
+    """ File dengan baris rusak di chunk akhir: streaming harus membuangnya utuh seperti ``load_bati`` """
+    from sbes.ingest import load_bati, stream_bati
+
+    good, bad = os.path.join(tmp, "baik.txt"), os.path.join(tmp, "rusak.txt")
+    write_log(good, rows // 2, seed=1)
+    write_log(bad, rows, seed=2)
+    with open(bad, encoding="latin1") as f:
+        lines = f.readlines()
+    lines[bad_row] = lines[bad_row].rstrip("\n") + "\tx\ty\n"
+    with open(bad, "w", encoding="latin1") as f:
+        f.writelines(lines)
+
+    expected = load_bati([good, bad], "%d-%b-%y")
+    streamed = stream_bati([good, bad], "%d-%b-%y", memory_budget_mb=1)
+    report = streamed.attrs["ingest_report"][1]
+    print(f"file rusak: load_bati={len(expected)} stream_bati={len(streamed)} error={report['error']!r}")
+    assert report["error"] and report["baris_valid"] == 0
+    assert len(streamed) == len(expected)
+    assert (streamed["file"] == 0).all()
+
+
+def _maxrss_mb():
+    """ Puncak RSS proses ini (VmHWM); ru_maxrss ikut terbawa dari proses induk setelah exec """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(path, budget_mb):
+    """ Dijalankan di subprocess agar pengukuran RSS bersih dari proses induk """
+    from sbes.ingest import COMPACT_ROW_BYTES, stream_bati
+
+    # Pemanasan dengan potongan kecil: inisialisasi sekali kernel string pyarrow/numpy (±15 MB,
+    # tidak bergantung ukuran data) tidak ikut dihitung sebagai memori kerja streaming
+    with open(path, "rb") as f:
+        head = io.BytesIO(b"".join(f.readline() for _ in range(2_000)))
+    stream_bati([head], "%d-%b-%y", memory_budget_mb=budget_mb)
+    del head
+    base = _maxrss_mb()
+    bati = stream_bati([path], "%d-%b-%y", memory_budget_mb=budget_mb)
+    peak = _maxrss_mb() - base
+    numeric_mb = len(bati) * COMPACT_ROW_BYTES / 1024 / 1024
+    assert bati["timestamp"].is_monotonic_increasing
+    assert bati["kedalaman"].dtype == np.float32
+    print(f"baris={len(bati)} puncak_tambahan={peak:.1f} MB numerik={numeric_mb:.1f} MB anggaran={budget_mb} MB")
+    # Batas atas: satu chunk string (anggaran) + kolom numerik + cadangan kapasitas buffer
+    assert peak <= budget_mb + 1.5 * numeric_mb, "puncak memori melebihi anggaran"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--budget-mb", type=float, default=32)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.child, args.budget_mb)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        check_corrupt(tmp)
+        path = os.path.join(tmp, "besar.txt")
+        write_log(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"ukuran file={size_mb:.1f} MB anggaran={args.budget_mb} MB")
+        assert size_mb > args.budget_mb, "file uji harus lebih besar dari anggaran"
+        subprocess.run(
+            [sys.executable, __file__, "--child", path, "--budget-mb", str(args.budget_mb)],
+            check=True,
+        )
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
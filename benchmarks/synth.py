@@ -0,0 +1,146 @@
+"""
+Generator data SBES sintetis yang deterministik (seed tetap) untuk benchmark.
+
+File batimetri sama dengan keluaran logger yang dibaca ``sbes.ingest``: tab, tanpa header,
+kolom tanggal ``DD-Mon-YY``, waktu ``HH:MM:SS``, longitude ``110.1234567°E``, latitude
+``6.1234567S`` dan kedalaman (m), encoding latin1. Kapal menyapu lajur timur-barat bolak-balik;
+kedalaman = dasar laut miring + pasut + noise, ditambah spike dan baris rusak (koordinat
+kosong/tidak terbaca, tanggal salah, kedalaman kosong). File pasut: ``DD/MM/YYYY``,
+``HH:MM:SS``, tinggi muka air (m) tiap 10 menit dari konstanta M2, S2, K1, O1.
+
+Ditulis per blok sehingga 50 juta ping pun tidak perlu ditampung di memori.
+
+    python benchmarks/synth.py /tmp/sbes_sintetis --pings 1000000 --files 4
+"""
+
+import argparse
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+START = "2023-07-01 00:00:00"
+LON0, LAT0 = 110.9, -6.9
+M_PER_DEG = 111_320.0
+
+# Amplitudo (m) dan fase (derajat) pasut sintetis; frekuensi dalam siklus per jam
+TIDE = {"M2": (0.0805114007, 0.80, 30), "S2": (0.0833333333, 0.35, 60),
+        "K1": (0.0417807462, 0.40, 100), "O1": (0.0387306544, 0.30, 200)}
+TIDE_MSL = 1.6
+
+
+def tide_height(hours):
+    """ Tinggi muka air sintetis (m) pada jam sejak ``START`` """
+    z = np.full(np.shape(hours), TIDE_MSL)
+    for freq, amp, phase in TIDE.values():
+        z = z + amp * np.cos(2 * np.pi * freq * hours - np.radians(phase))
+    return z
+
+
+def track(index, rate_hz=5, speed=2.0, line_length=2000.0, spacing=25.0):
+    """
+    Detik sejak ``START`` serta lon/lat tiap ping (indeks global) pada lajur bolak-balik.
+    """
+    seconds = index / rate_hz
+    along = seconds * speed
+    line = np.floor(along / line_length)
+    s = along - line * line_length
+    x = np.where(line % 2 == 0, s, line_length - s)
+    y = line * spacing
+    lon = LON0 + x / (M_PER_DEG * np.cos(np.radians(LAT0)))
+    lat = LAT0 - y / M_PER_DEG
+    return seconds, lon, lat, x, y
+
+
+@functools.lru_cache(maxsize=1)
+def _time_table():
+    """ Teks ``HH:MM:SS`` untuk setiap detik dalam sehari """
+    sod = np.arange(86400)
+    text = pd.Series(sod // 3600).map("{:02d}".format) + ":" + \
+        pd.Series(sod // 60 % 60).map("{:02d}".format) + ":" + pd.Series(sod % 60).map("{:02d}".format)
+    return text.to_numpy(dtype=object)
+
+
+def bati_block(start, stop, rate_hz=5, seed=0, spike_rate=1e-3, bad_rate=1e-3):
+    """ Baris teks ping ``start`` s/d ``stop`` (indeks global); hasil sama untuk seed yang sama """
+    rng = np.random.default_rng([seed, start])
+    index = np.arange(start, stop)
+    n = len(index)
+    seconds, lon, lat, x, y = track(index, rate_hz)
+    depth = 8 + x / 200 + y / 500 + 0.5 * np.sin(x / 150) + rng.normal(0, 0.03, n)
+    depth += tide_height(seconds / 3600) - TIDE_MSL
+    spikes = rng.random(n) < spike_rate
+    depth[spikes] = np.where(rng.random(int(spikes.sum())) < 0.5, 0.3, depth[spikes] * 8)
+
+    whole = np.floor(seconds).astype(np.int64)
+    days = pd.Timestamp(START) + pd.to_timedelta(np.unique(whole // 86400), unit="D")
+    date_text = np.asarray(days.strftime("%d-%b-%y"), dtype=object)
+    date_col = date_text[np.searchsorted(np.unique(whole // 86400), whole // 86400)]
+    time_col = _time_table()[whole % 86400]
+    lon_col = pd.Series(np.round(lon, 7)).astype(str) + "°E"
+    lat_col = pd.Series(np.round(-lat, 7)).astype(str) + "S"
+    depth_col = pd.Series(np.round(depth, 2)).astype(str)
+
+    # Baris rusak: koordinat kosong/tidak terbaca, tanggal salah, kedalaman kosong
+    kind = np.where(rng.random(n) < bad_rate, rng.integers(1, 5, n), 0)
+    lon_col[kind == 1] = "xx.x°E"
+    lat_col[kind == 2] = ""
+    date_col = np.where(kind == 3, "32-Jul-23", date_col)
+    depth_col[kind == 4] = ""
+    return pd.DataFrame({0: date_col, 1: time_col, 2: lon_col, 3: lat_col, 4: depth_col})
+
+
+def write_bati(paths, pings, rate_hz=5, seed=0, block=1_000_000):
+    """ Tulis ``pings`` ping berurutan waktu, dibagi rata ke file ``paths`` """
+    bounds = np.linspace(0, pings, len(paths) + 1).astype(np.int64)
+    for path, lo, hi in zip(paths, bounds[:-1], bounds[1:]):
+        with open(path, "w", encoding="latin1", newline="\n") as f:
+            for start in range(lo, hi, block):
+                bati_block(start, min(start + block, hi), rate_hz, seed).to_csv(
+                    f, sep="\t", header=False, index=False)
+
+
+def write_pasut(path, pings, rate_hz=5, step_min=10, pad_hours=24):
+    """ Rekaman pasut yang menutupi seluruh durasi survei ditambah ``pad_hours`` di kedua sisi """
+    duration_h = pings / rate_hz / 3600
+    minutes = np.arange(-pad_hours * 60, (duration_h + pad_hours) * 60 + step_min, step_min)
+    ts = pd.Timestamp(START) + pd.to_timedelta(minutes, unit="min")
+    df = pd.DataFrame({0: ts.strftime("%d/%m/%Y"), 1: ts.strftime("%H:%M:%S"),
+                       2: np.round(tide_height(minutes / 60), 3)})
+    df.to_csv(path, sep="\t", header=False, index=False)
+
+
+def make_dataset(out_dir, pings, files=1, rate_hz=5, seed=0):
+    """
+    Buat (atau pakai ulang) dataset di subfolder ``out_dir`` yang dinamai dari parameternya;
+    kembalikan ``(daftar_file_batimetri, file_pasut)``.
+    """
+    root = os.path.join(out_dir, f"sbes_{pings}_f{files}_r{rate_hz:g}_s{seed}")
+    bati_dir = os.path.join(root, "data_bati")
+    paths = [os.path.join(bati_dir, f"log_{k:02d}.txt") for k in range(files)]
+    pasut = os.path.join(root, "pasut.txt")
+    done = os.path.join(root, ".selesai")
+    if not os.path.exists(done):
+        os.makedirs(bati_dir, exist_ok=True)
+        write_bati(paths, pings, rate_hz, seed)
+        write_pasut(pasut, pings, rate_hz)
+        open(done, "w").close()
+    return paths, pasut
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir")
+    parser.add_argument("--pings", type=int, default=1_000_000)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=5, help="Ping per detik")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    paths, pasut = make_dataset(args.out_dir, args.pings, args.files, args.rate, args.seed)
+    size_mb = sum(os.path.getsize(p) for p in paths) / 1024 / 1024
+    print(f"{len(paths)} file batimetri ({size_mb:.1f} MB) dan {pasut}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Paket pengolahan data batimetri SBES (Single Beam Echosounder).
+
+Berisi tahapan pengolahan yang dapat dipakai tanpa antarmuka Streamlit:
+ingest -> cleaning -> outlier -> analisis harmonik & koreksi pasut -> UTM -> export XYZ (teks/biner) / grid DEM.
+"""
+
+from .basemap import bin_soundings, find_coastline_source, plot_sounding_map
+from .cache import StageCache, content_hash, file_hash
+from .coords import parse_coordinates, parse_latitude, parse_longitude
+from .crossline import crossline_pairs, crossline_qc, crossline_stats, find_crossings
+from .export import (
+    ExportItem,
+    export_files,
+    format_fixed,
+    item_bytes,
+    plan_export,
+    read_xyz32,
+    write_export,
+    write_zip,
+)
+from .grid import Grid, export_grids, grid_points, grid_survey, to_esri_ascii, to_geotiff, to_npz
+from .ingest import (
+    clean_bati,
+    clean_latitude,
+    clean_longitude,
+    detect_bati_format,
+    detect_pasut_formats,
+    load_bati,
+    load_pasut,
+    parse_bati_file,
+    read_bati_files,
+    sample_rows,
+    stream_bati,
+)
+from .instrument import StageProbe, StageRecord, measure_peak, read_log, start_profile, stop_profile
+from .jobs import Job, JobCancelled, JobManager
+from .lines import (
+    LINE_COLUMN,
+    LINE_DEFAULTS,
+    line_groups,
+    line_stats,
+    local_xy,
+    map_lines,
+    segment_lines,
+    survey_lines,
+)
+from .merge import (
+    DUPLICATE_TOL,
+    duplicate_mask,
+    match_existing,
+    merge_columns,
+    merge_frames,
+    merge_order,
+    run_bounds,
+    run_clusters,
+)
+from .lod import downsample_indices, lttb_indices, minmax_indices
+from .outliers import detect_outliers, iqr_bounds, iqr_outliers, rolling_mad_outliers
+from .parsecache import ParseCache
+from .pipeline import (
+    DATUM_COLUMNS,
+    SurveyResult,
+    export_crossline,
+    export_grid,
+    export_xyz,
+    koreksi_pasut,
+    koreksi_pasut_store,
+    lonlat_to_utm_per_point,
+    process_survey,
+    utm_store,
+)
+from .projection import get_transformer, project_utm, utm_epsg, zone_categorical
+from .store import ProjectStore
+from .survey import compact_frame, memory_report, select_rows
+from .tide import TideAnalysis, analyze_pasut, harmonic_analysis, select_constituents
+from .thinning import THIN_METHODS, cell_codes, thin_indices
+from .tidecorr import TideStation, TideZone, interp_station, load_tide_zones, station_tide
+from .timeparse import (
+    FORMAT_OPTIONS_BATI,
+    FORMAT_OPTIONS_PASUT_DATE,
+    FORMAT_OPTIONS_PASUT_TIME,
+    detect_format,
+    parse_dates,
+    parse_time_of_day,
+    parse_timestamps,
+)
+
+__all__ = [
+    "DATUM_COLUMNS",
+    "DUPLICATE_TOL",
+    "ExportItem",
+    "FORMAT_OPTIONS_BATI",
+    "FORMAT_OPTIONS_PASUT_DATE",
+    "FORMAT_OPTIONS_PASUT_TIME",
+    "Grid",
+    "Job",
+    "JobCancelled",
+    "JobManager",
+    "LINE_COLUMN",
+    "LINE_DEFAULTS",
+    "ParseCache",
+    "ProjectStore",
+    "StageCache",
+    "StageProbe",
+    "StageRecord",
+    "SurveyResult",
+    "THIN_METHODS",
+    "TideAnalysis",
+    "TideStation",
+    "TideZone",
+    "analyze_pasut",
+    "bin_soundings",
+    "cell_codes",
+    "clean_bati",
+    "clean_latitude",
+    "clean_longitude",
+    "compact_frame",
+    "content_hash",
+    "crossline_pairs",
+    "crossline_qc",
+    "crossline_stats",
+    "detect_bati_format",
+    "detect_format",
+    "detect_outliers",
+    "detect_pasut_formats",
+    "downsample_indices",
+    "duplicate_mask",
+    "export_crossline",
+    "export_files",
+    "export_grid",
+    "export_grids",
+    "export_xyz",
+    "file_hash",
+    "find_coastline_source",
+    "find_crossings",
+    "format_fixed",
+    "get_transformer",
+    "grid_points",
+    "grid_survey",
+    "harmonic_analysis",
+    "interp_station",
+    "iqr_bounds",
+    "iqr_outliers",
+    "item_bytes",
+    "koreksi_pasut",
+    "koreksi_pasut_store",
+    "line_groups",
+    "line_stats",
+    "load_bati",
+    "load_pasut",
+    "load_tide_zones",
+    "local_xy",
+    "lonlat_to_utm_per_point",
+    "lttb_indices",
+    "map_lines",
+    "match_existing",
+    "measure_peak",
+    "memory_report",
+    "merge_columns",
+    "merge_frames",
+    "merge_order",
+    "minmax_indices",
+    "parse_bati_file",
+    "parse_coordinates",
+    "parse_dates",
+    "parse_latitude",
+    "parse_longitude",
+    "parse_time_of_day",
+    "parse_timestamps",
+    "plan_export",
+    "plot_sounding_map",
+    "process_survey",
+    "project_utm",
+    "read_bati_files",
+    "read_log",
+    "read_xyz32",
+    "rolling_mad_outliers",
+    "run_bounds",
+    "run_clusters",
+    "sample_rows",
+    "segment_lines",
+    "select_constituents",
+    "select_rows",
+    "start_profile",
+    "station_tide",
+    "stop_profile",
+    "stream_bati",
+    "survey_lines",
+    "thin_indices",
+    "to_esri_ascii",
+    "to_geotiff",
+    "to_npz",
+    "utm_epsg",
+    "utm_store",
+    "write_export",
+    "write_zip",
+    "zone_categorical",
+]
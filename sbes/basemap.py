@@ -0,0 +1,285 @@
+"""
+Peta sebaran sounding tanpa koneksi internet.
+
+- Garis pantai dibaca dari file lokal (GeoJSON atau shapefile), tidak pernah diunduh:
+  ``$SBES_COASTLINE``, folder ``data/coastline/`` di repo, atau shapefile Natural Earth
+  yang sudah ada di cache data Cartopy.
+- Geometri dipotong sekali per extent survei dan di-cache; basemap (garis pantai) juga
+  di-render sekali per extent menjadi raster RGBA.
+- Sounding tidak digambar satu marker per titik, melainkan di-bin ke grid piksel
+  (kedalaman rata-rata atau kepadatan titik) lalu ditampilkan sebagai raster.
+"""
+
+import glob
+import json
+import os
+import struct
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+
+COASTLINE_ENV = "SBES_COASTLINE"
+COASTLINE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "coastline")
+_NATURAL_EARTH = ("ne_10m_coastline.shp", "ne_50m_coastline.shp", "ne_110m_coastline.shp")
+
+MAP_MODES = {
+    "Kedalaman rata-rata": "mean",
+    "Kepadatan titik": "count",
+}
+
+
+# --- Sumber garis pantai ---
+
+def _cartopy_data_dirs():
+    """ Folder data Cartopy (tanpa mengimpor Cartopy jika tidak terpasang) """
+    dirs = []
+    try:
+        import cartopy
+        dirs += [cartopy.config.get("pre_existing_data_dir"), cartopy.config.get("data_dir")]
+    except ImportError:
+        pass
+    xdg = os.environ.get("XDG_DATA_HOME", os.path.join(os.path.expanduser("~"), ".local", "share"))
+    dirs.append(os.path.join(xdg, "cartopy"))
+    return [d for d in dirs if d]
+
+
+def find_coastline_source():
+    """ Path file garis pantai lokal pertama yang ditemukan; None jika tidak ada """
+    candidates = []
+    if os.environ.get(COASTLINE_ENV):
+        candidates.append(os.environ[COASTLINE_ENV])
+    for pattern in ("*.geojson", "*.json", "*.shp"):
+        candidates += sorted(glob.glob(os.path.join(COASTLINE_DIR, pattern)))
+    for data_dir in _cartopy_data_dirs():
+        for name in _NATURAL_EARTH:
+            candidates.append(os.path.join(data_dir, "shapefiles", "natural_earth", "physical", name))
+    return next((c for c in candidates if os.path.isfile(c)), None)
+
+
+def _overlaps(bbox, extent):
+    xmin, ymin, xmax, ymax = bbox
+    return xmax >= extent[0] and xmin <= extent[1] and ymax >= extent[2] and ymin <= extent[3]
+
+
+def _read_shapefile(path, extent):
+    """ Garis (PolyLine/Polygon) dari file .shp yang bbox-nya beririsan dengan extent """
+    with open(path, "rb") as f:
+        data = f.read()
+    lines = []
+    pos = 100
+    while pos + 8 <= len(data):
+        _, length = struct.unpack(">ii", data[pos:pos + 8])
+        start, pos = pos + 8, pos + 8 + 2 * length
+        shape_type, = struct.unpack("<i", data[start:start + 4])
+        # 3/5 = PolyLine/Polygon, 13/15 = versi Z, 23/25 = versi M (hanya X/Y yang dipakai)
+        if shape_type not in (3, 5, 13, 15, 23, 25):
+            continue
+        if not _overlaps(struct.unpack("<4d", data[start + 4:start + 36]), extent):
+            continue
+        n_parts, n_points = struct.unpack("<2i", data[start + 36:start + 44])
+        parts = np.frombuffer(data, "<i4", n_parts, start + 44)
+        points = np.frombuffer(data, "<f8", 2 * n_points, start + 44 + 4 * n_parts).reshape(-1, 2)
+        lines += np.split(points, parts[1:])
+    return lines
+
+
+def _geojson_lines(geometry):
+    kind, coords = geometry.get("type"), geometry.get("coordinates")
+    if kind == "LineString":
+        return [coords]
+    if kind in ("MultiLineString", "Polygon"):
+        return list(coords)
+    if kind == "MultiPolygon":
+        return [ring for polygon in coords for ring in polygon]
+    if kind == "GeometryCollection":
+        return [line for g in geometry.get("geometries", []) for line in _geojson_lines(g)]
+    return []
+
+
+def _read_geojson(path, extent):
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    features = doc.get("features", [doc]) if doc.get("type") == "FeatureCollection" else [doc]
+    lines = []
+    for feature in features:
+        geometry = feature.get("geometry", feature)
+        for coords in _geojson_lines(geometry or {}):
+            line = np.asarray(coords, dtype=np.float64)[:, :2]
+            if len(line) and _overlaps((*line.min(axis=0), *line.max(axis=0)), extent):
+                lines.append(line)
+    return lines
+
+
+def clip_lines(lines, extent):
+    """
+    Gabungkan garis menjadi satu array (N, 2) dengan pemisah NaN, hanya bagian di dalam extent.
+
+    Titik di luar extent dibuang kecuali tetangga titik di dalam, agar garis tetap digambar
+    sampai tepi peta.
+    """
+    pieces = []
+    for line in lines:
+        x, y = line[:, 0], line[:, 1]
+        inside = (x >= extent[0]) & (x <= extent[1]) & (y >= extent[2]) & (y <= extent[3])
+        if not inside.any():
+            continue
+        keep = inside.copy()
+        keep[1:] |= inside[:-1]
+        keep[:-1] |= inside[1:]
+        # Setiap rangkaian titik yang dipertahankan menjadi satu potongan garis
+        breaks = np.flatnonzero(np.diff(keep.astype(np.int8)))
+        for run in np.split(np.arange(len(line)), breaks + 1):
+            if keep[run[0]] and len(run) > 1:
+                pieces += [line[run], np.full((1, 2), np.nan)]
+    return np.concatenate(pieces) if pieces else np.empty((0, 2))
+
+
+@lru_cache(maxsize=32)
+def coastline_for_extent(extent, source=None):
+    """ Garis pantai terpotong untuk extent ``(lon_min, lon_max, lat_min, lat_max)``; di-cache per extent """
+    source = source or find_coastline_source()
+    if source is None:
+        return np.empty((0, 2))
+    reader = _read_shapefile if source.lower().endswith(".shp") else _read_geojson
+    return clip_lines(reader(source, extent), extent)
+
+
+# --- Raster sounding dan basemap ---
+
+def map_extent(lon, lat, pad_fraction=0.1, min_pad=0.01, step=0.001):
+    """
+    Extent data ditambah margin (``pad_fraction`` dari bentang data, minimal ``min_pad`` derajat),
+    dibulatkan ke ``step`` derajat agar cache basemap sering kena.
+    """
+    lon_min, lon_max = float(np.nanmin(lon)), float(np.nanmax(lon))
+    lat_min, lat_max = float(np.nanmin(lat)), float(np.nanmax(lat))
+    pad = max(pad_fraction * max(lon_max - lon_min, lat_max - lat_min), min_pad)
+    return (
+        round(np.floor((lon_min - pad) / step) * step, 6), round(np.ceil((lon_max + pad) / step) * step, 6),
+        round(np.floor((lat_min - pad) / step) * step, 6), round(np.ceil((lat_max + pad) / step) * step, 6),
+    )
+
+
+def raster_shape(extent, width_px, max_px=2000):
+    """ (tinggi, lebar) raster dengan piksel kurang lebih persegi di permukaan bumi """
+    lon_span = extent[1] - extent[0]
+    lat_span = extent[3] - extent[2]
+    aspect = lat_span / (lon_span * np.cos(np.radians((extent[2] + extent[3]) / 2)))
+    ny, nx = width_px * aspect, width_px
+    scale = min(1.0, max_px / max(ny, nx))
+    return max(int(round(ny * scale)), 1), max(int(round(nx * scale)), 1)
+
+
+def bin_soundings(lon, lat, values, extent, shape, statistic="mean"):
+    """
+    Bin titik ke grid ``shape`` (baris 0 = selatan) dalam O(n) dengan ``np.bincount``.
+
+    ``statistic``: ``"mean"`` = rata-rata ``values`` per sel, ``"count"`` = jumlah titik.
+    Sel kosong bernilai NaN.
+    """
+    ny, nx = shape
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    ix = ((lon - extent[0]) * (nx / (extent[1] - extent[0]))).astype(np.int64)
+    iy = ((lat - extent[2]) * (ny / (extent[3] - extent[2]))).astype(np.int64)
+    valid = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    flat = iy[valid] * nx + ix[valid]
+    count = np.bincount(flat, minlength=nx * ny).astype(np.float64)
+    if statistic == "count":
+        grid = count
+    elif statistic == "mean":
+        total = np.bincount(flat, weights=np.asarray(values, dtype=np.float64)[valid], minlength=nx * ny)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grid = total / count
+    else:
+        raise ValueError(f"statistic harus 'mean' atau 'count', bukan {statistic!r}")
+    grid[count == 0] = np.nan
+    return grid.reshape(ny, nx)
+
+
+def dilate_cells(grid, iterations=1):
+    """
+    Isi sel kosong (NaN) yang bertetangga dengan sel berisi memakai nilai tetangganya, agar lajur
+    survei selebar satu piksel tetap terlihat setelah gambar diperkecil.
+    """
+    grid = grid.copy()
+    for _ in range(iterations):
+        filled = grid.copy()
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if dy == 0 and dx == 0:
+                    continue
+                shifted = np.full_like(grid, np.nan)
+                shifted[max(dy, 0):grid.shape[0] + min(dy, 0), max(dx, 0):grid.shape[1] + min(dx, 0)] = \
+                    grid[max(-dy, 0):grid.shape[0] + min(-dy, 0), max(-dx, 0):grid.shape[1] + min(-dx, 0)]
+                empty = np.isnan(filled)
+                filled[empty] = shifted[empty]
+        grid = filled
+    return grid
+
+
+@lru_cache(maxsize=16)
+def render_basemap(extent, shape, source=None):
+    """ Raster RGBA garis pantai (latar transparan) untuk extent dan ukuran raster; di-cache """
+    ny, nx = shape
+    fig = Figure(figsize=(nx / 100, ny / 100), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+    fig.patch.set_alpha(0)
+    ax.patch.set_alpha(0)
+    coast = coastline_for_extent(extent, source)
+    if len(coast):
+        ax.plot(coast[:, 0], coast[:, 1], color="black", linewidth=0.6)
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def _degree_formatter(positive, negative):
+    return FuncFormatter(lambda v, _: f"{abs(v):.2f}°{positive if v >= 0 else negative}")
+
+
+def plot_sounding_map(lon, lat, depth, mode="mean", width_px=600, source=None, title=None):
+    """
+    Peta sebaran sounding: raster hasil binning + garis pantai lokal di atasnya.
+
+    ``mode``: ``"mean"`` (kedalaman rata-rata per piksel) atau ``"count"`` (kepadatan titik).
+    Mengembalikan figure Matplotlib.
+    """
+    import matplotlib.pyplot as plt
+
+    extent = map_extent(lon, lat)
+    shape = raster_shape(extent, width_px)
+    grid = dilate_cells(bin_soundings(lon, lat, depth, extent, shape, statistic=mode))
+
+    fig, ax = plt.subplots(figsize=(10, 8))
+    ax.set_facecolor("lightblue")
+    image_extent = [extent[0], extent[1], extent[2], extent[3]]
+    if mode == "count":
+        im = ax.imshow(grid, origin="lower", extent=image_extent, cmap="viridis",
+                       norm=LogNorm(vmin=1, vmax=max(np.nanmax(grid), 1)), interpolation="nearest")
+        label = "Jumlah titik per piksel"
+    else:
+        # Warna dari kedalaman negatif seperti plot sebelumnya (palet turbo_r)
+        im = ax.imshow(-grid, origin="lower", extent=image_extent, cmap="turbo_r", interpolation="nearest")
+        label = "Kedalaman (m)"
+    ax.imshow(render_basemap(extent, shape, source), extent=image_extent, interpolation="nearest")
+    cbar = fig.colorbar(im, ax=ax, shrink=0.7)
+    cbar.set_label(label)
+
+    ax.set_xlim(extent[0], extent[1])
+    ax.set_ylim(extent[2], extent[3])
+    ax.set_aspect(1 / np.cos(np.radians((extent[2] + extent[3]) / 2)))
+    ax.xaxis.set_major_formatter(_degree_formatter("E", "W"))
+    ax.yaxis.set_major_formatter(_degree_formatter("N", "S"))
+    ax.tick_params(labelsize=8)
+    ax.grid(True, linewidth=0.5, color="gray", alpha=0.5, linestyle="--")
+    if title:
+        ax.set_title(title, fontsize=14, weight="bold")
+    return fig
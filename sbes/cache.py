@@ -0,0 +1,174 @@
+"""
+Cache hasil tahapan pengolahan berdasarkan hash isi input.
+
+Setiap tahap diberi kunci dari hash input-nya (isi file, format tanggal, nilai datum,
+keputusan outlier, kunci tahap sebelumnya). Jika kunci sama, hasil diambil dari cache
+sehingga rerun Streamlit tidak menghitung ulang. Memori dibatasi dengan eviksi LRU.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _update_hash(h, part):
+    """ Masukkan satu bagian input ke dalam objek hash secara rekursif """
+    if part is None:
+        h.update(b"\x00None")
+    elif isinstance(part, bytes):
+        h.update(b"\x01" + len(part).to_bytes(8, "little"))
+        h.update(part)
+    elif isinstance(part, str):
+        _update_hash(h, part.encode("utf-8"))
+    elif isinstance(part, (bool, int, float, np.integer, np.floating)):
+        h.update(b"\x02" + repr(part).encode())
+    elif isinstance(part, (list, tuple)):
+        h.update(b"\x03" + len(part).to_bytes(8, "little"))
+        for p in part:
+            _update_hash(h, p)
+    elif isinstance(part, dict):
+        _update_hash(h, sorted(part.items(), key=lambda kv: repr(kv[0])))
+    elif isinstance(part, np.ndarray):
+        h.update(b"\x04" + str(part.dtype).encode() + repr(part.shape).encode())
+        h.update(np.ascontiguousarray(part).view(np.uint8).tobytes())
+    elif isinstance(part, (pd.DataFrame, pd.Series)):
+        names = list(part.columns) if isinstance(part, pd.DataFrame) else [part.name]
+        h.update(b"\x05" + repr(names).encode())
+        _update_hash(h, pd.util.hash_pandas_object(part, index=False).to_numpy())
+    elif hasattr(part, "getvalue"):
+        # File upload (misal UploadedFile Streamlit): hash isi file
+        _update_hash(h, part.getvalue())
+    else:
+        _update_hash(h, repr(part))
+
+
+def content_hash(*parts):
+    """ Hash heksadesimal dari semua input (bytes, teks, angka, array, DataFrame, file upload) """
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+def file_hash(f, block=1 << 20):
+    """ Hash isi file (path, bytes atau file-like, misal UploadedFile Streamlit) """
+    h = hashlib.blake2b(digest_size=16)
+    if isinstance(f, bytes):
+        h.update(f)
+    elif isinstance(f, (str, os.PathLike)):
+        with open(f, "rb") as fh:
+            for chunk in iter(lambda: fh.read(block), b""):
+                h.update(chunk)
+    elif hasattr(f, "getvalue"):
+        h.update(f.getvalue())
+    else:
+        f.seek(0)
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk if isinstance(chunk, bytes) else chunk.encode("latin1"))
+        f.seek(0)
+    return h.hexdigest()
+
+
+def estimate_nbytes(value):
+    """ Perkiraan ukuran memori sebuah hasil tahap (byte) """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class StageCache:
+    """
+    Cache LRU untuk hasil tahapan dengan batas memori ``max_bytes``.
+
+    Nilai yang disimpan tidak disalin; pemanggil tidak boleh mengubah (mutate) hasil dari cache.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # (tahap, kunci) -> (nilai, ukuran)
+        self._bytes = 0
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    def _stat(self, stage):
+        return self._stats.setdefault(stage, {"hit": 0, "miss": 0})
+
+    def get_or_compute(self, stage, key, compute):
+        """ Ambil hasil tahap ``stage`` untuk ``key`` dari cache, atau hitung dengan ``compute()`` """
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is not None:
+                self._entries.move_to_end((stage, key))
+                self._stat(stage)["hit"] += 1
+                return entry[0]
+            self._stat(stage)["miss"] += 1
+        value = compute()
+        self.put(stage, key, value)
+        return value
+
+    def get(self, stage, key, default=None):
+        """ Hasil tahap dari cache tanpa menghitung (``default`` jika belum ada) """
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is None:
+                return default
+            self._entries.move_to_end((stage, key))
+            self._stat(stage)["hit"] += 1
+            return entry[0]
+
+    def put(self, stage, key, value):
+        nbytes = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop((stage, key), None)
+            if old is not None:
+                self._bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[(stage, key)] = (value, nbytes)
+            self._bytes += nbytes
+            # Eviksi LRU sampai di bawah batas memori
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._stats.clear()
+
+    def items(self):
+        """ Daftar ((tahap, kunci), nilai) yang tersimpan """
+        with self._lock:
+            return [(k, v) for k, (v, _) in self._entries.items()]
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def summary(self):
+        """ Ringkasan per tahap: jumlah hit/miss, entri dan ukuran memori (MB) """
+        with self._lock:
+            rows = {}
+            for stage, stat in self._stats.items():
+                rows[stage] = {"hit": stat["hit"], "miss": stat["miss"], "entri": 0, "MB": 0.0}
+            for (stage, _), (_, nbytes) in self._entries.items():
+                row = rows.setdefault(stage, {"hit": 0, "miss": 0, "entri": 0, "MB": 0.0})
+                row["entri"] += 1
+                row["MB"] += nbytes / 1024 / 1024
+        return pd.DataFrame.from_dict(rows, orient="index", columns=["hit", "miss", "entri", "MB"])
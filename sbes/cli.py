@@ -0,0 +1,257 @@
+"""
+Command-line untuk memproses survei batimetri tanpa antarmuka Streamlit.
+
+Contoh:
+    python -m sbes survei_01/ survei_02/ --pasut pasut.txt --hws 2.90 --msl 1.59 --lws 0.27
+
+Datum yang tidak diisi diturunkan dari analisis harmonik file pasut (``--tide-datum``).
+
+Setiap direktori survei berisi file ``*.txt`` batimetri (atau subfolder ``data_bati``).
+Beberapa survei diproses bersamaan dalam process pool. Dengan ``--proyek DIR`` hasil tiap survei
+disimpan di ``DIR/<nama_survei>`` sehingga hari survei berikutnya cukup ditambahkan:
+
+    python -m sbes survei_01/ --pasut pasut.txt --proyek proyek/
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .lines import LINE_DEFAULTS
+from .pipeline import process_survey
+
+
+def find_bati_files(survey_dir, pattern="*.txt"):
+    """ Cari file batimetri dalam direktori survei (utamakan subfolder data_bati jika ada) """
+    data_dir = os.path.join(survey_dir, "data_bati")
+    if not os.path.isdir(data_dir):
+        data_dir = survey_dir
+    return sorted(glob.glob(os.path.join(data_dir, pattern)))
+
+
+def outlier_params(args):
+    """ Parameter ``detect_outliers`` dari argumen command-line """
+    if args.outlier_method != "rolling":
+        return {}
+    return {"window": args.window, "window_seconds": args.window_seconds, "k": args.mad_k}
+
+
+def line_params(args):
+    """ Parameter ``survey_lines`` dari argumen command-line (None = tanpa segmentasi lajur) """
+    if not (args.lajur or args.xyz_per_lajur):
+        return None
+    params = {"max_gap_s": args.lajur_gap, "max_turn_deg": args.lajur_belok, "min_pings": args.lajur_min_ping}
+    if args.lajur_kecepatan:
+        params["min_speed"], params["max_speed"] = args.lajur_kecepatan
+    return params
+
+
+def grid_params(args):
+    """ Parameter ``export_grid`` dari argumen command-line (None = tanpa grid) """
+    if not args.grid_cell:
+        return None
+    return {"cell_size": args.grid_cell, "method": args.grid_method, "radius": args.grid_radius,
+            "formats": tuple(args.grid_format or ["asc"])}
+
+
+def tide_params(args):
+    """ Parameter koreksi pasut multi-stasiun dari argumen command-line (None = satu stasiun, jeda otomatis) """
+    params = {}
+    if args.stasiun or args.zona_pasut:
+        params.update(
+            pasut_lonlat=tuple(args.pasut_lonlat),
+            stations=[(path, float(lon), float(lat)) for path, lon, lat in args.stasiun or []],
+            method="zona" if args.zona_pasut else args.blend,
+            power=args.idw_power,
+        )
+        if args.zona_pasut:
+            params["zones"] = args.zona_pasut
+    if args.max_gap is not None:
+        params["max_gap_s"] = args.max_gap * 60.0
+    return params or None
+
+
+def run_survey(survey_dir, args):
+    """ Proses satu survei dan tulis file XYZ; dijalankan di dalam worker process """
+    bati_files = find_bati_files(survey_dir, args.pattern)
+    if not bati_files:
+        raise FileNotFoundError(f"Tidak ada file batimetri di {survey_dir}")
+    survey_name = os.path.basename(os.path.normpath(survey_dir))
+    out_dir = os.path.join(args.output, survey_name)
+    result = process_survey(
+        bati_files, args.pasut,
+        args.date_format, args.pasut_date_format, args.pasut_time_format,
+        args.hws, args.msl, args.lws,
+        remove_outliers=not args.keep_outliers,
+        memory_budget_mb=args.memory_budget,
+        force_zone=args.utm_zone,
+        outlier_method=args.outlier_method,
+        outlier_params=outlier_params(args),
+        grid_params=grid_params(args),
+        crossline_params={"tolerance": args.crossline} if args.crossline else None,
+        export_formats=tuple(args.format or ["txt"]),
+        output_dir=out_dir,
+        zip_name=f"{survey_name}.zip" if args.zip else None,
+        tide_datum_method=args.tide_datum,
+        tide_params=tide_params(args),
+        project_dir=os.path.join(args.proyek, survey_name) if args.proyek else None,
+        drop_duplicates=not args.keep_duplicates,
+        parse_cache_dir=args.parse_cache,
+        parse_cache_mb=args.parse_cache_mb,
+        line_params=line_params(args),
+        export_by_line=args.xyz_per_lajur,
+        thin_params={"radius": args.tipis, "method": args.tipis_metode} if args.tipis else None,
+    )
+    return {
+        "survey": survey_dir,
+        "files": len(bati_files),
+        "pings": len(result.cleaned),
+        "outliers": result.num_outliers,
+        "outlier_action": result.outlier_action,
+        "output": sorted(result.output_files),
+        "elapsed": result.elapsed,
+        "datum": result.datum_pasut,
+        "tide_flagged": result.num_tide_flagged,
+        "duplicates": result.num_duplicates,
+        "lines": result.num_lines,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="sbes", description="Pengolahan data batimetri SBES (batch)")
+    parser.add_argument("surveys", nargs="+", help="Direktori survei berisi file batimetri .txt")
+    parser.add_argument("--pasut", required=True, help="File data pasang surut (tanpa header)")
+    parser.add_argument("--date-format", default="auto",
+                        help="Format tanggal batimetri, misal %%d-%%b-%%y; 'auto' = deteksi dari isi file (default: %(default)s)")
+    parser.add_argument("--pasut-date-format", default="auto",
+                        help="Format tanggal pasut, misal %%d/%%m/%%Y (default: %(default)s)")
+    parser.add_argument("--pasut-time-format", default="auto",
+                        help="Format waktu pasut, misal %%H:%%M:%%S (default: %(default)s)")
+    parser.add_argument("--hws", type=float, default=None, help="Datum HWS dalam meter (default: dari analisis harmonik)")
+    parser.add_argument("--msl", type=float, default=None, help="Datum MSL dalam meter (default: dari analisis harmonik)")
+    parser.add_argument("--lws", type=float, default=None, help="Datum LWS dalam meter (default: dari analisis harmonik)")
+    parser.add_argument("--tide-datum", choices=["admiralty", "spring", "prediksi"], default="admiralty",
+                        help="Cara menurunkan datum yang tidak diisi dari konstanta harmonik pasut: "
+                             "MSL ± (M2+S2+K1+O1+P1+K2), MSL ± (M2+S2), atau maks/min prediksi 1 tahun "
+                             "(default: %(default)s)")
+    parser.add_argument("--pasut-lonlat", type=float, nargs=2, default=None, metavar=("LON", "LAT"),
+                        help="Posisi stasiun --pasut (wajib untuk koreksi multi-stasiun)")
+    parser.add_argument("--stasiun", nargs=3, action="append", metavar=("FILE", "LON", "LAT"),
+                        help="Stasiun pasut tambahan (format sama dengan --pasut, datum dari analisis "
+                             "harmonik); boleh diulang")
+    parser.add_argument("--blend", choices=["idw", "nearest"], default="idw",
+                        help="Penggabungan stasiun: bobot jarak atau stasiun terdekat (default: %(default)s)")
+    parser.add_argument("--idw-power", type=float, default=2.0,
+                        help="Pangkat bobot jarak stasiun (default: %(default)s)")
+    parser.add_argument("--zona-pasut", default=None, metavar="GEOJSON",
+                        help="Zona pasut: poligon dengan properti stasiun, beda_waktu (menit) dan rasio; "
+                             "ping di luar zona memakai stasiun terdekat")
+    parser.add_argument("--max-gap", type=float, default=None, metavar="MENIT",
+                        help="Jeda rekaman pasut maksimum yang masih diinterpolasi "
+                             "(default: 3 x interval sampling median)")
+    parser.add_argument("--keep-outliers", action="store_true", help="Pertahankan outlier (default: dihapus)")
+    parser.add_argument("--outlier-method", choices=["iqr", "rolling"], default="iqr",
+                        help="Deteksi outlier: IQR global atau median/MAD bergulir per file (default: %(default)s)")
+    parser.add_argument("--window", type=int, default=51, metavar="PING",
+                        help="Lebar jendela median bergulir dalam ping (default: %(default)s)")
+    parser.add_argument("--window-seconds", type=float, default=None, metavar="DETIK",
+                        help="Lebar jendela dalam detik (menggantikan --window)")
+    parser.add_argument("--mad-k", type=float, default=3.5,
+                        help="Ambang outlier dalam kelipatan MAD terskala (default: %(default)s)")
+    parser.add_argument("--lajur", action="store_true",
+                        help="Segmentasi track menjadi lajur survei: outlier dideteksi per lajur dan "
+                             "Lajur_statistik.csv ikut ditulis")
+    parser.add_argument("--lajur-gap", type=float, default=LINE_DEFAULTS["max_gap_s"], metavar="DETIK",
+                        help="Jeda antar ping yang memutus lajur (default: %(default)s)")
+    parser.add_argument("--lajur-belok", type=float, default=LINE_DEFAULTS["max_turn_deg"], metavar="DERAJAT",
+                        help="Perubahan heading yang dianggap belokan (default: %(default)s)")
+    parser.add_argument("--lajur-min-ping", type=int, default=LINE_DEFAULTS["min_pings"], metavar="PING",
+                        help="Jumlah ping minimum satu lajur (default: %(default)s)")
+    parser.add_argument("--lajur-kecepatan", type=float, nargs=2, default=None, metavar=("MIN", "MAKS"),
+                        help="Rentang kecepatan kapal di lajur dalam m/s (default: {} {})".format(
+                            LINE_DEFAULTS["min_speed"], LINE_DEFAULTS["max_speed"]))
+    parser.add_argument("--xyz-per-lajur", action="store_true",
+                        help="Tulis file XYZ per lajur survei (mengaktifkan --lajur)")
+    parser.add_argument("--keep-duplicates", action="store_true",
+                        help="Pertahankan ping duplikat antar file (timestamp dan posisi sama); default dibuang")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="Baca file batimetri per chunk dengan anggaran memori ini (mode streaming)")
+    parser.add_argument("--utm-zone", default=None, metavar="ZONA",
+                        help="Paksa semua titik ke satu zona UTM: 'dominant' atau label zona, misal 49S "
+                             "(default: zona otomatis per titik)")
+    parser.add_argument("--format", choices=["txt", "xyz32", "npz", "parquet"], action="append",
+                        help="Format file XYZ per zona/datum, boleh diulang (default: txt)")
+    parser.add_argument("--tipis", type=float, default=None, metavar="M",
+                        help="Thinning file XYZ: satu sounding per sel berukuran ini dalam meter "
+                             "(default: semua sounding)")
+    parser.add_argument("--tipis-metode", choices=["shoal", "median"], default="shoal",
+                        help="Sounding wakil tiap sel: terdangkal (peta laut) atau median (default: %(default)s)")
+    parser.add_argument("--zip", action="store_true",
+                        help="Tulis semua file survei ke satu arsip <nama_survei>.zip")
+    parser.add_argument("--grid-cell", type=float, default=None, metavar="M",
+                        help="Buat grid DEM per datum dengan ukuran sel ini dalam meter (default: tanpa grid)")
+    parser.add_argument("--grid-method", choices=["bin", "idw", "nearest"], default="bin",
+                        help="Isi sel grid: rata-rata per sel, IDW, atau tetangga terdekat (default: %(default)s)")
+    parser.add_argument("--grid-radius", type=float, default=None, metavar="M",
+                        help="Radius pencarian IDW/tetangga terdekat dalam meter (default: 3 x ukuran sel)")
+    parser.add_argument("--grid-format", choices=["asc", "tif", "npz"], action="append",
+                        help="Format file grid, boleh diulang (default: asc)")
+    parser.add_argument("--crossline", type=float, default=None, metavar="M",
+                        help="Tulis laporan QC crossline (selisih kedalaman di perpotongan lajur) "
+                             "dengan toleransi jarak ini dalam meter")
+    parser.add_argument("--proyek", default=None, metavar="DIR",
+                        help="Direktori proyek persisten (satu subfolder per survei): hanya file baru yang diproses, "
+                             "hasil mencakup seluruh hari survei yang sudah ditambahkan")
+    parser.add_argument("--parse-cache", default=None, metavar="DIR",
+                        help="Cache hasil parse file batimetri (dikenali dari isi file dan format tanggal): "
+                             "file yang sama tidak di-parse ulang pada run berikutnya")
+    parser.add_argument("--parse-cache-mb", type=float, default=4096, metavar="MB",
+                        help="Batas ukuran cache parse di disk; entri terlama dibuang lebih dulu (default: %(default)s)")
+    parser.add_argument("--pattern", default="*.txt", help="Pola nama file batimetri (default: %(default)s)")
+    parser.add_argument("-o", "--output", default="hasil", help="Direktori output (default: %(default)s)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Jumlah proses paralel (default: jumlah CPU)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.stasiun or args.zona_pasut) and args.pasut_lonlat is None:
+        parser.error("--pasut-lonlat wajib diisi untuk koreksi multi-stasiun/zona pasut")
+    workers = args.workers or min(len(args.surveys), os.cpu_count() or 1)
+
+    t0 = time.perf_counter()
+    total_pings = 0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_survey, s, args): s for s in args.surveys}
+        for fut in as_completed(futures):
+            survey = futures[fut]
+            try:
+                info = fut.result()
+            except Exception as e:
+                failed += 1
+                print(f"[GAGAL] {survey}: {e}", file=sys.stderr)
+                continue
+            total_pings += info["pings"]
+            rate = info["pings"] / info["elapsed"] if info["elapsed"] > 0 else float("nan")
+            lines = f"{info['lines']} lajur, " if info["lines"] else ""
+            print(f"[OK] {survey}: {info['files']} file, {info['pings']} ping, "
+                  f"{info['outliers']} outlier ({info['outlier_action']}), "
+                  f"{info['duplicates']} ping duplikat (dibuang), "
+                  f"{lines}"
+                  f"{info['tide_flagged']} ping tanpa pasut valid (dibuang), "
+                  f"{info['elapsed']:.2f} s, {rate:,.0f} ping/s, "
+                  "HWS/MSL/LWS {:.3f}/{:.3f}/{:.3f} m".format(*info["datum"]))
+    elapsed = time.perf_counter() - t0
+    rate = total_pings / elapsed if elapsed > 0 else float("nan")
+    print(f"Selesai: {len(args.surveys) - failed}/{len(args.surveys)} survei, "
+          f"{total_pings} ping dalam {elapsed:.2f} s ({rate:,.0f} ping/s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Parser koordinat tervektorisasi untuk kolom longitude/latitude data batimetri.
+
+Menggantikan ``clean_longitude``/``clean_latitude`` yang dipanggil per baris dengan
+``Series.apply``. Format yang didukung:
+
+- derajat desimal, misal ``110.4321°E``, ``6.9512S``, ``-6.9512``, ``W 8.25``
+- derajat-menit desimal (DDM), misal ``6°57.072'S`` atau ``6 57.072 S``
+- derajat-menit-detik (DMS), misal ``110°25'55.6"E`` atau ``110 25 55.6 E``
+
+Akhiran/awalan belahan bumi N/S/E/W menentukan tanda (S dan W negatif).
+Nilai yang tidak dapat dibaca atau di luar rentang menjadi NaN dan dihitung
+sebagai nilai yang ditolak.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Karakter yang dibuang dari kedua ujung sebelum parsing angka desimal.
+# "Â" muncul jika file UTF-8 (°) dibaca dengan encoding latin1.
+_STRIP_CHARS = "NSEWnsew°º Â\t"
+_DECIMAL_PATTERN = r"[+-]?\d+(?:\.\d*)?"
+
+# Huruf belahan bumi (positif, negatif) untuk tiap sumbu
+_HEMISPHERES = {
+    "lon": (("E", "e"), ("W", "w")),
+    "lat": (("N", "n"), ("S", "s")),
+}
+_MAX_ABS = {"lon": 180.0, "lat": 90.0}
+
+# Derajat, menit (opsional), detik (opsional) dengan pemisah simbol atau spasi/titik dua
+_DMS_PATTERN = (
+    r"^[NSEW]?\s*(?P<deg>\d{1,3})\s*(?:Â?[°º]|\s|:)\s*"
+    r"(?P<min>\d{1,2}(?:\.\d*)?)\s*(?:['′]|\s|:)?\s*"
+    r"(?:(?P<sec>\d{1,2}(?:\.\d*)?)\s*(?:\"|″|'')?)?\s*[NSEW]?$"
+)
+
+
+def _parse_dms(text):
+    """ Parse nilai DDM/DMS (tanpa tanda) menjadi derajat desimal; NaN jika tidak cocok """
+    parts = text.str.extract(_DMS_PATTERN)
+    deg = pd.to_numeric(parts["deg"], errors="coerce").to_numpy(dtype=float)
+    minute = pd.to_numeric(parts["min"], errors="coerce").to_numpy(dtype=float)
+    sec = pd.to_numeric(parts["sec"], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+    value = deg + minute / 60.0 + sec / 3600.0
+    value[(minute >= 60) | (sec >= 60)] = np.nan
+    return value
+
+
+def parse_coordinates(values, axis):
+    """
+    Parse satu kolom koordinat sekaligus.
+
+    ``axis`` adalah ``"lon"`` atau ``"lat"``. Mengembalikan ``(array_float64, jumlah_ditolak)``;
+    nilai kosong (NaN) tidak dihitung sebagai ditolak.
+    """
+    if axis not in _HEMISPHERES:
+        raise ValueError(f"axis harus 'lon' atau 'lat', bukan {axis!r}")
+    s = pd.Series(values, copy=False)
+    if s.dtype.kind in "fiu":
+        out = s.to_numpy(dtype=float, copy=True)
+        bad = np.abs(out) > _MAX_ABS[axis]
+        out[bad] = np.nan
+        return out, int(bad.sum())
+
+    present = s.notna().to_numpy()
+    if s.dtype == object:
+        s = s.astype(str)
+    s = s.str.strip()
+    present = present & (s != "").to_numpy()
+
+    # 1. Huruf belahan bumi di akhir atau awal nilai menentukan tanda
+    pos_letters, neg_letters = _HEMISPHERES[axis]
+    other_axis = "lat" if axis == "lon" else "lon"
+    wrong_letters = sum(_HEMISPHERES[other_axis], ())
+    is_neg = (s.str.endswith(neg_letters) | s.str.startswith(neg_letters)).to_numpy(dtype=bool)
+    is_pos = (s.str.endswith(pos_letters) | s.str.startswith(pos_letters)).to_numpy(dtype=bool)
+    # Huruf belahan bumi yang salah sumbu (misal "N" pada longitude) ditolak
+    wrong_axis = (s.str.endswith(wrong_letters) | s.str.startswith(wrong_letters)).to_numpy(dtype=bool)
+
+    # 2. Jalur cepat: derajat desimal, cast langsung tanpa to_numeric per elemen
+    body = s.str.strip(_STRIP_CHARS)
+    decimal = body.str.fullmatch(_DECIMAL_PATTERN).fillna(False).to_numpy(dtype=bool)
+    out = np.full(len(s), np.nan)
+    if decimal.any():
+        out[decimal] = body[decimal].astype(float).to_numpy()
+
+    # 3. Jalur lambat hanya untuk sisa baris: DDM/DMS
+    retry = ~decimal & present
+    if retry.any():
+        idx = np.flatnonzero(retry)
+        out[idx] = _parse_dms(s.iloc[idx].str.upper().str.lstrip("+-"))
+        neg = s.iloc[idx].str.startswith("-").to_numpy(dtype=bool)
+        out[idx[neg]] *= -1
+
+    # 4. Tanda negatif bersamaan dengan huruf belahan bumi dianggap ambigu
+    conflict = (is_neg | is_pos) & (out < 0)
+    out[is_neg] *= -1
+    out[wrong_axis | conflict | (np.abs(out) > _MAX_ABS[axis])] = np.nan
+
+    rejected = int((np.isnan(out) & present).sum())
+    return out, rejected
+
+
+def parse_longitude(values):
+    """ Parse kolom longitude; hanya mengembalikan array float64 """
+    return parse_coordinates(values, "lon")[0]
+
+
+def parse_latitude(values):
+    """ Parse kolom latitude; hanya mengembalikan array float64 """
+    return parse_coordinates(values, "lat")[0]
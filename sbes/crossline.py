@@ -0,0 +1,187 @@
+"""
+QC crossline: selisih kedalaman di perpotongan lajur utama (mainline) dan lajur silang (crossline).
+
+Track UTM disegmentasi menjadi lajur (``sbes.lines``), lalu titik dimasukkan ke spatial hash
+dengan ukuran sel = toleransi jarak. Per (sel, lajur) hanya diambil satu sounding (terdekat ke
+pusat sel) sehingga pencarian pasangan hanya membandingkan lajur berbeda di sel bertetangga:
+O(n log n) untuk pengurutan, bukan O(n^2) seperti pencarian semua pasangan.
+
+Lajur dengan heading dalam 45 derajat dari heading dominan dianggap lajur utama, sisanya
+lajur silang. Selisih dihitung utama - silang (untuk pasangan sejenis: lajur ID kecil - besar).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .lines import line_headings, segment_lines
+
+# Batas TVU IHO S-44: sqrt(a^2 + (b * d)^2), d = kedalaman (m)
+IHO_ORDERS = {
+    "Special Order": (0.25, 0.0075),
+    "Order 1a/1b": (0.5, 0.013),
+    "Order 2": (1.0, 0.023),
+}
+
+PAIR_TYPES = {0: "utama-silang", 1: "utama-utama", 2: "silang-silang"}
+
+# Offset sel tetangga setengah lingkaran: tiap pasangan sel dibandingkan sekali
+_HALF_NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def classify_lines(headings, weights=None, tolerance_deg=45.0):
+    """
+    True untuk lajur utama: heading dalam ``tolerance_deg`` dari heading dominan (sumbu 0-180).
+
+    ``weights`` (misal jumlah ping per lajur) mencegah lajur belokan yang pendek menentukan arah dominan.
+    """
+    if len(headings) == 0:
+        return np.zeros(0, dtype=bool)
+    weights = np.ones(len(headings)) if weights is None else np.asarray(weights, dtype=np.float64)
+    # Rata-rata sirkular sumbu (sudut digandakan agar 0 dan 180 derajat dianggap sama)
+    doubled = np.radians(headings * 2)
+    sin, cos = (weights * np.sin(doubled)).sum(), (weights * np.cos(doubled)).sum()
+    dominant = np.degrees(np.arctan2(sin, cos)) / 2 % 180.0
+    diff = np.abs((headings - dominant + 90.0) % 180.0 - 90.0)
+    return diff <= tolerance_deg
+
+
+def _representatives(x, y, line_id, cell_size):
+    """ Satu indeks sounding per (sel, lajur): yang terdekat ke pusat sel """
+    cx = np.floor(x / cell_size).astype(np.int64)
+    cy = np.floor(y / cell_size).astype(np.int64)
+    d2 = (x - (cx + 0.5) * cell_size) ** 2 + (y - (cy + 0.5) * cell_size) ** 2
+    order = np.lexsort((d2, line_id, cy, cx))
+    cx, cy, lid = cx[order], cy[order], line_id[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (cx[1:] != cx[:-1]) | (cy[1:] != cy[:-1]) | (lid[1:] != lid[:-1])
+    return order[first], cx[first], cy[first]
+
+
+def find_crossings(x, y, line_id, tolerance=1.0):
+    """
+    Pasangan indeks ``(i, j)`` sounding dari lajur berbeda yang berjarak <= ``tolerance`` meter.
+
+    Ping dengan ``line_id`` -1 diabaikan. Setiap pasangan (sel, lajur) muncul sekali.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    line_id = np.asarray(line_id)
+    keep = np.flatnonzero(line_id >= 0)
+    if len(keep) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    rep, cx, cy = _representatives(x[keep], y[keep], line_id[keep], tolerance)
+    rep = keep[rep]
+    # Kunci sel tunggal (urut sama dengan hasil lexsort: cx lalu cy)
+    cy0, ny = cy.min() - 1, int(cy.max() - cy.min()) + 3
+    key = (cx - cx.min() + 1) * ny + (cy - cy0)
+
+    pairs_i, pairs_j = [], []
+    for dx, dy in _HALF_NEIGHBOURS:
+        target = key + dx * ny + dy
+        lo = np.searchsorted(key, target, side="left")
+        hi = np.searchsorted(key, target, side="right")
+        if dx == 0 and dy == 0:
+            # Sel yang sama: hanya pasangan setelah titik itu sendiri
+            lo = np.arange(len(key)) + 1
+        counts = np.maximum(hi - lo, 0)
+        if not counts.any():
+            continue
+        i = np.repeat(np.arange(len(key)), counts)
+        j = np.repeat(lo - np.cumsum(np.r_[0, counts[:-1]]), counts) + np.arange(counts.sum())
+        a, b = rep[i], rep[j]
+        ok = (line_id[a] != line_id[b]) & ((x[a] - x[b]) ** 2 + (y[a] - y[b]) ** 2 <= tolerance * tolerance)
+        pairs_i.append(a[ok])
+        pairs_j.append(b[ok])
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def crossline_pairs(df, datums, tolerance=1.0, line_col="lajur"):
+    """
+    Tabel pasangan sounding di perpotongan lajur beserta selisih kedalaman per datum.
+
+    ``df`` memuat ``X_UTM``, ``Y_UTM``, ``Zona_UTM``, kolom datum dan ``line_col``. Pasangan
+    hanya dicari di dalam zona UTM yang sama.
+    """
+    line_id = df[line_col].to_numpy()
+    x, y = df["X_UTM"].to_numpy(), df["Y_UTM"].to_numpy()
+    headings = line_headings(x, y, line_id)
+    mainline = classify_lines(headings, np.bincount(line_id[line_id >= 0], minlength=len(headings)))
+
+    parts = []
+    zones = df["Zona_UTM"]
+    for zona in zones.unique():
+        in_zone = np.flatnonzero((zones == zona).to_numpy())
+        i, j = find_crossings(x[in_zone], y[in_zone], line_id[in_zone], tolerance)
+        if len(i) == 0:
+            continue
+        a, b = in_zone[i], in_zone[j]
+        # Urutkan pasangan: lajur utama dulu, lalu ID lajur kecil
+        la, lb = line_id[a], line_id[b]
+        swap = (mainline[lb] & ~mainline[la]) | ((mainline[la] == mainline[lb]) & (lb < la))
+        a, b = np.where(swap, b, a), np.where(swap, a, b)
+        la, lb = line_id[a], line_id[b]
+        pair_type = np.where(mainline[la] != mainline[lb], 0, np.where(mainline[la], 1, 2))
+        part = {
+            "zona": np.full(len(a), zona, dtype=object),
+            "lajur_a": la, "lajur_b": lb,
+            "jenis": pd.Categorical.from_codes(pair_type, list(PAIR_TYPES.values())),
+            "jarak": np.hypot(x[a] - x[b], y[a] - y[b]),
+            "X_UTM": (x[a] + x[b]) / 2, "Y_UTM": (y[a] + y[b]) / 2,
+        }
+        for datum in datums:
+            z = df[datum].to_numpy()
+            part[f"{datum}_a"] = z[a]
+            part[f"dZ_{datum.split('_')[1]}"] = z[a] - z[b]
+        parts.append(pd.DataFrame(part))
+    if not parts:
+        return pd.DataFrame(columns=["zona", "lajur_a", "lajur_b", "jenis", "jarak", "X_UTM", "Y_UTM"])
+    return pd.concat(parts, ignore_index=True)
+
+
+def crossline_stats(pairs, datums, order="Order 1a/1b"):
+    """
+    Statistik selisih kedalaman per datum dan jenis pasangan: jumlah, rata-rata, simpangan
+    baku, RMS, persentil 95 dan maksimum |dZ|, serta persentase di dalam batas TVU IHO ``order``.
+    """
+    a, b = IHO_ORDERS[order]
+    rows = []
+    for datum in datums:
+        col = f"dZ_{datum.split('_')[1]}"
+        if col not in pairs.columns:
+            continue
+        for jenis in PAIR_TYPES.values():
+            sel = (pairs["jenis"] == jenis).to_numpy()
+            if not sel.any():
+                continue
+            dz = pairs[col].to_numpy()[sel].astype(np.float64)
+            depth = np.abs(pairs[f"{datum}_a"].to_numpy()[sel])
+            tvu = np.sqrt(a * a + (b * depth) ** 2)
+            rows.append({
+                "datum": datum, "jenis": jenis, "n": len(dz),
+                "rata2": dz.mean(), "std": dz.std(ddof=1) if len(dz) > 1 else np.nan,
+                "rms": np.sqrt(np.mean(dz ** 2)),
+                "p95_abs": np.percentile(np.abs(dz), 95), "maks_abs": np.abs(dz).max(),
+                f"% dalam TVU {order}": 100.0 * np.mean(np.abs(dz) <= tvu),
+            })
+    return pd.DataFrame(rows)
+
+
+def crossline_qc(final_df, datums, tolerance=1.0, max_gap_s=30.0, max_turn_deg=30.0, min_pings=20,
+                 order="Order 1a/1b"):
+    """
+    Segmentasi lajur + pencarian perpotongan + statistik.
+
+    Mengembalikan ``(pairs, stats, line_id)``; ``line_id`` adalah ID lajur tiap baris ``final_df``.
+    """
+    groups = pd.factorize(final_df["Zona_UTM"])[0].astype(np.int32)
+    if "file" in final_df.columns:
+        groups = groups * 65536 + final_df["file"].to_numpy()
+    line_id = segment_lines(
+        final_df["timestamp"].to_numpy(), final_df["X_UTM"].to_numpy(), final_df["Y_UTM"].to_numpy(),
+        groups=groups, max_gap_s=max_gap_s, max_turn_deg=max_turn_deg, min_pings=min_pings,
+    )
+    columns = ["timestamp", "X_UTM", "Y_UTM", "Zona_UTM", *datums]
+    df = final_df[columns].copy(deep=False)
+    df["lajur"] = line_id
+    pairs = crossline_pairs(df, datums, tolerance)
+    return pairs, crossline_stats(pairs, datums, order), line_id
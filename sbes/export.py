@@ -0,0 +1,356 @@
+"""
+Export data akhir per zona UTM dan per datum, dibuat saat diminta dan ditulis per chunk.
+
+``plan_export`` hanya menyusun daftar file (indeks baris per zona, atau per zona dan lajur survei
+jika ``lines`` diisi; dengan ``thin`` hanya sounding hasil thinning ``sbes.thinning`` per datum);
+isi file baru diformat saat ``write_item``/``write_zip`` dipanggil, per chunk ``CHUNK_ROWS``
+baris, sehingga teks lengkap tidak pernah ada di memori.
+
+Format:
+
+- ``"txt"``: XYZ teks ``%.3f`` dipisah spasi (sama persis dengan ``to_csv`` sebelumnya),
+  diformat secara vektor (``format_fixed``).
+- ``"xyz32"``: biner little-endian: header ``XYZ32`` + EPSG + origin (float64), lalu triplet
+  float32 (X - X0, Y - Y0, Z); origin di tengah data sehingga galat koordinat hanya beberapa
+  milimeter untuk survei selebar ~100 km.
+- ``"npz"``: array ``X``, ``Y`` (float64), ``Z`` (float32) dan ``epsg``.
+- ``"parquet"``: kolom X, Y, Z per row group (butuh ``pyarrow``).
+"""
+
+import importlib.util
+import io
+import os
+import struct
+import tempfile
+import zipfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from .lines import group_rows
+from .projection import zone_label_to_epsg
+from .thinning import cell_codes, thin_indices
+
+EXPORT_FORMATS = {
+    "XYZ teks (.txt)": "txt",
+    "XYZ biner float32 (.xyz32)": "xyz32",
+    "NumPy (.npz)": "npz",
+    "Parquet (.parquet)": "parquet",
+}
+
+EXPORT_MIME = {
+    "txt": "text/plain",
+    "xyz32": "application/octet-stream",
+    "npz": "application/octet-stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Baris per chunk saat memformat/menulis (~10 MB teks XYZ)
+CHUNK_ROWS = 262_144
+
+XYZ32_MAGIC = b"XYZ32\0"
+# magic, versi, EPSG, origin X, origin Y, jumlah titik
+_XYZ32_HEADER = struct.Struct("<6sHiddQ")
+
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def available_formats():
+    """ Format export yang bisa dipakai di lingkungan ini (Parquet hanya jika pyarrow terpasang) """
+    has_arrow = importlib.util.find_spec("pyarrow") is not None
+    return {label: fmt for label, fmt in EXPORT_FORMATS.items() if fmt != "parquet" or has_arrow}
+
+
+# --- Format angka cepat ---
+
+def _round_scaled(v, decimals):
+    """ ``v * 10^decimals`` dibulatkan persis seperti printf ``%.<decimals>f`` """
+    r = v * 10.0 ** decimals
+    m = np.rint(r)
+    # Perkalian float64 tidak selalu eksak: nilai yang sangat dekat dengan x.5 dibulatkan ulang
+    near = np.abs(np.abs(r - np.trunc(r)) - 0.5) <= 4 * np.spacing(np.abs(r))
+    for i in np.flatnonzero(near):
+        text = f"{v[i]:.{decimals}f}"
+        digits = float(text.replace(".", "").lstrip("-"))
+        m[i] = -digits if text.startswith("-") else digits
+    return m
+
+
+def format_fixed(columns, decimals=3, sep=b" ", newline=b"\n"):
+    """
+    Format kolom angka menjadi baris teks ``%.<decimals>f`` (bytes), tanpa loop per nilai.
+
+    Hasilnya identik dengan ``DataFrame.to_csv(float_format=...)``; chunk yang memuat NaN/inf
+    atau nilai yang sangat besar diformat dengan pandas.
+    """
+    columns = [np.asarray(c, dtype=np.float64) for c in columns]
+    if len(columns[0]) == 0:
+        return b""
+    # Di luar 2^53 / 10^decimals bilangan bulat hasil skala tidak lagi eksak di float64
+    limit = 2.0 ** 53 / 10.0 ** decimals
+    if not all((np.abs(c) < limit).all() for c in columns):
+        df = pd.DataFrame(dict(enumerate(columns)), copy=False)
+        text = df.to_csv(sep=sep.decode(), index=False, header=False, float_format=f"%.{decimals}f",
+                         lineterminator=newline.decode())
+        return text.encode("ascii")
+
+    fields = []
+    for v in columns:
+        m = _round_scaled(v, decimals)
+        neg = np.signbit(m)
+        a = np.abs(m).astype(np.int64)
+        # Jumlah digit total (bulat + pecahan), minimal satu digit di depan titik
+        nd = np.maximum(np.searchsorted(_POW10, a, side="right"), decimals + 1)
+        fields.append((neg, a, nd, neg + nd + (1 if decimals else 0)))
+    row_len = sum(f[3] for f in fields) + (len(columns) - 1) * len(sep) + len(newline)
+    ends = np.cumsum(row_len)
+    total = int(ends[-1])
+    # Byte terakhir menampung tulisan yang tidak dipakai (digit di luar lebar angka)
+    buf = np.empty(total + 1, dtype=np.uint8)
+    pos = ends - row_len
+    for k, (neg, a, nd, width) in enumerate(fields):
+        if k:
+            buf[pos] = sep[0]
+            pos = pos + len(sep)
+        buf[np.where(neg, pos, total)] = ord("-")
+        last = pos + width - 1
+        q = a.copy()
+        for d in range(int(nd.max())):
+            p = last - d - (1 if decimals and d >= decimals else 0)
+            if d > decimals:
+                p = np.where(nd > d, p, total)
+            buf[p] = 48 + q % 10
+            q //= 10
+        if decimals:
+            buf[last - decimals] = ord(".")
+        pos = pos + width
+    buf[pos] = newline[0]
+    return buf[:total].tobytes()
+
+
+# --- Rencana export ---
+
+@dataclass
+class ExportItem:
+    """ Satu file output; ``rows`` = indeks baris data akhir (None = semua baris) """
+    file_name: str
+    zona: str
+    datum: str
+    fmt: str
+    rows: np.ndarray = None
+    lajur: int = None  # ID lajur survei (-1 = ping di luar lajur) untuk export per lajur
+
+    @property
+    def mime(self):
+        return EXPORT_MIME[self.fmt]
+
+
+def _file_name(zona, datum, fmt, lajur=None, thin=None):
+    suffix = ""
+    if lajur is not None:
+        suffix = "_luar_lajur" if lajur < 0 else f"_lajur{lajur + 1:04d}"
+    if thin:
+        suffix += f"_tipis{thin['radius']:g}m"
+    return f"Batimetri_{zona.replace(' ', '')}_{datum.split('_')[1]}{suffix}.{fmt}"
+
+
+def _datum_rows(final_df, rows, datums, thin):
+    """ ``(datum, indeks baris)`` untuk baris ``rows`` (None = semua); dengan ``thin`` per datum satu sounding per sel """
+    if not thin:
+        for datum in datums:
+            yield datum, rows
+        return
+    base = np.arange(len(final_df)) if rows is None else rows
+    x, y = final_df["X_UTM"].to_numpy()[base], final_df["Y_UTM"].to_numpy()[base]
+    codes = cell_codes(x, y, thin["radius"])
+    for datum in datums:
+        z = final_df[datum].to_numpy()[base]
+        yield datum, base[thin_indices(x, y, z, thin["radius"], thin.get("method", "shoal"), codes)]
+
+
+def plan_export(final_df, datums, formats=("txt",), mask=None, lines=None, thin=None):
+    """
+    Daftar file output per zona, datum dan format; belum ada data yang diformat. Jika ``lines``
+    (ID lajur per baris, ``sbes.lines``) diisi, satu file per zona dan lajur; ping di luar lajur
+    masuk file ``..._luar_lajur``. ``thin`` (``{"radius": m, "method": "shoal"/"median"}``)
+    menyisakan satu sounding per sel ``radius`` meter per file (``sbes.thinning``).
+    """
+    zones = final_df["Zona_UTM"]
+    unique = zones.unique()
+    items = []
+    if lines is not None:
+        lines = np.asarray(lines)
+        for zona in unique:
+            in_zone = (zones == zona).to_numpy()
+            if mask is not None:
+                in_zone = in_zone & mask
+            rows_zone = np.flatnonzero(in_zone)
+            if len(rows_zone) == 0:
+                continue
+            for piece in group_rows(lines[rows_zone]):
+                rows = rows_zone[piece]
+                lajur = int(lines[rows[0]])
+                for datum, datum_rows in _datum_rows(final_df, rows, datums, thin):
+                    for fmt in formats:
+                        items.append(ExportItem(_file_name(zona, datum, fmt, lajur, thin), zona, datum, fmt,
+                                                datum_rows, lajur))
+        # Lajur berurutan, ping di luar lajur di akhir
+        items.sort(key=lambda item: item.lajur < 0)
+        return items
+    for zona in unique:
+        if len(unique) == 1 and mask is None:
+            rows = None
+        else:
+            in_zone = (zones == zona).to_numpy()
+            if mask is not None:
+                in_zone = in_zone & mask
+            rows = np.flatnonzero(in_zone)
+            if len(rows) == 0:
+                continue
+        for datum, datum_rows in _datum_rows(final_df, rows, datums, thin):
+            for fmt in formats:
+                items.append(ExportItem(_file_name(zona, datum, fmt, thin=thin), zona, datum, fmt, datum_rows))
+    return items
+
+
+def _chunks(final_df, item, chunk_rows):
+    """ (X, Y, Z) per chunk untuk satu item """
+    x = final_df["X_UTM"].to_numpy()
+    y = final_df["Y_UTM"].to_numpy()
+    z = final_df[item.datum].to_numpy()
+    n = len(x) if item.rows is None else len(item.rows)
+    for s in range(0, n, chunk_rows):
+        if item.rows is None:
+            yield x[s:s + chunk_rows], y[s:s + chunk_rows], z[s:s + chunk_rows]
+        else:
+            idx = item.rows[s:s + chunk_rows]
+            yield x[idx], y[idx], z[idx]
+
+
+def _gather(final_df, item):
+    cols = [final_df[c].to_numpy() for c in ("X_UTM", "Y_UTM", item.datum)]
+    return cols if item.rows is None else [c[item.rows] for c in cols]
+
+
+def _write_txt(final_df, item, fh, chunk_rows):
+    for x, y, z in _chunks(final_df, item, chunk_rows):
+        fh.write(format_fixed([x, y, z]))
+
+
+def _write_xyz32(final_df, item, fh, chunk_rows):
+    # Origin di tengah bounding box agar offset float32 sekecil mungkin
+    n, lo, hi = 0, np.full(2, np.inf), np.full(2, -np.inf)
+    for x, y, _ in _chunks(final_df, item, chunk_rows):
+        n += len(x)
+        lo = np.minimum(lo, (x.min(), y.min()))
+        hi = np.maximum(hi, (x.max(), y.max()))
+    x0, y0 = np.floor((lo + hi) / 2) if n else (0.0, 0.0)
+    fh.write(_XYZ32_HEADER.pack(XYZ32_MAGIC, 1, zone_label_to_epsg(item.zona), x0, y0, n))
+    for x, y, z in _chunks(final_df, item, chunk_rows):
+        block = np.empty((len(x), 3), dtype="<f4")
+        block[:, 0] = x - x0
+        block[:, 1] = y - y0
+        block[:, 2] = z
+        fh.write(block.tobytes())
+
+
+def read_xyz32(source):
+    """ Baca file ``.xyz32``: kembalikan ``(x, y, z, epsg)`` dengan koordinat absolut float64 """
+    if isinstance(source, bytes):
+        data = source
+    else:
+        with open(source, "rb") as fh:
+            data = fh.read()
+    magic, version, epsg, x0, y0, n = _XYZ32_HEADER.unpack_from(data)
+    if magic != XYZ32_MAGIC:
+        raise ValueError("Bukan file XYZ32")
+    block = np.frombuffer(data, dtype="<f4", count=3 * n, offset=_XYZ32_HEADER.size).reshape(n, 3)
+    return block[:, 0].astype(np.float64) + x0, block[:, 1].astype(np.float64) + y0, block[:, 2].copy(), epsg
+
+
+def _write_npz(final_df, item, fh, chunk_rows):
+    x, y, z = _gather(final_df, item)
+    np.savez(fh, X=x, Y=y, Z=z.astype(np.float32), epsg=np.int32(zone_label_to_epsg(item.zona)))
+
+
+def _write_parquet(final_df, item, fh, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("X", pa.float64()), ("Y", pa.float64()), ("Z", pa.float32())])
+    with pq.ParquetWriter(fh, schema, compression="zstd") as writer:
+        for x, y, z in _chunks(final_df, item, chunk_rows):
+            writer.write_table(pa.table([x, y, z.astype(np.float32)], schema=schema))
+
+
+_WRITERS = {"txt": _write_txt, "xyz32": _write_xyz32, "npz": _write_npz, "parquet": _write_parquet}
+
+
+def write_item(final_df, item, fh, chunk_rows=CHUNK_ROWS):
+    """ Tulis satu file output ke file biner ``fh`` per chunk """
+    _WRITERS[item.fmt](final_df, item, fh, chunk_rows)
+
+
+def item_bytes(final_df, item, chunk_rows=CHUNK_ROWS):
+    """ Isi satu file output sebagai bytes """
+    buf = io.BytesIO()
+    write_item(final_df, item, buf, chunk_rows)
+    return buf.getvalue()
+
+
+def write_zip(final_df, items, fh, extra_files=None, compresslevel=1, chunk_rows=CHUNK_ROWS):
+    """
+    Tulis semua file ke satu arsip ZIP secara streaming (tiap file dikompresi per chunk).
+
+    ``extra_files`` = ``{nama: isi}`` tambahan (misal grid atau laporan QC).
+    """
+    with zipfile.ZipFile(fh, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zf:
+        for item in items:
+            with zf.open(item.file_name, "w", force_zip64=True) as entry:
+                write_item(final_df, item, entry, chunk_rows)
+        for name, content in (extra_files or {}).items():
+            zf.writestr(name, content)
+
+
+def zip_file(final_df, items, extra_files=None, spool_mb=64):
+    """ Arsip ZIP di file sementara (di memori sampai ``spool_mb``), siap dibaca dari awal """
+    fh = tempfile.SpooledTemporaryFile(max_size=spool_mb * 1024 * 1024)
+    write_zip(final_df, items, fh, extra_files)
+    fh.seek(0)
+    return fh
+
+
+def export_files(final_df, datums, formats=("txt",), mask=None, lines=None, thin=None):
+    """ Isi semua file output di memori; kunci = nama file (teks untuk ``txt``, selain itu bytes) """
+    files = {}
+    for item in plan_export(final_df, datums, formats, mask, lines, thin):
+        content = item_bytes(final_df, item)
+        files[item.file_name] = content.decode("ascii") if item.fmt == "txt" else content
+    return files
+
+
+def write_export(final_df, items, out_dir, extra_files=None, zip_name=None):
+    """
+    Tulis file output langsung ke ``out_dir`` per chunk (atau ke satu ZIP ``zip_name``).
+
+    Mengembalikan ``{nama file: path}``.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if zip_name:
+        path = os.path.join(out_dir, zip_name)
+        with open(path, "wb") as fh:
+            write_zip(final_df, items, fh, extra_files)
+        return {zip_name: path}
+    paths = {}
+    for item in items:
+        path = os.path.join(out_dir, item.file_name)
+        with open(path, "wb") as fh:
+            write_item(final_df, item, fh)
+        paths[item.file_name] = path
+    for name, content in (extra_files or {}).items():
+        path = os.path.join(out_dir, name)
+        with open(path, "wb" if isinstance(content, bytes) else "w") as fh:
+            fh.write(content)
+        paths[name] = path
+    return paths
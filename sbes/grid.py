@@ -0,0 +1,296 @@
+"""
+Gridding sounding terkoreksi menjadi raster kedalaman (DEM).
+
+Titik ``X_UTM/Y_UTM`` dibinning ke grid teratur (``np.bincount``, tanpa loop per sel), lalu
+sel kosong dapat diisi dengan interpolasi:
+
+- ``"bin"``: rata-rata titik per sel, sel tanpa titik = NoData.
+- ``"idw"``: inverse distance weighting dari sel berisi dalam radius pencarian.
+- ``"nearest"``: nilai sel berisi terdekat dalam radius pencarian.
+
+Sumber interpolasi adalah rata-rata per sel pada posisi centroid titiknya (bobot IDW dikali
+jumlah titik). Indeks spasialnya adalah grid itu sendiri: tetangga dicari dengan menggeser
+array sel sejauh radius, sehingga biayanya O(sel x offset dalam radius), bukan O(titik x titik).
+
+Grid disimpan north-up (baris 0 = utara) dan diekspor ke ESRI ASCII grid, GeoTIFF float32
+(tanpa kompresi) atau NPZ berisi array dan geotransform.
+"""
+
+import io
+import struct
+from dataclasses import dataclass
+
+import numpy as np
+
+from .projection import zone_label_to_epsg
+
+GRID_METHODS = {
+    "Rata-rata per sel (binning)": "bin",
+    "IDW": "idw",
+    "Tetangga terdekat": "nearest",
+}
+
+GRID_FORMATS = {
+    "ESRI ASCII grid (.asc)": "asc",
+    "GeoTIFF (.tif)": "tif",
+    "NumPy (.npz)": "npz",
+}
+
+NODATA = -9999.0
+
+# Batas jumlah sel agar ukuran sel yang terlalu kecil tidak menghabiskan memori
+MAX_CELLS = 50_000_000
+
+
+@dataclass
+class Grid:
+    """ Raster north-up: ``values[0, 0]`` adalah sel kiri atas; NaN = NoData """
+    values: np.ndarray
+    x0: float
+    y_top: float
+    cell_size: float
+    epsg: int = 0
+    counts: np.ndarray = None
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def y0(self):
+        """ Tepi bawah grid (yllcorner) """
+        return self.y_top - self.shape[0] * self.cell_size
+
+    @property
+    def geotransform(self):
+        """ Geotransform gaya GDAL: (x kiri, lebar sel, 0, y atas, 0, -tinggi sel) """
+        return (self.x0, self.cell_size, 0.0, self.y_top, 0.0, -self.cell_size)
+
+
+@dataclass
+class GridIndex:
+    """ Indeks sel tiap titik; dihitung sekali dan dipakai ulang untuk semua datum """
+    cell: np.ndarray
+    shape: tuple
+    x0: float
+    y_top: float
+    cell_size: float
+    counts: np.ndarray
+    centroid_x: np.ndarray
+    centroid_y: np.ndarray
+
+
+def grid_index(x, y, cell_size):
+    """ Hitung sel tiap titik pada grid yang tepinya kelipatan ``cell_size`` """
+    if cell_size <= 0:
+        raise ValueError("Ukuran sel harus lebih besar dari 0")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if len(x) == 0:
+        raise ValueError("Tidak ada titik untuk digrid")
+    x0 = np.floor(x.min() / cell_size) * cell_size
+    y_top = np.ceil(y.max() / cell_size) * cell_size
+    nx = int((x.max() - x0) // cell_size) + 1
+    ny = int((y_top - y.min()) // cell_size) + 1
+    if nx * ny > MAX_CELLS:
+        raise ValueError(
+            f"Grid {nx} x {ny} sel terlalu besar (maks. {MAX_CELLS:,} sel); perbesar ukuran sel"
+        )
+    col = ((x - x0) // cell_size).astype(np.int64)
+    row = ((y_top - y) // cell_size).astype(np.int64)
+    np.minimum(col, nx - 1, out=col)
+    np.minimum(row, ny - 1, out=row)
+    cell = row * nx + col
+    del row, col
+    counts = np.bincount(cell, minlength=nx * ny)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        centroid_x = np.bincount(cell, weights=x, minlength=nx * ny) / counts
+        centroid_y = np.bincount(cell, weights=y, minlength=nx * ny) / counts
+    return GridIndex(
+        cell=cell, shape=(ny, nx), x0=float(x0), y_top=float(y_top), cell_size=float(cell_size),
+        counts=counts.reshape(ny, nx), centroid_x=centroid_x.reshape(ny, nx),
+        centroid_y=centroid_y.reshape(ny, nx),
+    )
+
+
+def bin_mean(index, z):
+    """ Rata-rata ``z`` per sel (NaN untuk sel kosong) """
+    sums = np.bincount(index.cell, weights=np.asarray(z, dtype=np.float64), minlength=index.counts.size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums.reshape(index.shape) / index.counts
+
+
+def interpolate(index, mean, method="idw", radius=None, power=2.0):
+    """
+    Isi grid dari rata-rata per sel dengan IDW atau tetangga terdekat dalam ``radius`` (meter).
+
+    Jarak diukur dari pusat sel target ke centroid titik di sel sumber. Sel yang tidak punya
+    sumber dalam radius tetap NaN.
+    """
+    if method == "bin":
+        return mean
+    if method not in ("idw", "nearest"):
+        raise ValueError(f"Metode gridding tidak dikenal: {method!r}")
+    cs = index.cell_size
+    radius = float(radius) if radius else 3 * cs
+    r = max(int(np.ceil(radius / cs)), 1)
+    ny, nx = index.shape
+    # Pusat sel target sebagai vektor baris/kolom (broadcast)
+    center_x = index.x0 + (np.arange(nx) + 0.5) * cs
+    center_y = index.y_top - (np.arange(ny)[:, None] + 0.5) * cs
+
+    filled = index.counts > 0
+    value = np.where(filled, mean, 0.0)
+    counts = index.counts.astype(np.float64)
+    padded = {
+        name: np.pad(arr, r, constant_values=fill)
+        for name, arr, fill in (
+            ("value", value, 0.0), ("count", counts, 0.0),
+            ("cx", np.where(filled, index.centroid_x, np.inf), np.inf),
+            ("cy", np.where(filled, index.centroid_y, np.inf), np.inf),
+        )
+    }
+    radius2 = radius * radius
+    if method == "idw":
+        weight_sum = np.zeros((ny, nx))
+        value_sum = np.zeros((ny, nx))
+    else:
+        best_d2 = np.full((ny, nx), np.inf)
+        best = np.full((ny, nx), np.nan)
+
+    for di in range(-r, r + 1):
+        for dj in range(-r, r + 1):
+            # Offset yang sel terdekatnya pun di luar radius dilewati
+            if ((max(abs(di), 1) - 1) ** 2 + (max(abs(dj), 1) - 1) ** 2) * cs * cs > radius2:
+                continue
+            rows, cols = slice(r + di, r + di + ny), slice(r + dj, r + dj + nx)
+            d2 = (padded["cx"][rows, cols] - center_x) ** 2 + (padded["cy"][rows, cols] - center_y) ** 2
+            ok = d2 <= radius2
+            if method == "idw":
+                w = np.zeros_like(d2)
+                # Jarak minimum 1% sel agar sumber tepat di pusat sel tidak membagi dengan nol
+                w[ok] = padded["count"][rows, cols][ok] / np.maximum(d2[ok], (0.01 * cs) ** 2) ** (power / 2)
+                weight_sum += w
+                value_sum += w * padded["value"][rows, cols]
+            else:
+                closer = ok & (d2 < best_d2)
+                best_d2[closer] = d2[closer]
+                best[closer] = padded["value"][rows, cols][closer]
+
+    if method == "nearest":
+        return best
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(weight_sum > 0, value_sum / weight_sum, np.nan)
+
+
+def grid_points(x, y, z, cell_size, method="bin", radius=None, power=2.0, epsg=0):
+    """ Grid satu set titik (satu zona UTM) """
+    index = grid_index(x, y, cell_size)
+    values = interpolate(index, bin_mean(index, z), method, radius, power)
+    return Grid(values.astype(np.float32), index.x0, index.y_top, index.cell_size, epsg, index.counts)
+
+
+def grid_survey(final_df, datums, cell_size, method="bin", radius=None, power=2.0):
+    """
+    Grid data akhir per zona UTM dan per datum (kolom ``D_*``).
+
+    Mengembalikan ``{(zona, datum): Grid}``; indeks sel dihitung sekali per zona.
+    """
+    grids = {}
+    zones = final_df["Zona_UTM"]
+    for zona in zones.unique():
+        in_zone = (zones == zona).to_numpy()
+        index = grid_index(
+            final_df["X_UTM"].to_numpy()[in_zone], final_df["Y_UTM"].to_numpy()[in_zone], cell_size
+        )
+        epsg = zone_label_to_epsg(zona)
+        for datum in datums:
+            mean = bin_mean(index, final_df[datum].to_numpy()[in_zone])
+            values = interpolate(index, mean, method, radius, power).astype(np.float32)
+            grids[(zona, datum)] = Grid(values, index.x0, index.y_top, index.cell_size, epsg, index.counts)
+        del index
+    return grids
+
+
+# --- Export ---
+
+def to_esri_ascii(grid, decimals=3):
+    """ Isi file ESRI ASCII grid (.asc) """
+    ny, nx = grid.shape
+    header = (
+        f"ncols {nx}\nnrows {ny}\nxllcorner {grid.x0:.3f}\nyllcorner {grid.y0:.3f}\n"
+        f"cellsize {grid.cell_size:g}\nNODATA_value {NODATA:g}\n"
+    )
+    buf = io.StringIO()
+    buf.write(header)
+    values = np.where(np.isnan(grid.values), NODATA, grid.values)
+    np.savetxt(buf, values, fmt=f"%.{decimals}f", delimiter=" ")
+    return buf.getvalue()
+
+
+def to_npz(grid):
+    """ Isi file NPZ: ``values`` (NaN = NoData), ``counts``, ``geotransform`` dan ``epsg`` """
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf, values=grid.values, counts=grid.counts if grid.counts is not None else np.zeros(0),
+        geotransform=np.array(grid.geotransform), epsg=np.int32(grid.epsg),
+    )
+    return buf.getvalue()
+
+
+# Tipe field TIFF: (kode, format struct)
+_TIFF_TYPES = {"SHORT": (3, "H"), "LONG": (4, "I"), "DOUBLE": (12, "d"), "ASCII": (2, "s")}
+
+
+def to_geotiff(grid):
+    """
+    Isi file GeoTIFF float32 satu band tanpa kompresi (little-endian, satu strip).
+
+    Georeferensi memakai ModelPixelScale/ModelTiepoint dan ProjectedCSTypeGeoKey = EPSG zona.
+    """
+    ny, nx = grid.shape
+    data = np.ascontiguousarray(np.where(np.isnan(grid.values), NODATA, grid.values), dtype="<f4").tobytes()
+    geokeys = [1, 1, 0, 3, 1024, 0, 1, 1, 1025, 0, 1, 1, 3072, 0, 1, int(grid.epsg) or 32767]
+    nodata = f"{NODATA:g}\0".encode()
+    # (tag, tipe, nilai); nilai StripOffsets diisi setelah tata letak diketahui
+    entries = [
+        (256, "LONG", [nx]), (257, "LONG", [ny]), (258, "SHORT", [32]), (259, "SHORT", [1]),
+        (262, "SHORT", [1]), (273, "LONG", [0]), (277, "SHORT", [1]), (278, "LONG", [ny]),
+        (279, "LONG", [len(data)]), (284, "SHORT", [1]), (339, "SHORT", [3]),
+        (33550, "DOUBLE", [grid.cell_size, grid.cell_size, 0.0]),
+        (33922, "DOUBLE", [0.0, 0.0, 0.0, grid.x0, grid.y_top, 0.0]),
+        (34735, "SHORT", geokeys), (42113, "ASCII", nodata),
+    ]
+    payloads = []
+    for tag, kind, values in entries:
+        code, fmt = _TIFF_TYPES[kind]
+        payload = values if kind == "ASCII" else struct.pack(f"<{len(values)}{fmt}", *values)
+        payloads.append((tag, code, len(values), payload))
+    # Field > 4 byte disimpan setelah IFD (offset genap), data raster paling akhir
+    extra_offset = 8 + 2 + 12 * len(entries) + 4
+    data_offset = extra_offset + sum(len(p) + len(p) % 2 for *_, p in payloads if len(p) > 4)
+
+    ifd, extra = struct.pack("<H", len(entries)), b""
+    for tag, code, count, payload in payloads:
+        if tag == 273:
+            payload = struct.pack("<I", data_offset)
+        if len(payload) <= 4:
+            ifd += struct.pack("<HHI", tag, code, count) + payload.ljust(4, b"\0")
+        else:
+            ifd += struct.pack("<HHII", tag, code, count, extra_offset + len(extra))
+            extra += payload + b"\0" * (len(payload) % 2)
+    ifd += struct.pack("<I", 0)
+    return b"II*\0" + struct.pack("<I", 8) + ifd + extra + data
+
+
+_WRITERS = {"asc": to_esri_ascii, "tif": to_geotiff, "npz": to_npz}
+
+
+def export_grids(grids, formats=("asc",)):
+    """ Isi file raster per zona dan per datum; kunci = nama file """
+    output_files = {}
+    for (zona, datum), grid in grids.items():
+        for fmt in formats:
+            file_name = f"Grid_{zona.replace(' ', '')}_{datum.split('_')[1]}.{fmt}"
+            output_files[file_name] = _WRITERS[fmt](grid)
+    return output_files
@@ -0,0 +1,514 @@
+"""
+Ingest data batimetri dan pasut: baca file mentah, parsing timestamp/koordinat/kedalaman.
+
+Setiap file batimetri di-parse secara lengkap di worker (thread atau process pool),
+kemudian hasil numeriknya (masing-masing sudah urut waktu) digabung dengan merge per file
+(``sbes.merge``) dan ping duplikat antar file dibuang.
+"""
+
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .coords import parse_coordinates
+from .merge import DUPLICATE_TOL, merge_columns, merge_frames, run_bounds, sorted_order
+from .survey import compact_frame
+from .timeparse import (
+    AUTO,
+    FORMAT_OPTIONS_BATI,
+    FORMAT_OPTIONS_PASUT_DATE,
+    FORMAT_OPTIONS_PASUT_TIME,
+    detect_format,
+    parse_timestamps,
+)
+
+BATI_COLUMNS = ["timestamp", "longitude", "latitude", "kedalaman"]
+
+
+def _file_name(f):
+    """ Nama file dari path atau objek file-like (misal UploadedFile Streamlit) """
+    return os.path.basename(getattr(f, "name", None) or str(f))
+
+
+def read_bati_files(files):
+    """
+    Baca semua file batimetri (path atau file-like) sebagai tabel string lalu gabungkan.
+
+    Kolom ``"file"`` berisi indeks file asal tiap baris; nama file disimpan di ``attrs["files"]``.
+    """
+    bati_list = []
+    names = []
+    for i, f in enumerate(files):
+        df_temp = pd.read_csv(f, dtype=str, encoding='latin1', sep="\t", header=None)
+        df_temp["file"] = np.int32(i)
+        bati_list.append(df_temp)
+        names.append(_file_name(f))
+    bati_compile = pd.concat(bati_list, ignore_index=True)
+    bati_compile.attrs["files"] = names
+    return bati_compile
+
+
+# Versi lama per baris (Series.apply); dipertahankan sebagai acuan benchmark sbes.coords
+def clean_longitude(val):
+    if pd.isna(val): return None
+    s = str(val).strip().replace("°E", "")
+    try: return float(s)
+    except: return None
+
+
+def clean_latitude(val):
+    if pd.isna(val): return None
+    s = str(val).strip().upper().replace("°", "")
+    if "S" in s: s = s.replace("S", ""); sign = -1
+    elif "N" in s: s = s.replace("N", ""); sign = 1
+    else: sign = 1
+    try: return float(s) * sign
+    except ValueError: return None
+
+
+def _parse_table(bati_compile, date_format):
+    """ Parse tabel string mentah menjadi kolom numerik (belum dibuang/diurutkan) + mask koordinat ditolak """
+    bati = pd.DataFrame({
+        # Tanggal unik di-parse sekali, waktu dihitung per digit; tanpa string gabungan
+        "timestamp": parse_timestamps(bati_compile[0], bati_compile[1], date_format),
+    }, index=bati_compile.index)
+    lon, lon_rejected = _parse_with_mask(bati_compile[2], "lon")
+    lat, lat_rejected = _parse_with_mask(bati_compile[3], "lat")
+    bati["longitude"] = lon
+    bati["latitude"] = lat
+    bati["kedalaman"] = pd.to_numeric(bati_compile[4], errors="coerce")
+    return bati, lon_rejected, lat_rejected
+
+
+def clean_bati(bati_compile, date_format):
+    """
+    Cleaning data batimetri mentah: timestamp, koordinat, kedalaman, buang baris rusak, urutkan waktu.
+
+    Kolom numerik disimpan dalam dtype ringkas (``survey.compact_frame``). Jumlah koordinat
+    yang ditolak per file disimpan di ``attrs["coord_rejected"]``.
+    """
+    bati, lon_rejected, lat_rejected = _parse_table(bati_compile, date_format)
+    bati_drop = bati.dropna(subset=BATI_COLUMNS).reset_index(drop=True)
+    # Log dari logger umumnya sudah urut waktu: pengurutan dilewati jika tidak perlu
+    order = sorted_order(bati_drop["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64))
+    if order is not None:
+        bati_drop = bati_drop.take(order).reset_index(drop=True)
+    bati_drop = compact_frame(bati_drop)
+    bati_drop.attrs["coord_rejected"] = _rejected_per_file(bati_compile, lon_rejected, lat_rejected)
+    return bati_drop
+
+
+def _parse_with_mask(values, axis):
+    """ Parse koordinat dan kembalikan juga mask baris yang ditolak (tidak kosong tapi gagal dibaca) """
+    out, _ = parse_coordinates(values, axis)
+    rejected = np.isnan(out) & values.notna().to_numpy()
+    return out, rejected
+
+
+def _rejected_per_file(bati_compile, lon_rejected, lat_rejected):
+    """ Hitung koordinat yang ditolak per file: {nama_file: {"longitude": n, "latitude": n}} """
+    names = bati_compile.attrs.get("files")
+    if "file" not in bati_compile or not names:
+        return {"(semua file)": {"longitude": int(lon_rejected.sum()), "latitude": int(lat_rejected.sum())}}
+    file_idx = bati_compile["file"].to_numpy()
+    lon_counts = np.bincount(file_idx, weights=lon_rejected, minlength=len(names))
+    lat_counts = np.bincount(file_idx, weights=lat_rejected, minlength=len(names))
+    return {
+        name: {"longitude": int(lon_counts[i]), "latitude": int(lat_counts[i])}
+        for i, name in enumerate(names)
+    }
+
+
+# --- Ingest paralel per file ---
+
+def _as_source(f):
+    """ Ubah input file menjadi sesuatu yang bisa dikirim ke worker process (path atau bytes) """
+    if isinstance(f, (str, os.PathLike)):
+        return os.fspath(f)
+    if hasattr(f, "getvalue"):
+        return f.getvalue()
+    if hasattr(f, "seek"):
+        f.seek(0)
+    return f.read()
+
+
+def sample_rows(f, nrows=2000):
+    """ Beberapa baris awal file (tabel string) tanpa membaca seluruh file """
+    _, head = _file_size_and_head(f, head_bytes=1 << 18)
+    if not head and hasattr(f, "read"):
+        f.seek(0)
+        head = f.read(1 << 18)
+        f.seek(0)
+    if isinstance(head, str):
+        head = head.encode("latin1")
+    head = head[:head.rfind(b"\n") + 1] or head
+    return pd.read_csv(io.BytesIO(head), dtype=str, encoding='latin1', sep="\t", header=None, nrows=nrows)
+
+
+def detect_bati_format(files):
+    """ Format tanggal batimetri dari sampel file pertama (``FORMAT_OPTIONS_BATI``) """
+    for f in files:
+        fmt = detect_format(sample_rows(f)[0], FORMAT_OPTIONS_BATI)
+        if fmt is not None:
+            return fmt
+    raise ValueError("Format tanggal batimetri tidak dapat dideteksi otomatis; pilih format secara manual.")
+
+
+def detect_pasut_formats(f):
+    """ ``(format_tanggal, format_waktu)`` pasut dari sampel baris awal file """
+    sample = sample_rows(f)
+    date_format = detect_format(sample[0], FORMAT_OPTIONS_PASUT_DATE)
+    time_format = detect_format(sample[1], FORMAT_OPTIONS_PASUT_TIME)
+    if date_format is None or time_format is None:
+        raise ValueError("Format tanggal/waktu pasut tidak dapat dideteksi otomatis; pilih format secara manual.")
+    return date_format, time_format
+
+
+def parse_bati_file(source, date_format, name=None):
+    """
+    Parse lengkap satu file batimetri (timestamp, koordinat, kedalaman).
+
+    ``source`` berupa path, bytes, atau file-like. Mengembalikan ``(bati_drop, laporan)``;
+    ``laporan`` berisi jumlah baris mentah/valid, koordinat yang ditolak dan waktu proses.
+    """
+    t0 = time.perf_counter()
+    name = name or _file_name(source if not isinstance(source, bytes) else "")
+    buf = io.BytesIO(source) if isinstance(source, bytes) else source
+    raw = pd.read_csv(buf, dtype=str, encoding='latin1', sep="\t", header=None)
+    bati_drop = clean_bati(raw, date_format)
+    rejected, = bati_drop.attrs["coord_rejected"].values()
+    report = {
+        "file": name,
+        "baris_mentah": len(raw),
+        "baris_valid": len(bati_drop),
+        "lon_ditolak": rejected["longitude"],
+        "lat_ditolak": rejected["latitude"],
+        "duplikat": 0,
+        "detik": time.perf_counter() - t0,
+        "error": None,
+        "dari_cache": False,
+    }
+    return bati_drop, report
+
+
+# Kolom laporan yang disimpan bersama hasil parse di ``ParseCache``
+CACHED_REPORT = ("baris_mentah", "baris_valid", "lon_ditolak", "lat_ditolak")
+
+
+def _cached_report(name, info, t0):
+    """ Laporan file yang diambil dari cache parse (format sama dengan ``parse_bati_file``) """
+    return {"file": name, **{k: info[k] for k in CACHED_REPORT}, "duplikat": 0,
+            "detik": time.perf_counter() - t0, "error": None, "dari_cache": True}
+
+
+def _cache_put(parse_cache, key, frame, report):
+    parse_cache.put(key, frame, {k: int(report[k]) for k in CACHED_REPORT})
+
+
+def load_bati(files, date_format, workers=None, use_processes=True, progress=None,
+              drop_duplicates=True, duplicate_tol=DUPLICATE_TOL, parse_cache=None):
+    """
+    Ingest + cleaning: parse banyak file batimetri secara paralel lalu gabungkan urut waktu.
+
+    ``progress(selesai, total, laporan)`` dipanggil dari thread pemanggil setiap satu file selesai,
+    sehingga aman untuk memperbarui UI; exception dari ``progress`` (misal pembatalan job)
+    menghentikan ingest. File yang gagal dilaporkan (kolom ``error``) dan dilewati.
+    Laporan per file disimpan di ``attrs["ingest_report"]``. Kolom ``"file"`` berisi indeks file
+    asal tiap baris (nama di ``attrs["files"]``), dipakai filter outlier sepanjang lintasan.
+    Ping duplikat antar file (timestamp sama, posisi <= ``duplicate_tol`` derajat) dibuang jika
+    ``drop_duplicates``; jumlahnya per file ada di kolom laporan ``duplikat``.
+    Jika ``parse_cache`` (``sbes.parsecache.ParseCache``) diisi, file yang isinya sudah pernah
+    di-parse dengan format tanggal yang sama diambil dari cache (memmap) tanpa parsing ulang,
+    dan hasil parse file lainnya disimpan ke cache.
+    """
+    files = list(files)
+    if date_format == AUTO:
+        date_format = detect_bati_format(files)
+    names = [_file_name(f) for f in files]
+    workers = workers or os.cpu_count() or 1
+    results = [None] * len(files)
+    reports = [None] * len(files)
+    keys = [None] * len(files)
+    done = 0
+
+    def _done(i, result, error):
+        nonlocal done
+        done += 1
+        if error is None:
+            results[i], reports[i] = result
+            if parse_cache is not None and not reports[i]["dari_cache"]:
+                _cache_put(parse_cache, keys[i], *result)
+        else:
+            reports[i] = {"file": names[i], "baris_mentah": 0, "baris_valid": 0, "lon_ditolak": 0,
+                          "lat_ditolak": 0, "duplikat": 0, "detik": 0.0, "error": str(error), "dari_cache": False}
+        if progress is not None:
+            progress(done, len(files), reports[i])
+
+    todo = list(range(len(files)))
+    if parse_cache is not None:
+        todo = []
+        for i, f in enumerate(files):
+            t0 = time.perf_counter()
+            keys[i] = parse_cache.key(f, date_format)
+            cached = parse_cache.get(keys[i])
+            if cached is None:
+                todo.append(i)
+            else:
+                _done(i, (cached[0], _cached_report(names[i], cached[1], t0)), None)
+
+    if workers == 1 or len(todo) <= 1:
+        for i in todo:
+            try:
+                result, error = parse_bati_file(_as_source(files[i]), date_format, names[i]), None
+            except Exception as e:
+                result, error = None, e
+            _done(i, result, error)
+    else:
+        pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with pool_cls(max_workers=min(workers, len(todo))) as pool:
+            futures = {
+                pool.submit(parse_bati_file, _as_source(files[i]), date_format, names[i]): i
+                for i in todo
+            }
+            try:
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    try:
+                        result, error = fut.result(), None
+                    except Exception as e:
+                        result, error = None, e
+                    _done(i, result, error)
+            except BaseException:
+                # Misal progress() melempar pembatalan: file yang belum mulai tidak dikerjakan
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    parts = []
+    for i, r in enumerate(results):
+        if r is not None:
+            r["file"] = np.int16(i)
+            parts.append(r)
+    if not parts:
+        raise ValueError("Tidak ada file batimetri yang berhasil dibaca.")
+    bati_drop, dropped = merge_frames(parts, len(files), drop_duplicates, duplicate_tol)
+    for i, n in enumerate(dropped):
+        reports[i]["duplikat"] = int(n)
+    bati_drop.attrs["files"] = names
+    bati_drop.attrs["coord_rejected"] = {
+        r["file"]: {"longitude": r["lon_ditolak"], "latitude": r["lat_ditolak"]} for r in reports
+    }
+    bati_drop.attrs["ingest_report"] = reports
+    return bati_drop
+
+
+# --- Ingest streaming (memori terbatas) ---
+
+# Perkiraan memori kerja per baris mentah saat parsing satu chunk: tabel string hasil read_csv
+# ditambah string gabungan tanggal+waktu, hasil strip koordinat dan array sementara.
+RAW_ROW_BYTES = 1024
+# Ukuran per ping setelah dikonversi: int64 timestamp + float64 lon/lat + float32 kedalaman + int16 file
+COMPACT_ROW_BYTES = 8 + 8 + 8 + 4 + 2
+
+
+def chunk_rows_for_budget(memory_budget_mb):
+    """ Jumlah baris per chunk agar memori kerja parsing tetap di bawah anggaran (MB) """
+    return max(1_000, int(memory_budget_mb * 1024 * 1024 // RAW_ROW_BYTES))
+
+
+class _ColumnBuffer:
+    """ Array numerik yang tumbuh per chunk tanpa menyalin ulang seluruh isi setiap kali ditambah """
+
+    def __init__(self, capacity):
+        self.size = 0
+        self.columns = {
+            "timestamp": np.empty(capacity, dtype=np.int64),
+            "longitude": np.empty(capacity, dtype=np.float64),
+            "latitude": np.empty(capacity, dtype=np.float64),
+            "kedalaman": np.empty(capacity, dtype=np.float32),
+            "file": np.empty(capacity, dtype=np.int16),
+        }
+
+    def append(self, values):
+        n = len(values["timestamp"])
+        capacity = len(self.columns["timestamp"])
+        if self.size + n > capacity:
+            new_capacity = max(self.size + n, int(capacity * 1.25) + 1)
+            for col, arr in self.columns.items():
+                grown = np.empty(new_capacity, dtype=arr.dtype)
+                grown[:self.size] = arr[:self.size]
+                self.columns[col] = grown
+        for col, arr in self.columns.items():
+            arr[self.size:self.size + n] = values[col]
+        self.size += n
+
+    def finish(self):
+        """ Potong kapasitas sisa; salin hanya jika sisa kapasitas cukup besar """
+        out = {}
+        for col, arr in self.columns.items():
+            view = arr[:self.size]
+            out[col] = view.copy() if len(arr) - self.size > len(arr) // 20 else view
+        self.columns = {}
+        return out
+
+
+def _file_size_and_head(f, head_bytes=1 << 20):
+    """ Ukuran file (byte) dan potongan awalnya, tanpa membaca seluruh isi file """
+    if isinstance(f, (str, os.PathLike)):
+        with open(f, "rb") as fh:
+            return os.path.getsize(f), fh.read(head_bytes)
+    if hasattr(f, "getbuffer"):
+        buf = f.getbuffer()
+        return buf.nbytes, bytes(buf[:head_bytes])
+    return 0, b""
+
+
+def _estimate_rows(files):
+    """ Perkirakan jumlah baris total dari ukuran file dan rata-rata panjang baris di awal file """
+    total_bytes, head = 0, b""
+    for f in files:
+        size, sample = _file_size_and_head(f)
+        total_bytes += size
+        head = head or sample
+    bytes_per_row = len(head) / max(head.count(b"\n"), 1) if head else 64
+    return int(total_bytes / bytes_per_row * 1.02) + 1
+
+
+def stream_bati(files, date_format, memory_budget_mb=256, progress=None,
+                drop_duplicates=True, duplicate_tol=DUPLICATE_TOL, parse_cache=None):
+    """
+    Ingest streaming: baca tiap file per chunk berukuran tetap dan langsung ubah menjadi
+    kolom numerik ringkas (timestamp int64 ns, lon/lat float64, kedalaman float32, indeks file int16).
+
+    Tabel string lengkap tidak pernah disimpan; yang ada di memori hanya satu chunk string
+    (dibatasi ``memory_budget_mb``) ditambah kolom numerik yang sudah terkumpul.
+    Hasil akhir digabung urut waktu per file (dilewati jika sudah urut) dan ping duplikat antar
+    file dibuang seperti pada ``load_bati``. File yang gagal dibaca di chunk mana pun (misal baris
+    rusak) tidak menyumbang baris sama sekali, juga dari chunk yang sudah terbaca sebelumnya.
+    ``progress(selesai, total, laporan)`` dipanggil setiap satu file selesai. ``parse_cache``
+    dipakai seperti pada ``load_bati``: file dari cache disalin dari memmap ke kolom numerik
+    tanpa dibaca per chunk.
+    """
+    files = list(files)
+    if date_format == AUTO:
+        date_format = detect_bati_format(files)
+    chunk_rows = chunk_rows_for_budget(memory_budget_mb)
+    buffer = None
+    reports = []
+    for i, f in enumerate(files):
+        t0 = time.perf_counter()
+        name = _file_name(f)
+        report = {"file": name, "baris_mentah": 0, "baris_valid": 0, "lon_ditolak": 0,
+                  "lat_ditolak": 0, "duplikat": 0, "detik": 0.0, "error": None, "dari_cache": False}
+        cached = None
+        if parse_cache is not None:
+            key = parse_cache.key(f, date_format)
+            cached = parse_cache.get(key)
+        if cached is not None:
+            bati, info = cached
+            if buffer is None:
+                buffer = _ColumnBuffer(_estimate_rows(files))
+            buffer.append({
+                "timestamp": bati["timestamp"].to_numpy().view(np.int64),
+                "longitude": bati["longitude"].to_numpy(),
+                "latitude": bati["latitude"].to_numpy(),
+                "kedalaman": bati["kedalaman"].to_numpy(),
+                "file": np.int16(i),
+            })
+            del bati
+            reports.append(_cached_report(name, info, t0))
+            if progress is not None:
+                progress(i + 1, len(files), reports[-1])
+            continue
+        start = buffer.size if buffer is not None else 0
+        try:
+            if hasattr(f, "seek"):
+                f.seek(0)
+            reader = pd.read_csv(f, dtype=str, encoding='latin1', sep="\t", header=None, chunksize=chunk_rows)
+            for chunk in reader:
+                if buffer is None:
+                    # Kapasitas awal dari ukuran file / rata-rata byte per baris
+                    buffer = _ColumnBuffer(_estimate_rows(files))
+                bati, lon_rejected, lat_rejected = _parse_table(chunk, date_format)
+                del chunk
+                ts = bati["timestamp"].to_numpy(dtype="datetime64[ns]")
+                lon = bati["longitude"].to_numpy(dtype=np.float64)
+                lat = bati["latitude"].to_numpy(dtype=np.float64)
+                depth = bati["kedalaman"].to_numpy(dtype=np.float32)
+                del bati
+                # Mask baris lengkap langsung dari array (tanpa salinan tabel ``notna``)
+                valid = ~np.isnat(ts)
+                valid &= ~np.isnan(lon)
+                valid &= ~np.isnan(lat)
+                valid &= ~np.isnan(depth)
+                buffer.append({
+                    "timestamp": ts.view(np.int64)[valid],
+                    "longitude": lon[valid],
+                    "latitude": lat[valid],
+                    "kedalaman": depth[valid],
+                    "file": np.int16(i),
+                })
+                del ts, lon, lat, depth
+                report["baris_mentah"] += len(valid)
+                report["baris_valid"] += int(valid.sum())
+                report["lon_ditolak"] += int(lon_rejected.sum())
+                report["lat_ditolak"] += int(lat_rejected.sum())
+        except Exception as e:
+            report["error"] = str(e)
+            # File gagal di tengah jalan: baris dari chunk sebelumnya dibuang seperti pada ``load_bati``
+            if buffer is not None:
+                buffer.size = start
+            for col in ("baris_mentah", "baris_valid", "lon_ditolak", "lat_ditolak"):
+                report[col] = 0
+        if parse_cache is not None and report["error"] is None and buffer is not None:
+            _cache_put(parse_cache, key, pd.DataFrame({
+                "timestamp": buffer.columns["timestamp"][start:buffer.size].view("datetime64[ns]"),
+                **{col: buffer.columns[col][start:buffer.size] for col in ("longitude", "latitude", "kedalaman")},
+            }, copy=False), report)
+        report["detik"] = time.perf_counter() - t0
+        reports.append(report)
+        if progress is not None:
+            progress(i + 1, len(files), report)
+
+    if buffer is None or buffer.size == 0:
+        raise ValueError("Tidak ada file batimetri yang berhasil dibaca.")
+    columns = buffer.finish()
+    # Baris di buffer tersusun per file (urutan file), masing-masing umumnya sudah urut waktu;
+    # digabung di tempat agar puncak memori tetap dekat ukuran kolom numerik
+    columns, dropped = merge_columns(columns, run_bounds([r["baris_valid"] for r in reports]), len(files),
+                                     drop_duplicates, duplicate_tol)
+    for report, n in zip(reports, dropped):
+        report["duplikat"] = int(n)
+    columns["timestamp"] = columns["timestamp"].view("datetime64[ns]")
+    bati_drop = pd.DataFrame(columns, copy=False)
+    bati_drop.attrs["files"] = [_file_name(f) for f in files]
+    bati_drop.attrs["coord_rejected"] = {
+        r["file"]: {"longitude": r["lon_ditolak"], "latitude": r["lat_ditolak"]} for r in reports
+    }
+    bati_drop.attrs["ingest_report"] = reports
+    return bati_drop
+
+
+def load_pasut(file, date_format, time_format):
+    """
+    Baca file pasut (tanpa header): kolom [0] Tanggal, [1] Waktu, [2] Tinggi muka air.
+
+    ``date_format``/``time_format`` ``"auto"`` dideteksi dari baris awal file.
+    """
+    data_pasut_raw = pd.read_csv(file, dtype=str, sep="\t", encoding='latin1', header=None)
+    sample = data_pasut_raw.head(2000)
+    if date_format == AUTO:
+        date_format = detect_format(sample[0], FORMAT_OPTIONS_PASUT_DATE)
+    if time_format == AUTO:
+        time_format = detect_format(sample[1], FORMAT_OPTIONS_PASUT_TIME)
+    if date_format is None or time_format is None:
+        raise ValueError("Format tanggal/waktu pasut tidak dapat dideteksi otomatis; pilih format secara manual.")
+    data_pasut_raw["Timestamp"] = parse_timestamps(data_pasut_raw[0], data_pasut_raw[1], date_format, time_format)
+    data_pasut_raw["Depth"] = pd.to_numeric(data_pasut_raw[2], errors="coerce")
+    data_pasut = data_pasut_raw.dropna(subset=["Timestamp", "Depth"])[["Timestamp", "Depth"]].reset_index(drop=True)
+    if len(data_pasut) == 0:
+        raise ValueError("Tidak ada data pasut yang valid setelah pembersihan. Pastikan format tanggal dan waktu sesuai dengan data.")
+    return data_pasut
@@ -0,0 +1,170 @@
+"""
+Instrumentasi ringan per tahap: waktu, jumlah baris masuk/keluar dan puncak memori.
+
+Puncak memori adalah kenaikan puncak RSS proses selama tahap (VmHWM direset sebelum tahap,
+Linux); di luar Linux dipakai puncak alokasi tracemalloc (lebih lambat). Pada server Streamlit
+RSS dibagi semua sesi, jadi angka ini menggambarkan proses server, bukan satu sesi saja.
+
+Catatan tahap dapat ditulis sebagai JSON lines (satu objek per baris) untuk digabung antar
+sesi, dan satu pemanggilan dapat diprofil dengan cProfile (hanya thread pemanggil; worker
+process pool tidak ikut terprofil).
+"""
+
+import cProfile
+import datetime
+import io
+import json
+import marshal
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import uuid
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from .survey import peak_rss_mb, process_rss_mb, release_free_memory, reset_peak_rss
+
+
+@dataclass
+class StageRecord:
+    """ Hasil pengukuran satu tahap """
+    tahap: str
+    detik: float
+    baris_masuk: int = None
+    baris_keluar: int = None
+    puncak_mb: float = None
+    sumber_puncak: str = None  # "rss" atau "tracemalloc"
+    error: str = None
+
+
+def row_count(value):
+    """ Jumlah baris hasil tahap (DataFrame, Series, array, tuple berisi salah satunya); None jika tidak ada """
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    if isinstance(value, tuple) and value:
+        return row_count(value[0])
+    return None
+
+
+def measure_peak(fn, use_tracemalloc=False, release=True):
+    """
+    Jalankan ``fn`` dan kembalikan ``(hasil, detik, puncak_mb, sumber_puncak)``.
+
+    ``release`` mengembalikan memori bebas ke OS lebih dulu agar puncak dihitung dari RSS yang bersih.
+    """
+    if release:
+        release_free_memory()
+    use_rss = not use_tracemalloc and reset_peak_rss()
+    base = process_rss_mb() if use_rss else None
+    if not use_rss:
+        tracemalloc.start()
+    try:
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        if use_rss:
+            return result, elapsed, max(peak_rss_mb() - base, 0.0), "rss"
+        return result, elapsed, tracemalloc.get_traced_memory()[1] / 1024 / 1024, "tracemalloc"
+    finally:
+        if not use_rss:
+            tracemalloc.stop()
+
+
+class StageProbe:
+    """
+    Pencatat tahap untuk satu sesi: menyimpan pengukuran terakhir per tahap dan (opsional)
+    menambahkannya ke file JSON lines ``log_path``.
+
+    Pengukuran bersarang tidak mereset puncak RSS tahap luar; puncak tahap dalam dihitung dari
+    awal tahap luar.
+    """
+
+    def __init__(self, log_path=None, session=None):
+        self.log_path = log_path
+        self.session = session or uuid.uuid4().hex[:12]
+        self.records = {}  # tahap -> StageRecord terakhir
+        self._local = threading.local()  # kedalaman pengukuran bersarang per thread (job latar belakang)
+        self._lock = threading.Lock()
+
+    def measure(self, stage, fn, rows_in=None):
+        """ Jalankan ``fn()`` sambil mengukur tahap ``stage``; hasil ``fn`` dikembalikan apa adanya """
+        record = StageRecord(stage, 0.0, baris_masuk=rows_in)
+        t0 = time.perf_counter()
+        depth = getattr(self._local, "depth", 0) + 1
+        self._local.depth = depth
+        try:
+            if depth > 1:
+                result = fn()
+            else:
+                result, _, record.puncak_mb, record.sumber_puncak = measure_peak(fn, release=False)
+            record.baris_keluar = row_count(result)
+            return result
+        except Exception as e:
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record.detik = time.perf_counter() - t0
+            self._local.depth = depth - 1
+            self._add(record)
+
+    def wrap(self, stage, fn, rows_in=None):
+        """ Callable yang menjalankan ``fn`` lewat ``measure`` (misal untuk data download yang lazy) """
+        return lambda: self.measure(stage, fn, rows_in)
+
+    def _add(self, record):
+        with self._lock:
+            self.records.pop(record.tahap, None)
+            self.records[record.tahap] = record
+        if self.log_path:
+            line = {"waktu": datetime.datetime.now().isoformat(timespec="milliseconds"),
+                    "sesi": self.session, **asdict(record)}
+            try:
+                directory = os.path.dirname(self.log_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(line) + "\n")
+            except OSError:
+                pass  # log opsional; kegagalan menulis tidak menghentikan pengolahan
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+    def to_frame(self):
+        """ Tabel pengukuran terakhir per tahap (urutan tahap dijalankan) """
+        with self._lock:
+            rows = [asdict(r) for r in self.records.values()]
+        columns = list(StageRecord.__dataclass_fields__)
+        frame = pd.DataFrame(rows, columns=columns).astype({"baris_masuk": "Int64", "baris_keluar": "Int64"})
+        return frame.set_index("tahap")
+
+
+def read_log(path):
+    """ Baca file JSON lines hasil ``StageProbe`` menjadi DataFrame (untuk agregasi antar sesi) """
+    return pd.read_json(path, lines=True)
+
+
+def start_profile():
+    """ Mulai cProfile pada thread pemanggil """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler, top=30, sort="cumulative"):
+    """
+    Hentikan profiler; kembalikan ``(isi_file_prof, ringkasan_teks)``.
+
+    ``isi_file_prof`` sama dengan hasil ``Profile.dump_stats`` (dibaca ``pstats``/snakeviz).
+    """
+    profiler.disable()
+    profiler.create_stats()
+    data = marshal.dumps(profiler.stats)  # pstats.Stats(profiler) mengosongkan profiler.stats
+    text = io.StringIO()
+    pstats.Stats(profiler, stream=text).sort_stats(sort).print_stats(top)
+    return data, text.getvalue()
@@ -0,0 +1,167 @@
+"""
+Eksekusi tahap berat di latar belakang (thread pool yang dipakai bersama oleh semua sesi).
+
+Fungsi job menerima objek ``Job`` dan melaporkan kemajuan lewat ``job.progress(...)``; jika job
+dibatalkan, pemanggilan ``progress``/``check_cancelled`` berikutnya melempar ``JobCancelled``
+sehingga pembatalan berlaku di titik laporan berikutnya (misal per file atau per chunk baris),
+bukan di tengah operasi NumPy; job yang dibatalkan tidak menyerahkan hasil walaupun fungsinya
+sempat selesai. Hasil job disimpan sampai diambil (``release``), sehingga sesi yang dimuat ulang
+dapat menyambung kembali ke job yang sama lewat id-nya.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+WAITING, RUNNING, DONE, FAILED, CANCELLED = "menunggu", "berjalan", "selesai", "gagal", "dibatalkan"
+
+
+class JobCancelled(Exception):
+    """ Dilempar di dalam fungsi job setelah job dibatalkan """
+
+
+@dataclass
+class Job:
+    """ Status satu job; ``done``/``total`` dalam satuan bebas (file, baris, langkah) """
+    id: str
+    stage: str
+    key: str = None
+    status: str = WAITING
+    done: int = 0
+    total: int = None
+    text: str = ""
+    result: object = field(default=None, repr=False)
+    error: str = None
+    info: dict = field(default_factory=dict, repr=False)  # data tambahan dari fungsi job (misal profil)
+    submitted: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def running(self):
+        return self.status in (WAITING, RUNNING)
+
+    @property
+    def fraction(self):
+        """ Kemajuan 0..1 (None jika total belum diketahui) """
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.stage} dibatalkan.")
+
+    def progress(self, done, total=None, text=None):
+        """ Perbarui kemajuan (dipanggil dari fungsi job) """
+        self.check_cancelled()
+        self.done = done
+        if total is not None:
+            self.total = total
+        if text is not None:
+            self.text = text
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class JobManager:
+    """
+    Thread pool bersama untuk job latar belakang. ``max_workers`` membatasi jumlah job yang
+    berjalan bersamaan; job berikutnya menunggu (status ``"menunggu"``). Job yang selesai tetapi
+    belum diambil disimpan maksimal ``max_finished`` (yang tertua dibuang lebih dulu).
+    """
+
+    def __init__(self, max_workers=None, max_finished=8):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sbes-job")
+        self._jobs = OrderedDict()  # id -> Job (urutan submit)
+        self._lock = threading.Lock()
+
+    def submit(self, stage, fn, key=None, total=None):
+        """
+        Jalankan ``fn(job)`` di latar belakang dan kembalikan ``Job``-nya. Jika ``key`` diisi dan
+        job dengan kunci sama masih berjalan atau selesai tanpa error (belum diambil), job itu
+        yang dikembalikan.
+        """
+        with self._lock:
+            if key is not None:
+                for job in reversed(self._jobs.values()):
+                    if job.key == key and (job.running or job.status == DONE):
+                        return job
+            job = Job(uuid.uuid4().hex[:12], stage, key, total=total)
+            self._jobs[job.id] = job
+            self._trim()
+        self._pool.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        job.started = time.time()
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            result = fn(job)
+            # Dibatalkan saat langkah terakhir berjalan: hasil tidak diserahkan
+            job.check_cancelled()
+            job.result = result
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished = time.time()
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.running]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """ Job dengan id ``job_id`` (None jika tidak ada atau sudah diambil) """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def release(self, job_id):
+        """ Lepaskan job yang sudah selesai (hasilnya tidak lagi ditahan manajer) """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and not job.running:
+                del self._jobs[job_id]
+            return job
+
+    def summary(self):
+        """ Tabel semua job yang diketahui manajer (status, kemajuan, durasi) """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        rows = [{"id": j.id, "tahap": j.stage, "status": j.status, "selesai": j.done, "total": j.total,
+                 "detik": round(j.elapsed, 1), "keterangan": j.error or j.text} for j in jobs]
+        return pd.DataFrame(rows, columns=["id", "tahap", "status", "selesai", "total", "detik", "keterangan"])
+
+    def shutdown(self, cancel=True):
+        if cancel:
+            with self._lock:
+                for job in self._jobs.values():
+                    job.cancel()
+        self._pool.shutdown(wait=False, cancel_futures=cancel)
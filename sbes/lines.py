@@ -0,0 +1,245 @@
+"""
+Segmentasi track survei menjadi lajur (survey line).
+
+Lajur diputus pada pergantian file/zona, jeda waktu antar ping yang panjang, belokan
+(perubahan heading dalam satu jendela ping) dan kecepatan di luar rentang lajur (kapal
+berhenti/manuver pelan, lompatan posisi GPS). Ping di belokan dan segmen yang terlalu pendek
+diberi ID -1 (bukan bagian dari lajur). Semua langkah tervektorisasi (tanpa loop per segmen).
+
+ID lajur disimpan di kolom ``"lajur"``; ``line_stats`` meringkas tiap lajur dan ``map_lines``
+menjalankan suatu tahap per lajur di thread pool.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+LINE_COLUMN = "lajur"
+M_PER_DEG = 111_320.0
+
+# Parameter default segmentasi lajur dari lon/lat (``survey_lines``)
+LINE_DEFAULTS = {
+    "max_gap_s": 30.0,
+    "max_turn_deg": 30.0,
+    "heading_window": 15,
+    "min_pings": 20,
+    "min_speed": 0.3,
+    "max_speed": 15.0,
+}
+
+
+def _wrap_deg(angle):
+    """ Selisih sudut ke rentang [-180, 180) """
+    return (angle + 180.0) % 360.0 - 180.0
+
+
+def track_heading(x, y, window=15):
+    """ Heading (derajat dari utara, searah jarum jam) dari perpindahan ``window`` ping di kiri-kanan """
+    n = len(x)
+    ahead = np.minimum(np.arange(n) + window, n - 1)
+    behind = np.maximum(np.arange(n) - window, 0)
+    return np.degrees(np.arctan2(x[ahead] - x[behind], y[ahead] - y[behind])) % 360.0
+
+
+def _window_ends(starts, n, window):
+    """ Indeks ``window`` ping di kiri-kanan tiap ping, dipotong di batas segmen ``starts`` """
+    is_start = np.zeros(n, dtype=bool)
+    is_start[starts] = True
+    segment = np.cumsum(is_start) - 1
+    last = np.append(starts[1:], n) - 1
+    idx = np.arange(n)
+    return np.maximum(idx - window, starts[segment]), np.minimum(idx + window, last[segment])
+
+
+def local_xy(lon, lat):
+    """ Koordinat lokal (meter) dari lon/lat: proyeksi ekuirektangular di sekitar tengah data """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    if len(lon) == 0:
+        return lon, lat
+    lon0 = (np.nanmin(lon) + np.nanmax(lon)) / 2
+    lat0 = (np.nanmin(lat) + np.nanmax(lat)) / 2
+    return (lon - lon0) * M_PER_DEG * np.cos(np.radians(lat0)), (lat - lat0) * M_PER_DEG
+
+
+def segment_lines(timestamps, x, y, groups=None, max_gap_s=30.0, max_turn_deg=30.0,
+                  heading_window=15, min_pings=20, min_speed=None, max_speed=None):
+    """
+    ID lajur (int32) untuk tiap ping; -1 = belokan atau segmen lebih pendek dari ``min_pings``.
+
+    Data diproses per ``groups`` (misal indeks file atau zona UTM) dalam urutan waktu; urutan
+    baris hasil sama dengan input. Lajur baru dimulai jika jeda antar ping > ``max_gap_s`` detik
+    atau heading berubah > ``max_turn_deg`` derajat dalam ``heading_window`` ping. Jika
+    ``min_speed``/``max_speed`` (m/s, ``x``/``y`` dalam meter) diisi, ping dengan kecepatan di
+    jendela yang sama di luar rentang itu juga bukan bagian dari lajur.
+    """
+    n = len(x)
+    ts = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if groups is None:
+        order = np.argsort(ts, kind="stable")
+        group_sorted = np.zeros(n, dtype=np.int8)
+    else:
+        groups = np.asarray(groups)
+        order = np.lexsort((ts, groups))
+        group_sorted = groups[order]
+    ts, x, y = ts[order], x[order], y[order]
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = group_sorted[1:] != group_sorted[:-1]
+    gap = np.zeros(n, dtype=bool)
+    gap[1:] = np.diff(ts) > max_gap_s * 1e9
+
+    # Heading dihitung per segmen (grup/jeda) agar jendela tidak melintasi batas file/zona
+    segment_start = new_group | gap
+    starts = np.flatnonzero(segment_start)
+    behind, ahead = _window_ends(starts, n, heading_window)
+    dx, dy = x[ahead] - x[behind], y[ahead] - y[behind]
+    heading = np.degrees(np.arctan2(dx, dy)) % 360.0
+    turn = np.zeros(n, dtype=bool)
+    w = heading_window
+    if 0 < w < n:
+        # Heading hanya dibandingkan dengan ping w sebelumnya di segmen yang sama
+        segment_id = np.cumsum(segment_start)
+        turn[w:] = (np.abs(_wrap_deg(heading[w:] - heading[:-w])) > max_turn_deg) & (segment_id[w:] == segment_id[:-w])
+    if min_speed is not None or max_speed is not None:
+        dt = (ts[ahead] - ts[behind]) / 1e9
+        # Jendela tanpa selisih waktu (segmen satu ping, timestamp per detik) tidak dinilai
+        with np.errstate(invalid="ignore", divide="ignore"):
+            speed = np.where(dt > 0, np.hypot(dx, dy) / dt, np.nan)
+        if min_speed is not None:
+            turn |= speed < min_speed
+        if max_speed is not None:
+            turn |= speed > max_speed
+
+    # Lajur = potongan berturut-turut tanpa belokan, diputus juga oleh grup/jeda
+    in_line = ~turn
+    breaks = new_group | gap | (in_line & np.r_[True, ~in_line[:-1]])
+    segment = np.cumsum(breaks) - 1
+    segment[~in_line] = -1
+    sizes = np.bincount(segment[in_line], minlength=segment.max() + 1)
+    valid = (segment >= 0) & (sizes[np.maximum(segment, 0)] >= min_pings)
+    # Nomori ulang lajur yang valid secara berurutan
+    _, line_sorted = np.unique(segment[valid], return_inverse=True)
+    line = np.full(n, -1, dtype=np.int32)
+    line[np.flatnonzero(valid)] = line_sorted
+    out = np.empty(n, dtype=np.int32)
+    out[order] = line
+    return out
+
+
+def line_headings(x, y, line_id):
+    """ Heading tiap lajur dari ping pertama ke terakhir (derajat 0-180; arah bolak-balik dianggap sama) """
+    valid = np.flatnonzero(line_id >= 0)
+    ids = line_id[valid]
+    n_lines = int(ids.max()) + 1 if len(ids) else 0
+    first = np.full(n_lines, len(line_id))
+    last = np.full(n_lines, -1)
+    np.minimum.at(first, ids, valid)
+    np.maximum.at(last, ids, valid)
+    return np.degrees(np.arctan2(x[last] - x[first], y[last] - y[first])) % 180.0
+
+
+def survey_lines(bati, **params):
+    """
+    Tahap segmentasi lajur: ID lajur (int32, -1 = di luar lajur) tiap baris tabel batimetri dari
+    ``timestamp``/``longitude``/``latitude`` (per file jika kolom ``file`` ada). ``params``
+    menimpa ``LINE_DEFAULTS`` (argumen ``segment_lines``).
+    """
+    params = {**LINE_DEFAULTS, **params}
+    x, y = local_xy(bati["longitude"].to_numpy(), bati["latitude"].to_numpy())
+    groups = bati["file"].to_numpy() if "file" in bati.columns else None
+    return segment_lines(bati["timestamp"].to_numpy(), x, y, groups=groups, **params)
+
+
+def line_groups(bati, line_id=None):
+    """
+    Kunci grup per baris untuk pemrosesan per lajur: ID lajur, atau ``-1 - file`` untuk ping di
+    luar lajur (sehingga ping belokan tetap dikelompokkan per file, tidak digabung antar file).
+    """
+    line_id = np.asarray(bati[LINE_COLUMN] if line_id is None else line_id)
+    if "file" not in bati.columns:
+        return line_id
+    return np.where(line_id >= 0, line_id, -1 - bati["file"].to_numpy().astype(np.int64))
+
+
+def group_rows(groups):
+    """ Daftar indeks baris (urutan asli) per nilai ``groups`` """
+    order = np.argsort(groups, kind="stable")
+    cuts = np.flatnonzero(np.diff(groups[order])) + 1
+    return np.split(order, cuts)
+
+
+def map_lines(bati, fn, line_id=None, workers=None):
+    """
+    Jalankan ``fn(potongan)`` untuk tiap lajur (``line_groups``) di thread pool lalu gabungkan
+    hasilnya dalam urutan baris ``bati``. ``fn`` mengembalikan array atau tabel sepanjang potongan.
+    """
+    pieces = group_rows(line_groups(bati, line_id))
+    workers = workers or os.cpu_count() or 1
+    run = lambda rows: fn(bati.take(rows).reset_index(drop=True))  # noqa: E731
+    if workers == 1 or len(pieces) == 1:
+        results = [run(rows) for rows in pieces]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(pieces))) as pool:
+            results = list(pool.map(run, pieces))
+    rows = np.concatenate(pieces) if pieces else np.empty(0, dtype=np.int64)
+    inverse = np.empty(len(rows), dtype=np.int64)
+    inverse[rows] = np.arange(len(rows))
+    if results and isinstance(results[0], pd.DataFrame):
+        return pd.concat(results, ignore_index=True).take(inverse).reset_index(drop=True)
+    return np.concatenate([np.asarray(r) for r in results])[inverse]
+
+
+def line_stats(bati, line_id=None, depth_col="kedalaman"):
+    """
+    Ringkasan per lajur: file, jumlah ping, waktu mulai/selesai, durasi, panjang lintasan (m),
+    heading awal-akhir, kecepatan rata-rata dan statistik kedalaman ``depth_col``. Panjang
+    dihitung dari ``X_UTM``/``Y_UTM`` jika ada, selain itu dari lon/lat (``local_xy``).
+    """
+    line_id = np.asarray(bati[LINE_COLUMN] if line_id is None else line_id)
+    columns = ["lajur", "file", "ping", "mulai", "selesai", "durasi_s", "panjang_m", "heading",
+               "kecepatan_ms", "kedalaman_min", "kedalaman_rata2", "kedalaman_maks", "kedalaman_std"]
+    rows = np.flatnonzero(line_id >= 0)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=columns)
+    # Baris tiap lajur berurutan waktu; urutkan per lajur dengan tetap mempertahankan urutan itu
+    rows = rows[np.argsort(line_id[rows], kind="stable")]
+    ids = line_id[rows]
+    if {"X_UTM", "Y_UTM"} <= set(bati.columns):
+        x, y = bati["X_UTM"].to_numpy()[rows], bati["Y_UTM"].to_numpy()[rows]
+    else:
+        x, y = local_xy(bati["longitude"].to_numpy()[rows], bati["latitude"].to_numpy()[rows])
+    ts = bati["timestamp"].to_numpy(dtype="datetime64[ns]")[rows]
+    depth = bati[depth_col].to_numpy().astype(np.float64)[rows]
+
+    first = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    last = np.append(first[1:], len(ids)) - 1
+    step = np.hypot(np.diff(x), np.diff(y))
+    step[ids[1:] != ids[:-1]] = 0.0
+    length = np.add.reduceat(np.r_[0.0, step], first)
+    duration = (ts[last] - ts[first]) / np.timedelta64(1, "s")
+    count = last - first + 1
+    mean = np.add.reduceat(depth, first) / count
+    var = np.add.reduceat(depth ** 2, first) / count - mean ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        speed = np.where(duration > 0, length / duration, np.nan)
+    stats = pd.DataFrame({
+        "lajur": ids[first],
+        "file": bati["file"].to_numpy()[rows[first]] if "file" in bati.columns else -1,
+        "ping": count,
+        "mulai": ts[first],
+        "selesai": ts[last],
+        "durasi_s": duration,
+        "panjang_m": length,
+        "heading": np.degrees(np.arctan2(x[last] - x[first], y[last] - y[first])) % 360.0,
+        "kecepatan_ms": speed,
+        "kedalaman_min": np.minimum.reduceat(depth, first),
+        "kedalaman_rata2": mean,
+        "kedalaman_maks": np.maximum.reduceat(depth, first),
+        "kedalaman_std": np.sqrt(np.maximum(var * count / np.maximum(count - 1, 1), 0.0)),
+    }, columns=columns)
+    return stats
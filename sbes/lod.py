@@ -0,0 +1,109 @@
+"""
+Downsampling deret waktu untuk plot (level of detail).
+
+Plot kedalaman dan pasut tidak perlu menggambar jutaan titik: lebar gambar hanya beberapa
+ratus piksel. Titik yang digambar dipilih dengan metode yang menjaga bentuk kurva:
+
+- ``"minmax"``: per kolom piksel diambil titik pertama, minimum, maksimum dan terakhir
+  (M4), sehingga spike/outlier tetap terlihat persis seperti plot resolusi penuh.
+- ``"lttb"``: Largest-Triangle-Three-Buckets, satu titik per bucket yang paling
+  menentukan bentuk kurva.
+
+Semua fungsi mengembalikan indeks ke array asli (resolusi penuh), sehingga jendela waktu
+(zoom) selalu di-sample ulang dari data lengkap.
+"""
+
+import numpy as np
+
+LOD_METHODS = {
+    "Min/max per piksel": "minmax",
+    "LTTB": "lttb",
+}
+
+
+def _sorted_order(x):
+    """ None jika ``x`` sudah urut naik, selain itu urutan argsort """
+    if len(x) < 2 or (x[1:] >= x[:-1]).all():
+        return None
+    return np.argsort(x, kind="stable")
+
+
+def minmax_indices(x, y, n_buckets):
+    """ Indeks titik pertama/min/maks/terakhir per bucket waktu (``x`` urut naik, int atau float) """
+    n = len(x)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+    x0, span = x[0], x[-1] - x[0]
+    if span > 0:
+        edges = x0 + np.floor(np.arange(1, n_buckets) * (float(span) / n_buckets)).astype(x.dtype)
+        starts = np.unique(np.concatenate([[0], np.searchsorted(x, edges, side="left")]))
+        starts = starts[starts < n]
+    else:
+        starts = np.linspace(0, n, n_buckets, endpoint=False).astype(np.int64)
+    stops = np.append(starts[1:], n)
+    seg_id = np.repeat(np.arange(len(starts)), stops - starts)
+
+    picks = [starts, stops - 1]
+    for reduce in (np.fmin, np.fmax):
+        seg_value = reduce.reduceat(y, starts)
+        # Indeks pertama di tiap bucket yang nilainya sama dengan min/maks bucket
+        hits = np.flatnonzero(y == seg_value[seg_id])
+        if len(hits):
+            picks.append(hits[np.minimum(np.searchsorted(hits, starts), len(hits) - 1)])
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(x, y, n_out):
+    """ Indeks hasil Largest-Triangle-Three-Buckets dengan ``n_out`` titik (``x`` urut naik) """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = (x - x[0]).astype(np.float64)
+    yf = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xf[hi:next_hi].mean()
+        avg_y = yf[hi:next_hi].mean()
+        # Luas segitiga (titik terpilih sebelumnya, kandidat, rata-rata bucket berikutnya)
+        area = np.abs((xf[a] - avg_x) * (yf[lo:hi] - yf[a]) - (xf[a] - xf[lo:hi]) * (avg_y - yf[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample_indices(x, y, width_px, method="minmax", window=None):
+    """
+    Pilih titik yang digambar untuk plot selebar ``width_px`` piksel.
+
+    ``x`` boleh datetime64 atau angka; ``window`` = ``(awal, akhir)`` membatasi ke jendela
+    waktu (inklusif) sebelum sampling. Jumlah titik maksimum: 4 x ``width_px`` untuk
+    ``"minmax"`` dan 2 x ``width_px`` untuk ``"lttb"``.
+    """
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        x = x.astype("datetime64[ns]").view(np.int64)
+        if window is not None:
+            window = tuple(np.datetime64(w, "ns").astype(np.int64) for w in window)
+    y = np.asarray(y)
+    order = _sorted_order(x)
+    if order is not None:
+        x, y = x[order], y[order]
+
+    start, stop = 0, len(x)
+    if window is not None:
+        start = int(np.searchsorted(x, window[0], side="left"))
+        stop = int(np.searchsorted(x, window[1], side="right"))
+    width_px = max(int(width_px), 1)
+    if method == "lttb":
+        idx = lttb_indices(x[start:stop], y[start:stop], 2 * width_px)
+    elif method == "minmax":
+        idx = minmax_indices(x[start:stop], y[start:stop], width_px)
+    else:
+        raise ValueError(f"Metode downsampling tidak dikenal: {method!r}")
+    idx = idx + start
+    return idx if order is None else order[idx]
@@ -0,0 +1,268 @@
+"""
+Penggabungan sounding per file yang sudah urut waktu (merge k-way) dan deteksi ping duplikat.
+
+Setiap file log sudah urut waktu, sehingga gabungan file tidak perlu diurutkan ulang penuh:
+
+- file diurutkan menurut waktu awalnya; file yang rentang waktunya tidak bertumpang tindih
+  cukup disambung (O(n));
+- hanya kelompok file yang bertumpang tindih yang digabung dengan argsort stabil NumPy
+  (timsort memakai run yang sudah urut, jadi O(n log k) untuk k file dalam kelompok; merge
+  pasangan per level di Python lebih lambat dari ini).
+
+Hasilnya identik dengan ``sort_values("timestamp", kind="stable")`` atas gabungan file.
+
+Ping duplikat (file terunggah dua kali, ekspor log yang bertumpang tindih) dikenali dari
+timestamp yang sama dan posisi yang sama (selisih lon/lat <= ``tol`` derajat) pada file yang
+berbeda; ping dari file yang lebih dulu (indeks lebih kecil) dipertahankan.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Toleransi posisi duplikat (derajat, ~0,1 m); ping berbeda dari satu kapal dalam detik yang
+# sama berjarak jauh lebih besar
+DUPLICATE_TOL = 1e-6
+
+
+def run_bounds(lengths):
+    """ Batas run ``[0, n1, n1+n2, ...]`` dari jumlah baris tiap file """
+    return np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+
+
+def sorted_order(ts):
+    """ None jika ``ts`` sudah urut naik, selain itu urutan argsort stabil """
+    if len(ts) < 2 or (ts[1:] >= ts[:-1]).all():
+        return None
+    return np.argsort(ts, kind="stable")
+
+
+def run_clusters(first, last):
+    """
+    Id kelompok tiap run dari waktu awal/akhirnya: run diurutkan menurut waktu awal (seri:
+    urutan file) dan run yang dimulai sebelum/tepat pada akhir run sebelumnya masuk kelompok
+    yang sama. Id kelompok naik mengikuti waktu.
+    """
+    first, last = np.asarray(first), np.asarray(last)
+    run_order = np.lexsort((np.arange(len(first)), first))
+    reach = np.maximum.accumulate(last[run_order])
+    new_cluster = np.concatenate([[True], first[run_order][1:] > reach[:-1]])
+    cluster_id = np.empty(len(first), dtype=np.int64)
+    cluster_id[run_order] = np.cumsum(new_cluster) - 1
+    return cluster_id
+
+
+def merge_order(ts, bounds):
+    """
+    Urutan baris hasil merge run ``ts[bounds[i]:bounds[i+1]]`` (masing-masing urut naik), sama
+    dengan ``np.argsort(ts, kind="stable")``. None jika gabungan sudah urut. Jika ada run yang
+    ternyata belum urut, seluruh ``ts`` diurutkan biasa.
+    """
+    ts = np.asarray(ts)
+    if len(ts) < 2:
+        return None
+    drops = np.flatnonzero(ts[1:] < ts[:-1]) + 1
+    if len(drops) == 0:
+        return None
+    bounds = np.asarray(bounds, dtype=np.int64)
+    if not np.isin(drops, bounds).all():
+        return np.argsort(ts, kind="stable")
+
+    starts, stops = bounds[:-1], bounds[1:]
+    nonempty = stops > starts
+    starts, stops = starts[nonempty], stops[nonempty]
+    cluster_id = run_clusters(ts[starts], ts[stops - 1])
+    # Run per kelompok dalam urutan asli agar seri waktu tetap mengikuti urutan file (stabil)
+    run_order = np.lexsort((np.arange(len(starts)), cluster_id))
+    cluster_start = np.flatnonzero(np.concatenate([[True], np.diff(cluster_id[run_order]) != 0]))
+
+    pieces = []
+    for runs in np.split(run_order, cluster_start[1:]):
+        if len(runs) == 1:
+            pieces.append(np.arange(starts[runs[0]], stops[runs[0]]))
+            continue
+        if runs[-1] - runs[0] + 1 == len(runs):
+            lo, hi = starts[runs[0]], stops[runs[-1]]
+            pieces.append(lo + np.argsort(ts[lo:hi], kind="stable"))
+            continue
+        idx = np.concatenate([np.arange(starts[r], stops[r]) for r in runs])
+        pieces.append(idx[np.argsort(ts[idx], kind="stable")])
+    return np.concatenate(pieces)
+
+
+def _pairs_in_groups(offset):
+    """ Pasangan (baris, baris sebelumnya dalam kelompok) dari posisi ``offset`` tiap baris di kelompoknya """
+    rows = np.repeat(np.arange(len(offset)), offset)
+    if len(rows) == 0:
+        return rows, rows
+    back = np.arange(len(rows)) - np.repeat(np.cumsum(offset) - offset, offset) + 1
+    return rows, rows - back
+
+
+def duplicate_mask(ts, lon, lat, file, tol=DUPLICATE_TOL):
+    """
+    Mask ping duplikat pada data urut waktu: ada ping lebih awal dengan timestamp sama dari file
+    lain yang posisinya berselisih <= ``tol`` derajat. Hanya timestamp yang muncul di lebih dari
+    satu file yang dibandingkan.
+    """
+    n = len(ts)
+    dup = np.zeros(n, dtype=bool)
+    if n < 2:
+        return dup
+    ts, file = np.asarray(ts), np.asarray(file)
+    starts = np.flatnonzero(np.concatenate([[True], ts[1:] != ts[:-1]]))
+    multi = np.minimum.reduceat(file, starts) != np.maximum.reduceat(file, starts)
+    if not multi.any():
+        return dup
+    sizes = np.diff(np.append(starts, n))
+    # Baris kandidat: anggota kelompok timestamp yang berisi lebih dari satu file
+    cand = np.repeat(multi, sizes)
+    rows = np.flatnonzero(cand)
+    offset = rows - np.repeat(starts[multi], sizes[multi])
+    i, j = _pairs_in_groups(offset)
+    i, j = rows[i], rows[j]
+    lon, lat = np.asarray(lon), np.asarray(lat)
+    same = (file[i] != file[j]) & (np.abs(lon[i] - lon[j]) <= tol) & (np.abs(lat[i] - lat[j]) <= tol)
+    dup[i[same]] = True
+    return dup
+
+
+def match_existing(ts_old, lon_old, lat_old, ts_new, lon_new, lat_new, tol=DUPLICATE_TOL):
+    """ Mask baris baru yang sudah ada di data lama (``ts_old`` urut): timestamp sama, posisi <= ``tol`` """
+    ts_old, ts_new = np.asarray(ts_old), np.asarray(ts_new)
+    left = np.searchsorted(ts_old, ts_new, side="left")
+    count = np.searchsorted(ts_old, ts_new, side="right") - left
+    dup = np.zeros(len(ts_new), dtype=bool)
+    if not count.any():
+        return dup
+    new_idx = np.repeat(np.arange(len(ts_new)), count)
+    old_idx = np.repeat(left, count) + np.arange(len(new_idx)) - np.repeat(np.cumsum(count) - count, count)
+    lon_old, lat_old = np.asarray(lon_old), np.asarray(lat_old)
+    same = (np.abs(np.asarray(lon_new)[new_idx] - lon_old[old_idx]) <= tol) & \
+        (np.abs(np.asarray(lat_new)[new_idx] - lat_old[old_idx]) <= tol)
+    dup[new_idx[same]] = True
+    return dup
+
+
+def merge_frames(parts, num_files, drop_duplicates=True, tol=DUPLICATE_TOL):
+    """
+    Gabungkan tabel per file (masing-masing urut waktu, kolom ``file`` = indeks file) menjadi
+    satu tabel urut waktu; ping duplikat antar file dibuang jika ``drop_duplicates``.
+    Mengembalikan ``(tabel, jumlah_duplikat_per_file)``.
+
+    Tabel disambung dalam urutan kelompok waktu (``run_clusters``), sehingga file yang tidak
+    bertumpang tindih tidak perlu disalin ulang setelah ``concat``; hanya baris dalam kelompok
+    yang bertumpang tindih yang diurutkan dan diperiksa duplikatnya.
+    """
+    dropped = np.zeros(num_files, dtype=np.int64)
+    if not any(len(p) for p in parts):
+        return pd.concat(parts, ignore_index=True), dropped
+    parts = [p for p in parts if len(p)]
+    stamps = [p["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64) for p in parts]
+    cluster_id = run_clusters([t[0] for t in stamps], [t[-1] for t in stamps])
+    order = np.lexsort((np.arange(len(parts)), cluster_id))
+    merged = pd.concat([parts[i] for i in order], ignore_index=True)
+    bounds = run_bounds([len(parts[i]) for i in order])
+    ts = np.concatenate([stamps[i] for i in order])
+    del stamps
+
+    row_order = merge_order(ts, bounds)
+    keep = None
+    if drop_duplicates:
+        # Duplikat hanya mungkin di kelompok berisi lebih dari satu file (baris kelompok berurutan)
+        _, first_run, size = np.unique(cluster_id[order], return_index=True, return_counts=True)
+        dup = np.zeros(len(merged), dtype=bool)
+        file = merged["file"].to_numpy()
+        lon, lat = merged["longitude"].to_numpy(), merged["latitude"].to_numpy()
+        for run, count in zip(first_run[size > 1], size[size > 1]):
+            lo, hi = bounds[run], bounds[run + count]
+            rows = slice(lo, hi) if row_order is None else row_order[lo:hi]
+            dup[lo:hi] = duplicate_mask(ts[rows], lon[rows], lat[rows], file[rows], tol)
+        if dup.any():
+            dup_rows = np.flatnonzero(dup) if row_order is None else row_order[dup]
+            dropped = np.bincount(file[dup_rows], minlength=num_files)
+            keep = np.flatnonzero(~dup) if row_order is None else row_order[~dup]
+    if keep is None:
+        keep = row_order
+    if keep is not None:
+        merged = merged.take(keep).reset_index(drop=True)
+    return merged, dropped
+
+
+def _merge_plan(ts, bounds, lon, lat, file, num_files, drop_duplicates, tol):
+    """
+    Rencana penyusunan baris ``merge_columns``: daftar potongan berurutan, masing-masing
+    ``(awal, akhir)`` (blok baris utuh) atau array indeks baris (kelompok yang bertumpang tindih,
+    sudah urut waktu dan tanpa duplikat), serta jumlah duplikat per file.
+    """
+    dropped = np.zeros(num_files, dtype=np.int64)
+    bounds = np.asarray(bounds, dtype=np.int64)
+    starts, stops = bounds[:-1], bounds[1:]
+    runs = np.flatnonzero(stops > starts)
+    if len(runs) == 0:
+        return [], dropped
+    drops = np.flatnonzero(ts[1:] < ts[:-1]) + 1
+    unsorted = not np.isin(drops, bounds).all()
+    if unsorted:
+        # Ada file yang tidak urut waktu: urutkan semua baris sebagai satu kelompok
+        groups = [runs]
+    else:
+        cluster_id = run_clusters(ts[starts[runs]], ts[stops[runs] - 1])
+        order = np.lexsort((runs, cluster_id))
+        cuts = np.flatnonzero(np.diff(cluster_id[order])) + 1
+        groups = [runs[g] for g in np.split(order, cuts)]
+    plan = []
+    for group in groups:
+        if len(group) == 1 and not unsorted:
+            plan.append((int(starts[group[0]]), int(stops[group[0]])))
+            continue
+        idx = np.concatenate([np.arange(starts[r], stops[r]) for r in group])
+        idx = idx[np.argsort(ts[idx], kind="stable")]
+        if drop_duplicates:
+            dup = duplicate_mask(ts[idx], lon[idx], lat[idx], file[idx], tol)
+            if dup.any():
+                dropped += np.bincount(file[idx[dup]], minlength=num_files)
+                idx = idx[~dup]
+        plan.append(idx)
+    return plan, dropped
+
+
+def merge_columns(columns, bounds, num_files, drop_duplicates=True, tol=DUPLICATE_TOL):
+    """
+    ``merge_frames`` untuk kolom numerik yang sudah tersusun per file (``bounds`` = batas baris
+    tiap file; kolom ``timestamp`` int64, ``longitude``, ``latitude``, ``file``), dikerjakan di
+    tempat: hanya kelompok file yang bertumpang tindih yang diurutkan dan diperiksa duplikatnya,
+    dan kolom disusun ulang satu per satu lewat satu buffer bantu. Jika file sudah berurutan
+    tanpa tumpang tindih, kolom tidak disentuh. Mengembalikan ``(kolom, jumlah_duplikat_per_file)``.
+    """
+    ts = columns["timestamp"]
+    plan, dropped = _merge_plan(ts, bounds, columns["longitude"], columns["latitude"], columns["file"],
+                                num_files, drop_duplicates, tol)
+    n = len(ts)
+    # Rencana identitas: semua potongan berupa blok yang bersambung sesuai urutan baris
+    pos = 0
+    identity = True
+    for piece in plan:
+        if not isinstance(piece, tuple) or piece[0] != pos:
+            identity = False
+            break
+        pos = piece[1]
+    if identity and pos == n:
+        return columns, dropped
+
+    scratch = np.empty(n * max(arr.itemsize for arr in columns.values()), dtype=np.uint8)
+    m = 0
+    for col, arr in columns.items():
+        out = scratch[:n * arr.itemsize].view(arr.dtype)
+        m = 0
+        for piece in plan:
+            if isinstance(piece, tuple):
+                k = piece[1] - piece[0]
+                out[m:m + k] = arr[piece[0]:piece[1]]
+            else:
+                k = len(piece)
+                np.take(arr, piece, out=out[m:m + k])
+            m += k
+        arr[:m] = out[:m]
+        columns[col] = arr[:m]
+    del scratch
+    return columns, dropped
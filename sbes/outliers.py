@@ -0,0 +1,164 @@
+"""
+Deteksi outlier kedalaman.
+
+- ``"iqr"``: batas IQR global atas seluruh survei (metode awal aplikasi), atau per lajur jika
+  data sudah disegmentasi (``sbes.lines``).
+- ``"rolling"``: median dan MAD bergulir sepanjang lintasan, per file/lajur. Spike dinilai
+  terhadap kedalaman lokal sehingga dasar laut yang landai/curam tidak ikut ditandai.
+  Median bergulir pandas memakai skiplist: O(n log w) untuk jendela w ping. Grup (lajur)
+  dapat diproses paralel di thread pool.
+
+Semua fungsi mengembalikan mask boolean: True = outlier.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .lines import LINE_COLUMN, group_rows, line_groups
+
+OUTLIER_METHODS = {
+    "IQR global": "iqr",
+    "Median/MAD bergulir (sepanjang lintasan)": "rolling",
+}
+
+# Faktor skala MAD terhadap simpangan baku untuk data normal
+MAD_SCALE = 1.4826
+
+
+def iqr_bounds(depth, k=1.5):
+    """ Hitung batas bawah dan atas outlier berdasarkan IQR """
+    Q1 = depth.quantile(0.25)
+    Q3 = depth.quantile(0.75)
+    IQR = Q3 - Q1
+    return Q1 - k * IQR, Q3 + k * IQR
+
+
+def iqr_outliers(depth, k=1.5, groups=None):
+    """ Mask outlier berdasarkan batas IQR global, atau per ``groups`` (misal lajur) jika diisi """
+    depth = pd.Series(depth, copy=False)
+    if groups is None:
+        lower, upper = iqr_bounds(depth, k)
+        return ((depth < lower) | (depth > upper)).to_numpy()
+    groups = np.asarray(groups)
+    quartiles = depth.groupby(groups).quantile([0.25, 0.75]).unstack()
+    pos = quartiles.index.get_indexer(groups)
+    q1, q3 = quartiles[0.25].to_numpy()[pos], quartiles[0.75].to_numpy()[pos]
+    values = depth.to_numpy()
+    return (values < q1 - k * (q3 - q1)) | (values > q3 + k * (q3 - q1))
+
+
+def _rolling_median(values, window, timestamps=None):
+    """ Median bergulir terpusat; ``window`` jumlah ping (int) atau durasi (misal ``"30s"``) """
+    if timestamps is None:
+        s = pd.Series(values, copy=False)
+    else:
+        s = pd.Series(values, index=pd.DatetimeIndex(timestamps), copy=False)
+    return s.rolling(window, center=True, min_periods=1).median().to_numpy()
+
+
+def _median_at(values, idx, window, block=65_536):
+    """ Median jendela ``window`` ping (posisi sama dengan rolling terpusat pandas) hanya di indeks ``idx`` """
+    n = len(values)
+    right = (window - 1) // 2
+    left = window - 1 - right
+    out = np.empty(len(idx), dtype=np.float64)
+    interior = (idx >= left) & (idx + right < n)
+    pos = np.flatnonzero(interior)
+    if len(pos):
+        rows = np.lib.stride_tricks.sliding_window_view(values, window)
+        for s in range(0, len(pos), block):
+            p = pos[s:s + block]
+            out[p] = np.median(rows[idx[p] - left], axis=1)
+    # Ujung segmen: jendela terpotong (min_periods=1)
+    for p in np.flatnonzero(~interior):
+        i = idx[p]
+        out[p] = np.median(values[max(i - left, 0):i + right + 1])
+    return out
+
+
+def _rolling_mad_segment(depth, window, k, min_mad, timestamps=None):
+    depth = depth.astype(np.float64)
+    median = _rolling_median(depth, window, timestamps)
+    deviation = np.abs(depth - median)
+    # MAD minimum mencegah dasar laut datar (kedalaman terkuantisasi, MAD = 0) ditandai semua.
+    # Titik dengan simpangan <= k * min_mad tidak mungkin ditandai, jadi MAD lokal cukup dihitung
+    # di kandidat saja; jika kandidat banyak (data ber-noise tinggi) pakai rolling penuh.
+    candidates = np.flatnonzero(deviation > k * min_mad)
+    outliers = np.zeros(len(depth), dtype=bool)
+    if timestamps is None and len(candidates) * window < len(depth) * 4:
+        mad = _median_at(deviation, candidates, window)
+        outliers[candidates] = deviation[candidates] > k * np.maximum(MAD_SCALE * mad, min_mad)
+        return outliers
+    mad = _rolling_median(deviation, window, timestamps)
+    return deviation > k * np.maximum(MAD_SCALE * mad, min_mad)
+
+
+def rolling_mad_outliers(depth, window=51, k=3.5, groups=None, timestamps=None, window_seconds=None,
+                         min_mad=0.05, workers=1):
+    """
+    Mask outlier dari median/MAD bergulir sepanjang lintasan.
+
+    Titik ditandai jika ``|kedalaman - median lokal| > k * max(1.4826 * MAD lokal, min_mad)``.
+    Jendela berupa ``window`` ping, atau ``window_seconds`` detik jika diisi (butuh ``timestamps``).
+    ``groups`` (misal kolom ``file`` atau lajur) memisahkan lintasan agar jendela tidak melintasi
+    batasnya; grup diproses di ``workers`` thread (None = jumlah CPU). Data di tiap grup
+    diasumsikan urut waktu.
+    """
+    depth = np.asarray(depth)
+    if window_seconds is not None:
+        if timestamps is None:
+            raise ValueError("window_seconds membutuhkan timestamps")
+        timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+        window = f"{int(round(window_seconds * 1000))}ms"
+    else:
+        timestamps = None
+        window = max(int(window), 1)
+
+    if groups is None:
+        return _rolling_mad_segment(depth, window, k, min_mad, timestamps)
+
+    outliers = np.zeros(len(depth), dtype=bool)
+
+    def run(idx):
+        ts = None if timestamps is None else timestamps[idx]
+        outliers[idx] = _rolling_mad_segment(depth[idx], window, k, min_mad, ts)
+
+    pieces = group_rows(np.asarray(groups))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pieces) == 1:
+        for idx in pieces:
+            run(idx)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(pieces))) as pool:
+            list(pool.map(run, pieces))
+    return outliers
+
+
+def detect_outliers(bati, method="iqr", lines=None, **params):
+    """
+    Mask outlier untuk tabel batimetri dengan metode ``"iqr"`` atau ``"rolling"``.
+
+    Untuk ``"rolling"``, ``params`` diteruskan ke ``rolling_mad_outliers``; jika ``by_file``
+    (default True) dan kolom ``file`` ada, jendela dihitung per file. ``lines`` (ID lajur per
+    baris; default kolom ``"lajur"`` jika ada) membuat kedua metode dihitung per lajur
+    (``by_line``, default True; ping di luar lajur per file).
+    """
+    params = dict(params)
+    by_line = params.pop("by_line", True)
+    if lines is None and LINE_COLUMN in bati.columns:
+        lines = bati[LINE_COLUMN].to_numpy()
+    line_keys = line_groups(bati, lines) if by_line and lines is not None else None
+    if method == "iqr":
+        return iqr_outliers(bati["kedalaman"], k=params.get("k", 1.5), groups=line_keys)
+    if method == "rolling":
+        by_file = params.pop("by_file", True)
+        groups = bati["file"].to_numpy() if by_file and "file" in bati.columns else None
+        if line_keys is not None:
+            groups = line_keys
+        return rolling_mad_outliers(
+            bati["kedalaman"].to_numpy(), groups=groups, timestamps=bati["timestamp"].to_numpy(), **params
+        )
+    raise ValueError(f"Metode outlier tidak dikenal: {method!r}")
@@ -0,0 +1,140 @@
+"""
+Cache hasil parse file batimetri mentah di disk.
+
+Kunci entri adalah hash isi file + format tanggal (+ versi parser), sehingga file yang sama tidak
+perlu melewati ``read_csv``, pembersihan string dan parsing tanggal lagi saat kampanye dibuka
+ulang. Setiap entri berupa folder berisi satu file ``.npy`` per kolom numerik (dibaca dengan
+``mmap_mode="r"``, tanpa menyalin ke memori) dan ``info.json`` (jumlah baris mentah, koordinat
+yang ditolak). Ukuran total di disk dibatasi ``max_bytes`` dengan eviksi LRU (waktu pakai
+terakhir = mtime folder entri).
+
+Entri ditulis ke folder sementara lalu di-rename, sehingga cache aman dipakai beberapa proses
+sekaligus (process pool CLI, sesi Streamlit) dan entri yang belum lengkap tidak pernah terbaca.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash, file_hash
+
+# Naikkan jika hasil parsing berubah (kolom, dtype, aturan cleaning) agar entri lama tidak dipakai
+PARSE_VERSION = 1
+INFO_FILE = "info.json"
+
+
+class ParseCache:
+    """ Cache parse di direktori ``path`` (dibuat jika belum ada), maksimal ``max_bytes`` di disk """
+
+    def __init__(self, path, max_bytes=4 * 1024 ** 3):
+        self.path = os.path.abspath(path)
+        self.max_bytes = max_bytes
+        self._stats = {"hit": 0, "miss": 0}
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, f, date_format):
+        """ Kunci entri untuk file ``f`` (path, bytes atau file-like) dengan format tanggal ``date_format`` """
+        return content_hash(file_hash(f), date_format, PARSE_VERSION)
+
+    def _entry(self, key):
+        return os.path.join(self.path, key)
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def get(self, key):
+        """ ``(tabel, info)`` dari cache dengan kolom berupa memmap read-only, atau None jika belum ada """
+        entry = self._entry(key)
+        try:
+            with open(os.path.join(entry, INFO_FILE), encoding="utf-8") as f:
+                meta = json.load(f)
+            data = {col: np.load(os.path.join(entry, f"{col}.npy"), mmap_mode="r") for col in meta["kolom"]}
+            os.utime(entry)  # tandai baru dipakai (LRU)
+        except (OSError, ValueError, KeyError):
+            self._count("miss")
+            return None
+        self._count("hit")
+        return pd.DataFrame(data, copy=False), meta["info"]
+
+    def put(self, key, frame, info):
+        """
+        Simpan kolom ``frame`` (numerik/datetime) dan ``info`` (dict yang dapat ditulis sebagai JSON).
+        Kegagalan menulis diabaikan: cache hanya mempercepat, tidak wajib ada.
+        """
+        columns = {col: np.ascontiguousarray(frame[col].to_numpy()) for col in frame.columns}
+        if sum(v.nbytes for v in columns.values()) > self.max_bytes or os.path.isdir(self._entry(key)):
+            return
+        tmp = os.path.join(self.path, f".tmp-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(tmp)
+            for col, values in columns.items():
+                np.save(os.path.join(tmp, f"{col}.npy"), values)
+            with open(os.path.join(tmp, INFO_FILE), "w", encoding="utf-8") as f:
+                json.dump({"kolom": list(columns), "baris": len(frame), "info": info}, f)
+            os.rename(tmp, self._entry(key))
+        except OSError:
+            # Disk penuh/tidak dapat ditulis, atau entri yang sama sudah ditulis proses lain
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self._evict(keep=key)
+
+    def _entries(self):
+        """ Daftar ``(waktu_pakai, ukuran_byte, kunci)`` semua entri lengkap """
+        entries = []
+        for name in os.listdir(self.path):
+            entry = self._entry(name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            try:
+                size = sum(e.stat().st_size for e in os.scandir(entry) if e.is_file())
+                entries.append((os.stat(entry).st_mtime, size, name))
+            except OSError:
+                continue  # dihapus proses lain saat dipindai
+        return entries
+
+    def _evict(self, keep=None):
+        """ Hapus entri yang paling lama tidak dipakai sampai total ukuran <= ``max_bytes`` """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(self._entry(name), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """ Hapus semua entri (dan sisa folder sementara) """
+        for name in os.listdir(self.path):
+            shutil.rmtree(self._entry(name), ignore_errors=True)
+        with self._lock:
+            self._stats = {"hit": 0, "miss": 0}
+
+    def __len__(self):
+        return len(self._entries())
+
+    @property
+    def nbytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    @property
+    def stats(self):
+        """ Jumlah hit/miss sejak objek dibuat """
+        with self._lock:
+            return dict(self._stats)
+
+    def summary(self):
+        """ Tabel entri cache (kunci, ukuran MB, waktu pakai terakhir), terbaru di atas """
+        rows = [{"kunci": name, "MB": size / 1024 / 1024,
+                 "dipakai": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mtime))}
+                for mtime, size, name in sorted(self._entries(), reverse=True)]
+        return pd.DataFrame(rows, columns=["kunci", "MB", "dipakai"])
@@ -0,0 +1,333 @@
+"""
+Tahapan pengolahan data batimetri SBES tanpa ketergantungan pada Streamlit.
+
+Urutan tahapan sama dengan yang dijalankan di ``app.py``:
+ingest -> cleaning -> [segmentasi lajur] -> outlier (IQR/median bergulir) -> koreksi pasut -> transformasi UTM ->
+[thinning sounding] -> export XYZ / grid DEM.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field, fields, is_dataclass
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash
+from .crossline import crossline_qc
+from .export import export_files, plan_export, write_export
+from .grid import export_grids, grid_survey
+from .ingest import load_bati, load_pasut, stream_bati
+from .lines import LINE_COLUMN, line_stats, survey_lines
+from .outliers import detect_outliers, iqr_bounds  # noqa: F401 (iqr_bounds: API lama)
+from .parsecache import ParseCache
+from .projection import CHUNK_SIZE, dominant_epsg, project_utm, utm_epsg, zone_categorical
+from .store import BASE_COLUMNS, EPSG_COLUMN, ProjectStore
+from .tide import analyze_pasut
+from .tidecorr import FLAG_OK, TideStation, load_tide_zones, station_tide
+from .timeparse import (  # noqa: F401 (tabel format: API lama, dipakai app.py)
+    FORMAT_OPTIONS_BATI,
+    FORMAT_OPTIONS_PASUT_DATE,
+    FORMAT_OPTIONS_PASUT_TIME,
+)
+
+# Kolom kedalaman terkoreksi untuk setiap datum
+DATUM_COLUMNS = ["D_LWS", "D_MSL", "D_HWS"]
+TIDE_COLUMNS = ["pasut_interp", "pasut_flag", *DATUM_COLUMNS]
+
+
+# --- Koreksi Pasut ---
+
+def koreksi_pasut(bati_clean, data_pasut, hws, msl, lws, stations=None, max_gap_s=None, progress=None,
+                  chunk_size=CHUNK_SIZE, **blend):
+    """
+    Interpolasi pasut ke waktu pengukuran lalu hitung kedalaman terkoreksi untuk setiap datum.
+
+    Hasilnya salinan dangkal ``bati_clean`` (kolom asal tidak disalin) ditambah kolom
+    ``pasut_interp`` dan ``D_*`` bertipe float32 serta ``pasut_flag`` (lihat ``sbes.tidecorr``);
+    ping di jeda atau di luar rekaman pasut bernilai NaN. ``stations`` (daftar ``TideStation``)
+    menggantikan ``data_pasut`` dan datum untuk koreksi multi-stasiun; ``blend`` (``method``,
+    ``power``, ``zones``, ``datum_method``) diteruskan ke ``station_tide``.
+    Dihitung per ``chunk_size`` ping; ``progress(selesai, total)`` dipanggil setiap chunk selesai
+    (pengecualian dari ``progress``, misal pembatalan job, menghentikan perhitungan).
+    """
+    if stations is None:
+        stations = [TideStation.from_frame("pasut", data_pasut, datums=(hws, msl, lws))]
+    bati_koreksi = bati_clean.copy(deep=False)
+    n = len(bati_koreksi)
+    ping = bati_koreksi["timestamp"].to_numpy(dtype="datetime64[ns]")
+    lon = bati_koreksi["longitude"].to_numpy() if len(stations) > 1 or blend.get("zones") else None
+    lat = bati_koreksi["latitude"].to_numpy() if lon is not None else None
+    kedalaman = bati_koreksi['kedalaman'].to_numpy(dtype=np.float32)
+    pasut_interp = np.empty(n, dtype=np.float32)
+    flags = np.empty(n, dtype=np.uint8)
+    depths = {col: np.empty(n, dtype=np.float32) for col in DATUM_COLUMNS}
+    for start in range(0, n, chunk_size):
+        part = slice(start, min(start + chunk_size, n))
+        tide, levels, flags[part] = station_tide(ping[part], stations, None if lon is None else lon[part],
+                                                 None if lat is None else lat[part], max_gap_s=max_gap_s, **blend)
+        pasut_interp[part] = tide
+        pasut_interp[part][flags[part] != FLAG_OK] = np.nan
+        hws, msl, lws = levels
+        for col, datum in zip(DATUM_COLUMNS, (lws, msl, hws)):
+            datum = np.asarray(datum, dtype=np.float32)
+            depths[col][part] = -(kedalaman[part] + (datum - pasut_interp[part]))
+        if progress is not None:
+            progress(part.stop, n)
+    bati_koreksi["pasut_interp"] = pasut_interp
+    bati_koreksi["pasut_flag"] = flags
+    for col in DATUM_COLUMNS:
+        bati_koreksi[col] = depths[col]
+    return bati_koreksi
+
+
+def _params_key(value):
+    """ Parameter dalam bentuk yang dapat di-hash ``content_hash`` (dataclass -> isi field) """
+    if is_dataclass(value):
+        return [_params_key(getattr(value, f.name)) for f in fields(value)]
+    if isinstance(value, (list, tuple)):
+        return [_params_key(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _params_key(v) for k, v in value.items()}
+    return value
+
+
+def koreksi_pasut_store(store, data_pasut, hws, msl, lws, stations=None, max_gap_s=None, progress=None, **blend):
+    """
+    ``koreksi_pasut`` inkremental pada ``ProjectStore``: hanya baris dari file yang belum
+    terkoreksi dengan parameter yang sama yang dihitung. Mengembalikan jumlah baris yang dihitung.
+    ``progress`` diteruskan ke ``koreksi_pasut`` (baris dihitung dari baris yang belum terkoreksi).
+    """
+    key = content_hash(data_pasut, hws, msl, lws, _params_key(stations), max_gap_s, _params_key(blend))
+
+    def compute(subset):
+        out = koreksi_pasut(subset, data_pasut, hws, msl, lws, stations=stations, max_gap_s=max_gap_s,
+                            progress=progress, **blend)
+        return {col: out[col].to_numpy() for col in TIDE_COLUMNS}
+
+    return store.complete("koreksi_pasut", key, compute)
+
+
+# --- Transformasi UTM ---
+
+def lonlat_to_utm_per_point(df, lon_col="longitude", lat_col="latitude", force_zone=None, workers=None,
+                            progress=None):
+    """
+    Konversi koordinat(lon/lat) ke UTM dengan deteksi zona otomatis untuk setiap titik.
+
+    ``force_zone`` memaksa semua titik ke satu zona: ``"dominant"`` (zona dengan titik
+    terbanyak), label zona (misal ``"49S"``) atau kode EPSG. ``Zona_UTM`` disimpan sebagai
+    kolom kategorikal. ``progress`` diteruskan ke ``project_utm``.
+    """
+    x_utm, y_utm, epsg_codes = project_utm(
+        df[lon_col].to_numpy(), df[lat_col].to_numpy(), force_zone=force_zone, workers=workers, progress=progress
+    )
+    df["Zona_UTM"] = zone_categorical(epsg_codes)
+    df["X_UTM"] = x_utm
+    df["Y_UTM"] = y_utm
+    return df
+
+
+def utm_store(store, force_zone=None, workers=None, progress=None):
+    """
+    Transformasi UTM inkremental pada ``ProjectStore`` (lihat ``lonlat_to_utm_per_point``).
+
+    Zona ``"dominant"`` ditentukan dari seluruh isi proyek; jika zona dominan berubah setelah
+    file baru ditambahkan, semua baris diproyeksikan ulang. ``progress`` diteruskan ke ``project_utm``.
+    """
+    if force_zone == "dominant" and len(store):
+        force_zone = dominant_epsg(utm_epsg(store.column("longitude"), store.column("latitude")))
+
+    def compute(subset):
+        x_utm, y_utm, epsg_codes = project_utm(
+            subset["longitude"].to_numpy(), subset["latitude"].to_numpy(), force_zone=force_zone, workers=workers,
+            progress=progress,
+        )
+        return {EPSG_COLUMN: epsg_codes, "X_UTM": x_utm, "Y_UTM": y_utm}
+
+    return store.complete("utm", content_hash(force_zone), compute)
+
+
+# --- Export ---
+
+def export_xyz(final_df):
+    """ Buat isi file XYZ per zona UTM dan per datum; kunci = nama file (lihat ``sbes.export``) """
+    return export_files(final_df, DATUM_COLUMNS, ("txt",))
+
+
+def export_grid(final_df, cell_size, method="bin", radius=None, power=2.0, formats=("asc",)):
+    """ Grid DEM per zona UTM dan per datum (lihat ``sbes.grid``); kunci = nama file """
+    grids = grid_survey(final_df, DATUM_COLUMNS, cell_size, method, radius, power)
+    return export_grids(grids, formats)
+
+
+def export_crossline(final_df, **params):
+    """ Laporan QC crossline (statistik dan pasangan perpotongan) sebagai file CSV """
+    pairs, stats, _ = crossline_qc(final_df, DATUM_COLUMNS, **params)
+    return {
+        "QC_crossline_statistik.csv": stats.to_csv(index=False, float_format='%.3f'),
+        "QC_crossline_pasangan.csv": pairs.to_csv(index=False, float_format='%.3f'),
+    }
+
+
+# --- Pipeline lengkap ---
+
+@dataclass
+class SurveyResult:
+    """ Hasil satu kali proses survei beserta ringkasannya """
+    cleaned: pd.DataFrame
+    data_pasut: pd.DataFrame
+    final: pd.DataFrame
+    num_outliers: int
+    outlier_action: str
+    output_files: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    datum_pasut: tuple = None  # (HWS, MSL, LWS) yang dipakai untuk koreksi
+    num_tide_flagged: int = 0  # ping di jeda/di luar rekaman pasut (dibuang)
+    num_duplicates: int = 0  # ping duplikat antar file (dibuang saat ingest)
+    num_lines: int = 0  # jumlah lajur survei (0 jika segmentasi lajur tidak dijalankan)
+
+    @property
+    def pings_per_second(self):
+        return len(self.cleaned) / self.elapsed if self.elapsed > 0 else float("nan")
+
+
+def process_survey(bati_files, pasut_file, date_format, date_format_pasut, time_format_pasut,
+                   hws, msl, lws, remove_outliers=True, export=True, workers=1,
+                   memory_budget_mb=None, force_zone=None, outlier_method="iqr", outlier_params=None,
+                   grid_params=None, crossline_params=None, export_formats=("txt",), output_dir=None,
+                   zip_name=None, tide_datum_method="admiralty", tide_params=None, project_dir=None,
+                   drop_duplicates=True, parse_cache_dir=None, parse_cache_mb=4096, line_params=None,
+                   export_by_line=False, thin_params=None):
+    """
+    Jalankan seluruh tahapan untuk satu survei.
+
+    ``remove_outliers`` menggantikan tombol "Ya/Tidak" pada aplikasi: jika True, outlier
+    hasil ``outlier_method`` dibuang; jika False, data dipertahankan apa adanya. ``workers`` adalah
+    jumlah proses untuk parsing file batimetri (1 = berurutan). Jika ``memory_budget_mb`` diisi,
+    file batimetri dibaca secara streaming per chunk dengan anggaran memori tersebut.
+    ``force_zone`` diteruskan ke ``lonlat_to_utm_per_point`` (mode satu zona UTM).
+    ``outlier_method`` (``"iqr"`` atau ``"rolling"``) dan ``outlier_params`` diteruskan ke
+    ``detect_outliers``. Jika ``grid_params`` diisi (argumen ``export_grid``, minimal
+    ``cell_size``), file grid DEM ikut ditambahkan ke ``output_files``; begitu juga laporan
+    QC crossline jika ``crossline_params`` (argumen ``crossline_qc``) diisi.
+    ``export_formats`` memilih format file per zona/datum (lihat ``sbes.export``). Jika
+    ``output_dir`` diisi, file ditulis langsung ke direktori itu per chunk (atau ke satu ZIP
+    ``zip_name``) dan ``output_files`` berisi path, bukan isi file.
+    Datum ``hws``/``msl``/``lws`` yang None diturunkan dari analisis harmonik rekaman pasut
+    (``sbes.tide``) dengan ``tide_datum_method``. ``tide_params`` mengaktifkan koreksi
+    multi-stasiun (``sbes.tidecorr``): ``pasut_lonlat`` (posisi stasiun ``pasut_file``),
+    ``stations`` (daftar ``(file, lon, lat)`` stasiun tambahan, datum dari analisis harmonik),
+    ``method``, ``power``, ``zones`` (GeoJSON) dan ``max_gap_s``. Ping di jeda atau di luar
+    rekaman pasut dibuang dan dihitung di ``num_tide_flagged``.
+    Jika ``project_dir`` diisi, data disimpan di proyek persisten (``sbes.store``): hanya file
+    yang belum ada di proyek yang di-parse, koreksi pasut dan UTM hanya dihitung untuk baris
+    baru, dan hasil (``cleaned``/``final``) mencakup seluruh isi proyek.
+    Ping duplikat antar file (``sbes.merge``) dibuang saat ingest jika ``drop_duplicates`` dan
+    dihitung di ``num_duplicates``. Jika ``parse_cache_dir`` diisi, hasil parse tiap file
+    batimetri disimpan di cache disk (``sbes.parsecache``, maksimal ``parse_cache_mb`` MB) dan
+    file yang sama tidak di-parse ulang pada run berikutnya.
+    Jika ``line_params`` diisi (argumen ``survey_lines``, ``{}`` = default), track disegmentasi
+    menjadi lajur survei (kolom ``lajur`` pada ``cleaned``/``final``): outlier dideteksi per lajur
+    dan ``Lajur_statistik.csv`` ikut diexport; ``export_by_line`` memecah file XYZ per lajur.
+    ``thin_params`` (``{"radius": m, "method": "shoal"/"median"}``, lihat ``sbes.thinning``)
+    membuat file XYZ hanya berisi satu sounding per sel; grid DEM dan laporan tetap memakai
+    semua sounding.
+    """
+    t0 = time.perf_counter()
+    store = None
+    parse_cache = ParseCache(parse_cache_dir, parse_cache_mb * 1024 * 1024) if parse_cache_dir else None
+    if project_dir is not None:
+        store = ProjectStore(project_dir)
+        report = store.add_files(bati_files, date_format, workers=workers, memory_budget_mb=memory_budget_mb,
+                                 drop_duplicates=drop_duplicates, parse_cache=parse_cache)
+        bati_drop = store.frame(list(BASE_COLUMNS))
+    else:
+        if memory_budget_mb:
+            bati_drop = stream_bati(bati_files, date_format, memory_budget_mb=memory_budget_mb,
+                                    drop_duplicates=drop_duplicates, parse_cache=parse_cache)
+        else:
+            bati_drop = load_bati(bati_files, date_format, workers=workers, drop_duplicates=drop_duplicates,
+                                  parse_cache=parse_cache)
+        report = bati_drop.attrs["ingest_report"]
+    num_duplicates = sum(r["duplikat"] for r in report)
+    line_id = None
+    if line_params is not None:
+        line_id = survey_lines(bati_drop, **line_params)
+        bati_drop = bati_drop.copy(deep=False)
+        bati_drop[LINE_COLUMN] = line_id
+    data_pasut = load_pasut(pasut_file, date_format_pasut, time_format_pasut)
+    if None in (hws, msl, lws):
+        derived = analyze_pasut(data_pasut).datums(tide_datum_method)
+        hws, msl, lws = (d if v is None else v for v, d in zip((hws, msl, lws), derived))
+
+    outlier_params = dict(outlier_params or {})
+    if line_id is not None:
+        outlier_params.setdefault("workers", workers)
+    inlier = ~detect_outliers(bati_drop, outlier_method, **outlier_params)
+    num_outliers = int((~inlier).sum())
+    if num_outliers == 0:
+        bati_clean, action = bati_drop, 'none'
+    elif remove_outliers:
+        bati_clean, action = bati_drop[inlier].reset_index(drop=True), 'remove'
+    else:
+        bati_clean, action = bati_drop, 'keep'
+
+    stations, blend = None, {}
+    if tide_params:
+        blend = dict(tide_params)
+        lon, lat = blend.pop("pasut_lonlat", (np.nan, np.nan))
+        name = os.path.splitext(os.path.basename(getattr(pasut_file, "name", str(pasut_file))))[0]
+        stations = [TideStation.from_frame(name, data_pasut, lon, lat, (hws, msl, lws))]
+        for path, lon, lat in blend.pop("stations", ()):
+            name = os.path.splitext(os.path.basename(path))[0]
+            stations.append(TideStation.from_frame(name, load_pasut(path, date_format_pasut, time_format_pasut), lon, lat))
+        if isinstance(blend.get("zones"), (str, os.PathLike)):
+            blend["zones"] = load_tide_zones(blend["zones"])
+        blend["datum_method"] = tide_datum_method
+    if store is not None:
+        koreksi_pasut_store(store, data_pasut, hws, msl, lws, stations=stations, **blend)
+        utm_store(store, force_zone=force_zone)
+        tide_ok = store.column("pasut_flag") == FLAG_OK
+        inlier = np.asarray(inlier)
+        keep = tide_ok & inlier if action == 'remove' else tide_ok
+        num_tide_flagged = int((~tide_ok & inlier).sum() if action == 'remove' else (~tide_ok).sum())
+        final = store.frame(rows=np.flatnonzero(keep))
+        if line_id is not None:
+            final[LINE_COLUMN] = line_id[keep]
+    else:
+        bati_koreksi = koreksi_pasut(bati_clean, data_pasut, hws, msl, lws, stations=stations, **blend)
+        tide_flagged = bati_koreksi["pasut_flag"].to_numpy() != FLAG_OK
+        num_tide_flagged = int(tide_flagged.sum())
+        if num_tide_flagged:
+            bati_koreksi = bati_koreksi[~tide_flagged].reset_index(drop=True)
+        final = lonlat_to_utm_per_point(bati_koreksi, force_zone=force_zone)
+    output_files = {}
+    if export:
+        extra_files = {}
+        if grid_params:
+            extra_files.update(export_grid(final, **grid_params))
+        if crossline_params is not None:
+            extra_files.update(export_crossline(final, **crossline_params))
+        if line_id is not None:
+            extra_files["Lajur_statistik.csv"] = line_stats(final).to_csv(index=False, float_format='%.3f')
+        by_line = final[LINE_COLUMN].to_numpy() if line_id is not None and export_by_line else None
+        if output_dir is None:
+            output_files = export_files(final, DATUM_COLUMNS, export_formats, lines=by_line, thin=thin_params)
+            output_files.update(extra_files)
+        else:
+            items = plan_export(final, DATUM_COLUMNS, export_formats, lines=by_line, thin=thin_params)
+            output_files = write_export(final, items, output_dir, extra_files, zip_name)
+    return SurveyResult(
+        cleaned=bati_drop,
+        data_pasut=data_pasut,
+        final=final,
+        num_outliers=num_outliers,
+        outlier_action=action,
+        output_files=output_files,
+        elapsed=time.perf_counter() - t0,
+        datum_pasut=(hws, msl, lws),
+        num_tide_flagged=num_tide_flagged,
+        num_duplicates=num_duplicates,
+        num_lines=int(line_id.max()) + 1 if line_id is not None and len(line_id) else 0,
+    )
@@ -0,0 +1,148 @@
+"""
+Mesin proyeksi UTM multi-zona.
+
+- Transformer pyproj dibuat sekali per EPSG dan di-cache untuk seluruh proses
+  (Transformer aman dipakai lintas thread sejak pyproj 3.1).
+- Zona disimpan sebagai kode integer (EPSG) dan kolom kategorikal, bukan string per titik.
+- Array besar ditransformasi per chunk secara paralel di thread pool.
+- Mode "satu zona" memproyeksikan semua titik ke satu zona agar lajur survei yang
+  melintasi batas zona tidak terpecah menjadi beberapa file output.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+# Ukuran chunk default untuk transformasi paralel
+CHUNK_SIZE = 1_000_000
+
+
+@lru_cache(maxsize=128)
+def _cached_transformer(epsg):
+    return Transformer.from_crs("EPSG:4326", f"EPSG:{epsg}", always_xy=True)
+
+
+def get_transformer(epsg):
+    """ Transformer WGS84 -> EPSG dari cache proses """
+    return _cached_transformer(int(epsg))
+
+
+def utm_epsg(lon, lat):
+    """ Kode EPSG UTM (WGS84) tiap titik sebagai int32: 326zz untuk utara, 327zz untuk selatan """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    zones = (np.floor((lon + 180) / 6).astype(np.int32) + 1).clip(1, 60)
+    return np.where(lat >= 0, 32600, 32700).astype(np.int32) + zones
+
+
+def epsg_to_zone_label(epsg):
+    """ Label zona dari kode EPSG, misal 32749 -> '49S' """
+    epsg = int(epsg)
+    return f"{epsg % 100}{'N' if epsg < 32700 else 'S'}"
+
+
+def zone_label_to_epsg(label):
+    """ Kode EPSG dari label zona, misal '49S' -> 32749 """
+    label = str(label).strip().upper().replace(" ", "")
+    zone, hemi = int(label[:-1]), label[-1]
+    if hemi not in "NS" or not 1 <= zone <= 60:
+        raise ValueError(f"Label zona UTM tidak valid: {label!r}")
+    return (32600 if hemi == "N" else 32700) + zone
+
+
+def dominant_epsg(epsg_codes):
+    """ Zona dengan jumlah titik terbanyak """
+    values, counts = np.unique(epsg_codes, return_counts=True)
+    return int(values[np.argmax(counts)])
+
+
+def _transform_chunked(transformer_epsg, x, y, workers, chunk_size, done=None):
+    """
+    Transformasi lon/lat -> x/y di tempat (in-place) per chunk di thread pool; ``done(baris)``
+    dipanggil di thread pemanggil setiap satu chunk selesai (urut chunk).
+    """
+    n = len(x)
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+
+    def work(bound):
+        start, stop = bound
+        get_transformer(transformer_epsg).transform(x[start:stop], y[start:stop], inplace=True)
+        return stop - start
+
+    if len(bounds) <= 1 or workers == 1:
+        for bound in bounds:
+            rows = work(bound)
+            if done is not None:
+                done(rows)
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+            futures = [pool.submit(work, bound) for bound in bounds]
+            try:
+                for future in futures:
+                    rows = future.result()
+                    if done is not None:
+                        done(rows)
+            except BaseException:
+                # Dihentikan (misal job dibatalkan): chunk yang belum mulai tidak dijalankan
+                for future in futures:
+                    future.cancel()
+                raise
+
+
+def project_utm(lon, lat, force_zone=None, workers=None, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Proyeksikan lon/lat ke UTM.
+
+    ``force_zone``: ``None`` = zona otomatis per titik; ``"dominant"`` = semua titik ke zona
+    dengan titik terbanyak; label (misal ``"49S"``) atau kode EPSG = semua titik ke zona tersebut.
+    Mengembalikan ``(x, y, epsg)`` dengan ``epsg`` array int32 kode zona tiap titik.
+    ``progress(selesai, total)`` dipanggil setiap satu chunk selesai; pengecualian dari ``progress``
+    (misal pembatalan job) menghentikan transformasi.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Salinan lon/lat menjadi array hasil; transformasi ditulis langsung ke array ini
+    x_utm = np.array(lon, dtype=np.float64)
+    y_utm = np.array(lat, dtype=np.float64)
+    epsg_codes = utm_epsg(x_utm, y_utm)
+    if force_zone is not None and len(epsg_codes):
+        if force_zone == "dominant":
+            target = dominant_epsg(epsg_codes)
+        elif isinstance(force_zone, str):
+            target = zone_label_to_epsg(force_zone)
+        else:
+            target = int(force_zone)
+        epsg_codes = np.full(len(x_utm), target, dtype=np.int32)
+
+    done = None
+    if progress is not None:
+        finished = 0
+
+        def done(rows):
+            nonlocal finished
+            finished += rows
+            progress(finished, len(x_utm))
+
+    unique_codes = np.unique(epsg_codes)
+    if len(unique_codes) == 1:
+        _transform_chunked(unique_codes[0], x_utm, y_utm, workers, chunk_size, done)
+    else:
+        # Zona lain di-gather ke array sementara, ditransformasi, lalu ditulis kembali
+        for code in unique_codes:
+            idx = np.flatnonzero(epsg_codes == code)
+            x_tmp, y_tmp = x_utm[idx], y_utm[idx]
+            _transform_chunked(code, x_tmp, y_tmp, workers, chunk_size, done)
+            x_utm[idx] = x_tmp
+            y_utm[idx] = y_tmp
+            del idx, x_tmp, y_tmp
+    return x_utm, y_utm, epsg_codes
+
+
+def zone_categorical(epsg_codes):
+    """ Kolom kategorikal label zona ('49S', '50S', ...) dari kode EPSG tanpa membuat string per titik """
+    unique_codes, codes = np.unique(epsg_codes, return_inverse=True)
+    categories = [epsg_to_zone_label(c) for c in unique_codes]
+    return pd.Categorical.from_codes(codes.astype(np.int16), categories=categories)
@@ -0,0 +1,411 @@
+"""
+Penyimpanan proyek persisten: sounding hasil cleaning, koreksi pasut dan UTM disimpan di disk
+sebagai kolom biner NumPy (satu file per kolom, dibaca lewat ``np.memmap``) beserta asal file.
+
+- File baru dikenali dari hash isinya; hanya file baru yang di-parse, lalu digabung ke kolom
+  yang sudah terurut waktu. Jika seluruhnya lebih baru dari isi proyek (hari survei berikutnya),
+  baris cukup ditambahkan di akhir file kolom. Ping yang sudah ada di proyek (timestamp dan
+  posisi sama, misal ekspor log yang bertumpang tindih) tidak ditambahkan lagi.
+- Kolom turunan (koreksi pasut, UTM) disimpan per tahap bersama kunci parameternya dan daftar
+  file yang sudah dihitung; hanya baris dari file yang belum dihitung yang diproses. Kunci yang
+  berbeda (misal datum diganti) membuat seluruh baris dihitung ulang.
+
+Isi ``proyek.json`` ditulis atomik (file sementara + rename) setelah kolom selesai ditulis,
+sehingga proyek tetap konsisten jika proses terhenti di tengah jalan. Setiap penulisan
+(``add_files``, ``complete``) memegang kunci proyek selama baca-ubah-tulis: kunci per path di
+dalam proses (sesi yang berbagi thread pool) dan ``fcntl.flock`` pada ``proyek.lock`` antar
+proses (tidak tersedia di Windows: hanya kunci dalam proses). Metadata dibaca ulang setelah
+kunci didapat, sehingga perubahan dari sesi lain tidak tertimpa.
+"""
+
+import datetime
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+
+from .cache import content_hash, file_hash
+from .ingest import _file_name, load_bati, stream_bati
+from .merge import match_existing
+from .projection import zone_categorical
+
+STORE_VERSION = 1
+META_FILE = "proyek.json"
+LOCK_FILE = "proyek.lock"
+
+# Kolom dasar hasil ingest (dtype sama dengan load_bati/stream_bati)
+BASE_COLUMNS = {
+    "timestamp": "int64",
+    "longitude": "float64",
+    "latitude": "float64",
+    "kedalaman": "float32",
+    "file": "int16",
+}
+# Kolom EPSG zona UTM disimpan sebagai int32 dan dibaca kembali sebagai "Zona_UTM" kategorikal
+EPSG_COLUMN = "epsg_utm"
+
+
+def _fill_value(dtype):
+    return np.nan if np.dtype(dtype).kind == "f" else 0
+
+
+class _ProjectLock:
+    """ Kunci tulis satu direktori proyek; reentrant dalam satu thread, ``flock`` hanya di tingkat terluar """
+
+    def __init__(self, path):
+        self.path = path
+        self.depth = 0
+        self._thread_lock = threading.RLock()
+        self._fh = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                fh = open(os.path.join(self.path, LOCK_FILE), "a+b")
+                if fcntl is not None:
+                    fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            self._fh = fh
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0:
+            # Menutup file melepas flock
+            self._fh.close()
+            self._fh = None
+        self._thread_lock.release()
+
+
+_project_locks = {}
+_project_locks_guard = threading.Lock()
+
+
+def _project_lock(path):
+    """ Satu ``_ProjectLock`` per path proyek untuk seluruh proses """
+    with _project_locks_guard:
+        lock = _project_locks.get(path)
+        if lock is None:
+            lock = _project_locks[path] = _ProjectLock(path)
+        return lock
+
+
+class ProjectStore:
+    """ Proyek survei di direktori ``path`` (dibuat jika belum ada) """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        os.makedirs(self.path, exist_ok=True)
+        self.meta = self._read_meta()
+
+    # --- Metadata ---
+
+    def _read_meta(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if not os.path.exists(meta_path):
+            return {"versi_format": STORE_VERSION, "baris": 0, "revisi": 0, "data": "data_0",
+                    "kolom": dict(BASE_COLUMNS), "files": [], "tahap": {}}
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("versi_format") != STORE_VERSION:
+            raise ValueError(f"Versi format proyek tidak didukung: {meta.get('versi_format')}")
+        return meta
+
+    @contextmanager
+    def _locked(self):
+        """ Pegang kunci proyek; metadata dibaca ulang saat kunci pertama kali didapat """
+        with _project_lock(self.path) as lock:
+            if lock.depth == 1:
+                self.meta = self._read_meta()
+            yield
+
+    def _write_meta(self):
+        self.meta["revisi"] += 1
+        tmp = os.path.join(self.path, META_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, META_FILE))
+
+    def __len__(self):
+        return self.meta["baris"]
+
+    @property
+    def key(self):
+        """ Kunci isi proyek (berubah setiap kali proyek ditulis), untuk cache tahap """
+        return content_hash(self.path, self.meta["revisi"], self.meta["baris"])
+
+    @property
+    def files(self):
+        """ Asal data: satu baris per file (nama, hash, jumlah baris, waktu ditambahkan, ...) """
+        return pd.DataFrame(self.meta["files"])
+
+    # --- Kolom ---
+
+    def _column_path(self, name, data_dir=None):
+        return os.path.join(self.path, data_dir or self.meta["data"], f"{name}.bin")
+
+    def column(self, name):
+        """ Kolom tersimpan sebagai array read-only (memmap; tidak dibaca ke memori sekaligus) """
+        dtype = np.dtype(self.meta["kolom"][name])
+        if len(self) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(len(self),))
+
+    def stage_complete(self, stage):
+        """ True jika kolom tahap turunan ``stage`` sudah dihitung untuk semua file """
+        info = self.meta["tahap"].get(stage)
+        return info is not None and not self._pending_ids(stage, info["kunci"])
+
+    def frame(self, columns=None, rows=None):
+        """
+        Data proyek sebagai DataFrame tanpa menyalin kolom (memmap), urut waktu.
+
+        Kolom tahap turunan hanya disertakan jika tahapnya sudah lengkap. ``rows`` (indeks
+        atau mask) memilih sebagian baris (disalin). ``attrs["files"]`` berisi nama file sesuai
+        kolom ``file``, seperti hasil ``load_bati``.
+        """
+        available = list(BASE_COLUMNS)
+        for stage, info in self.meta["tahap"].items():
+            if self.stage_complete(stage):
+                available += info["kolom"]
+        columns = available if columns is None else [c for c in columns if c in available]
+        data = {}
+        for name in columns:
+            values = self.column(name)
+            if rows is not None:
+                values = values[rows]
+            if name == "timestamp":
+                values = values.view("datetime64[ns]")
+            if name == EPSG_COLUMN:
+                data["Zona_UTM"] = zone_categorical(np.asarray(values))
+                continue
+            data[name] = values
+        df = pd.DataFrame(data, copy=False)
+        df.attrs["files"] = [rec["nama"] for rec in self.meta["files"]]
+        df.attrs["coord_rejected"] = {
+            rec["nama"]: {"longitude": rec["lon_ditolak"], "latitude": rec["lat_ditolak"]} for rec in self.meta["files"]
+        }
+        return df
+
+    # --- Tambah file ---
+
+    def add_files(self, files, date_format, workers=None, progress=None, memory_budget_mb=None,
+                  drop_duplicates=True, parse_cache=None):
+        """
+        Parse dan gabungkan file batimetri yang belum ada di proyek (dikenali dari hash isi).
+        Jika ``memory_budget_mb`` diisi, file baru dibaca streaming (``stream_bati``).
+        Ping duplikat (antar file baru maupun terhadap isi proyek) dibuang jika ``drop_duplicates``.
+        ``parse_cache`` diteruskan ke ``load_bati``/``stream_bati``.
+
+        Mengembalikan laporan per file (kolom sama dengan ``attrs["ingest_report"]`` hasil
+        ``load_bati`` ditambah ``status``: ``"baru"``, ``"sudah ada"`` atau ``"gagal"``).
+        """
+        with self._locked():
+            return self._add_files(files, date_format, workers, progress, memory_budget_mb, drop_duplicates,
+                                   parse_cache)
+
+    def _add_files(self, files, date_format, workers, progress, memory_budget_mb, drop_duplicates, parse_cache):
+        files = list(files)
+        known = {rec["hash"] for rec in self.meta["files"]}
+        new, report = [], []
+        for f in files:
+            h = file_hash(f)
+            if h in known:
+                report.append({"file": _file_name(f), "status": "sudah ada", "baris_mentah": 0, "baris_valid": 0,
+                               "lon_ditolak": 0, "lat_ditolak": 0, "duplikat": 0, "detik": 0.0, "error": None,
+                               "dari_cache": False})
+                continue
+            known.add(h)
+            new.append((f, h))
+        if not new:
+            return report
+
+        try:
+            new_files = [f for f, _ in new]
+            if memory_budget_mb:
+                bati = stream_bati(new_files, date_format, memory_budget_mb=memory_budget_mb, progress=progress,
+                                   drop_duplicates=drop_duplicates, parse_cache=parse_cache)
+            else:
+                bati = load_bati(new_files, date_format, workers=workers, progress=progress,
+                                 drop_duplicates=drop_duplicates, parse_cache=parse_cache)
+        except ValueError:
+            # Tidak ada file baru yang terbaca: laporkan semuanya gagal, proyek tidak berubah
+            for f, _ in new:
+                report.append({"file": _file_name(f), "status": "gagal", "baris_mentah": 0, "baris_valid": 0,
+                               "lon_ditolak": 0, "lat_ditolak": 0, "duplikat": 0, "detik": 0.0,
+                               "error": "file tidak dapat dibaca", "dari_cache": False})
+            return report
+
+        ingest_report = bati.attrs["ingest_report"]
+        if drop_duplicates and len(self):
+            local = bati["file"].to_numpy()
+            dup = match_existing(self.column("timestamp"), self.column("longitude"), self.column("latitude"),
+                                 bati["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+                                 bati["longitude"].to_numpy(), bati["latitude"].to_numpy())
+            if dup.any():
+                for rep, n in zip(ingest_report, np.bincount(local[dup], minlength=len(new))):
+                    rep["duplikat"] += int(n)
+                bati = bati[~dup].reset_index(drop=True)
+
+        # Indeks file lokal (urutan ``new``) -> id global proyek; file gagal tidak dicatat
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        global_id = np.full(len(new), -1, dtype=np.int32)
+        for i, ((f, h), rep) in enumerate(zip(new, ingest_report)):
+            report.append({**rep, "status": "gagal" if rep["error"] else "baru"})
+            if rep["error"]:
+                continue
+            global_id[i] = len(self.meta["files"])
+            self.meta["files"].append({
+                "id": int(global_id[i]), "nama": _file_name(f), "hash": h, "baris": 0,
+                "lon_ditolak": int(rep["lon_ditolak"]), "lat_ditolak": int(rep["lat_ditolak"]),
+                "format_tanggal": date_format, "ditambahkan": now,
+            })
+        # Baris dari file yang dilaporkan gagal tidak pernah masuk proyek
+        file_ids = global_id[bati["file"].to_numpy()]
+        if (file_ids < 0).any():
+            keep = file_ids >= 0
+            bati = bati[keep].reset_index(drop=True)
+            file_ids = file_ids[keep]
+        file_ids = file_ids.astype(np.int16)
+        counts = np.bincount(file_ids, minlength=len(self.meta["files"]))
+        for i in global_id[global_id >= 0]:
+            self.meta["files"][i]["baris"] = int(counts[i])
+
+        new_columns = {
+            "timestamp": bati["timestamp"].to_numpy(dtype="datetime64[ns]").view(np.int64),
+            "longitude": bati["longitude"].to_numpy(dtype=np.float64),
+            "latitude": bati["latitude"].to_numpy(dtype=np.float64),
+            "kedalaman": bati["kedalaman"].to_numpy(dtype=np.float32),
+            "file": file_ids,
+        }
+        del bati
+        self._merge(new_columns)
+        return report
+
+    def _merge(self, new_columns):
+        """ Gabungkan baris baru (terurut waktu) ke kolom proyek; kolom turunan diisi NaN/0 """
+        with self._locked():
+            self._merge_locked(new_columns)
+
+    def _merge_locked(self, new_columns):
+        n, m = len(self), len(new_columns["timestamp"])
+        new_ts = new_columns["timestamp"]
+        if m == 0:
+            self._write_meta()
+            return
+        for name, dtype in self.meta["kolom"].items():
+            if name not in new_columns:
+                new_columns[name] = np.full(m, _fill_value(dtype), dtype=dtype)
+
+        if n == 0 or new_ts[0] >= self.column("timestamp")[-1]:
+            # Lebih baru dari seluruh isi proyek: tambahkan di akhir file kolom. Sisa tulisan
+            # yang tidak tercatat di metadata (proses terhenti) dipotong lebih dulu.
+            os.makedirs(os.path.join(self.path, self.meta["data"]), exist_ok=True)
+            for name, dtype in self.meta["kolom"].items():
+                path = self._column_path(name)
+                with open(path, "r+b" if os.path.exists(path) else "wb") as fh:
+                    fh.truncate(n * np.dtype(dtype).itemsize)
+                    fh.seek(0, os.SEEK_END)
+                    fh.write(np.ascontiguousarray(new_columns[name], dtype=dtype).tobytes())
+        else:
+            # Tumpang tindih waktu: tulis generasi data baru, lalu alihkan metadata
+            pos = np.searchsorted(self.column("timestamp"), new_ts, side="right") + np.arange(m)
+            old_slot = np.ones(n + m, dtype=bool)
+            old_slot[pos] = False
+            data_dir = f"data_{self.meta['revisi'] + 1}"
+            os.makedirs(os.path.join(self.path, data_dir), exist_ok=True)
+            for name, dtype in self.meta["kolom"].items():
+                out = np.memmap(self._column_path(name, data_dir), dtype=dtype, mode="w+", shape=(n + m,))
+                out[old_slot] = self.column(name)
+                out[pos] = new_columns[name]
+                out.flush()
+                del out
+            old_dir = self.meta["data"]
+            self.meta["data"] = data_dir
+            self.meta["baris"] = n + m
+            self._write_meta()
+            shutil.rmtree(os.path.join(self.path, old_dir), ignore_errors=True)
+            return
+        self.meta["baris"] = n + m
+        self._write_meta()
+
+    # --- Tahap turunan ---
+
+    def _pending_ids(self, stage, key):
+        info = self.meta["tahap"].get(stage)
+        done = set(info["files"]) if info is not None and info["kunci"] == key else set()
+        return [rec["id"] for rec in self.meta["files"] if rec["id"] not in done and rec["baris"] > 0]
+
+    def complete(self, stage, key, compute):
+        """
+        Lengkapi kolom turunan tahap ``stage`` untuk parameter ``key``.
+
+        ``compute(frame)`` menerima kolom dasar baris yang belum dihitung dan mengembalikan dict
+        ``{kolom: array}``. Mengembalikan jumlah baris yang dihitung (0 = sudah lengkap).
+        """
+        with self._locked():
+            return self._complete(stage, key, compute)
+
+    def _complete(self, stage, key, compute):
+        pending = self._pending_ids(stage, key)
+        info = self.meta["tahap"].get(stage)
+        if not pending:
+            return 0
+        if info is None or info["kunci"] != key:
+            # Parameter berubah: tandai tahap kosong lebih dulu agar hasil lama tidak terpakai
+            # jika proses terhenti di tengah penulisan
+            info = {"kunci": key, "files": [], "kolom": info["kolom"] if info else []}
+            self.meta["tahap"][stage] = info
+            self._write_meta()
+
+        file_col = self.column("file")
+        if len(pending) == sum(rec["baris"] > 0 for rec in self.meta["files"]):
+            rows = slice(None)
+        else:
+            idx = np.flatnonzero(np.isin(file_col, pending))
+            contiguous = idx[-1] - idx[0] + 1 == len(idx)
+            rows = slice(int(idx[0]), int(idx[-1]) + 1) if contiguous else idx
+        subset = self.frame(list(BASE_COLUMNS), rows=rows)
+        values = compute(subset)
+        count = len(subset)
+        del subset
+
+        # Hitung ulang semua baris ditulis ke file baru (rename) agar DataFrame lama yang masih
+        # memetakan kolom (misal di cache tahap) tidak ikut berubah; sisanya ditulis di tempat
+        full = isinstance(rows, slice) and rows == slice(None)
+        for name, arr in values.items():
+            arr = np.asarray(arr)
+            dtype = np.dtype(self.meta["kolom"].get(name, arr.dtype))
+            path = self._column_path(name)
+            if full or name not in self.meta["kolom"] or not os.path.exists(path):
+                tmp = path + ".tmp"
+                col = np.memmap(tmp, dtype=dtype, mode="w+", shape=(len(self),))
+                if not full:
+                    col[:] = _fill_value(dtype)
+                col[rows] = arr
+                col.flush()
+                del col
+                os.replace(tmp, path)
+                self.meta["kolom"][name] = dtype.str
+                continue
+            col = np.memmap(path, dtype=dtype, mode="r+", shape=(len(self),))
+            col[rows] = arr
+            col.flush()
+            del col
+        info["kolom"] = list(values)
+        info["files"] = sorted(set(info["files"]) | set(pending))
+        self._write_meta()
+        return count
@@ -0,0 +1,186 @@
+"""
+Representasi kolom ringkas untuk data survei dan laporan memori sesi.
+
+Data survei disimpan sekali dalam dtype ringkas (timestamp int64 ns, kedalaman/datum float32,
+zona kategorikal). Tahap turunan tidak menyalin data: koreksi pasut dan UTM hanya menambah
+kolom pada salinan dangkal (kolom asal dibagi), dan hasil penanganan outlier disimpan
+sebagai mask baris. Baris terpilih baru diambil (``select_rows``) saat dibutuhkan.
+"""
+
+import ctypes
+import sys
+
+import numpy as np
+import pandas as pd
+
+from .cache import StageCache
+
+# dtype ringkas untuk kolom yang dikenal; kolom lain dibiarkan
+COMPACT_DTYPES = {
+    "timestamp": "datetime64[ns]",
+    "kedalaman": np.float32,
+    "pasut_interp": np.float32,
+    "D_LWS": np.float32,
+    "D_MSL": np.float32,
+    "D_HWS": np.float32,
+}
+
+
+def compact_frame(df):
+    """ Ubah kolom yang dikenal ke dtype ringkas; kolom yang sudah sesuai tidak disalin """
+    dtypes = {
+        col: dtype for col, dtype in COMPACT_DTYPES.items()
+        if col in df.columns and df[col].dtype != np.dtype(dtype)
+    }
+    if not dtypes:
+        return df
+    # Kolom yang tidak diubah disalin per kolom agar blok 2D lama (berisi kolom lama) tidak
+    # tetap tertahan di memori melalui view
+    columns = {
+        col: df[col].astype(dtypes[col]) if col in dtypes else df[col].copy()
+        for col in df.columns
+    }
+    compact = pd.DataFrame(columns, copy=False)
+    compact.attrs = df.attrs
+    return compact
+
+
+def select_rows(df, mask):
+    """ Baris dengan ``mask`` True; tanpa salinan jika ``mask`` None (semua baris) """
+    if mask is None:
+        return df
+    return df[mask].reset_index(drop=True)
+
+
+def head_rows(df, mask, n=5):
+    """ ``n`` baris pertama yang terpilih oleh ``mask`` tanpa mengambil seluruh baris """
+    if mask is None:
+        return df.head(n)
+    return df.iloc[np.flatnonzero(mask)[:n]]
+
+
+def count_rows(df, mask):
+    return len(df) if mask is None else int(np.count_nonzero(mask))
+
+
+# --- Laporan memori ---
+
+def _array_buffer(arr):
+    """ (alamat awal, ukuran) buffer array numpy; view dari array yang sama berbagi alamat dasar """
+    base = arr
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    return base.__array_interface__["data"][0], base.nbytes
+
+
+def _series_buffers(series):
+    values = series.array
+    if isinstance(values, pd.Categorical):
+        yield _array_buffer(values.codes)
+        yield ("kategori", id(values.categories)), int(values.categories.memory_usage(deep=True))
+    elif series.dtype.kind in "biufcmM":
+        yield _array_buffer(series.to_numpy())
+    else:
+        yield ("objek", id(values)), int(series.memory_usage(index=False, deep=True))
+
+
+def _buffers(obj, seen_ids):
+    """ Semua buffer memori yang dipegang ``obj`` sebagai pasangan (kunci, ukuran) """
+    if obj is None or id(obj) in seen_ids:
+        return
+    seen_ids.add(id(obj))
+    if isinstance(obj, pd.DataFrame):
+        for name in obj.columns:
+            yield from _series_buffers(obj[name])
+    elif isinstance(obj, pd.Series):
+        yield from _series_buffers(obj)
+    elif isinstance(obj, np.ndarray):
+        yield _array_buffer(obj)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from _buffers(value, seen_ids)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from _buffers(value, seen_ids)
+    elif isinstance(obj, StageCache):
+        for _, value in obj.items():
+            yield from _buffers(value, seen_ids)
+    elif isinstance(obj, (bytes, str)):
+        yield ("objek", id(obj)), len(obj)
+    else:
+        yield ("objek", id(obj)), sys.getsizeof(obj)
+
+
+def memory_report(items):
+    """
+    Pemakaian memori per entri (misal isi ``st.session_state``).
+
+    Kolom ``MB`` = ukuran entri jika berdiri sendiri; ``MB unik`` = tambahan memori setelah
+    buffer yang sudah dihitung pada entri sebelumnya (kolom bersama dihitung sekali).
+    """
+    counted = {}
+    rows = {}
+    for name, obj in items.items():
+        own = {}
+        for key, nbytes in _buffers(obj, set()):
+            own[key] = max(own.get(key, 0), nbytes)
+        unique = sum(max(v - counted.get(k, 0), 0) for k, v in own.items())
+        for k, v in own.items():
+            counted[k] = max(counted.get(k, 0), v)
+        rows[str(name)] = {"MB": sum(own.values()) / 1024 / 1024, "MB unik": unique / 1024 / 1024}
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["MB", "MB unik"])
+
+
+def total_nbytes(*objects):
+    """ Total byte unik yang dipegang semua objek (buffer bersama dihitung sekali) """
+    counted = {}
+    seen_ids = set()
+    for obj in objects:
+        for key, nbytes in _buffers(obj, seen_ids):
+            counted[key] = max(counted.get(key, 0), nbytes)
+    return sum(counted.values())
+
+
+def _proc_status_mb(field):
+    """ Nilai ``field`` (kB) dari ``/proc/self/status`` dalam MB; None jika tidak tersedia """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def process_rss_mb():
+    """ Resident memory proses saat ini (MB); None jika tidak tersedia (non-Linux) """
+    return _proc_status_mb("VmRSS:")
+
+
+def peak_rss_mb():
+    """ Puncak resident memory proses (VmHWM, MB) sejak start atau ``reset_peak_rss`` terakhir """
+    return _proc_status_mb("VmHWM:")
+
+
+def reset_peak_rss():
+    """ Reset puncak RSS ke RSS saat ini (Linux >= 4.0); False jika tidak didukung """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def release_free_memory():
+    """
+    Kembalikan memori heap yang sudah dibebaskan ke sistem operasi (glibc ``malloc_trim``).
+
+    Array sementara berukuran puluhan MB (interpolasi, gather per zona) sering tetap tercatat
+    sebagai resident memory setelah dibebaskan. Tidak melakukan apa-apa di luar Linux/glibc.
+    """
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
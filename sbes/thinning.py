@@ -0,0 +1,75 @@
+"""
+Thinning sounding untuk deliverable peta laut/CAD: satu sounding wakil per sel grid.
+
+Titik ``X_UTM/Y_UTM`` di-hash ke sel persegi berukuran ``radius`` meter (tepi sel kelipatan
+``radius``). Jika jumlah sel di kotak pembatas tidak melebihi jumlah titik, nomor sel dipakai
+langsung; selain itu dipadatkan dengan ``pd.factorize`` (tabel hash, O(n)), sehingga ukuran
+sel sekecil apa pun tidak membuat array sel raksasa seperti pada grid DEM. Wakil tiap sel:
+
+- ``"shoal"``: sounding terdangkal (nilai ``D_*`` terbesar; kedalaman bertanda negatif),
+  sesuai aturan seleksi sounding peta laut. O(n) dengan ``np.maximum.at``.
+- ``"median"``: sounding asli pada median kedalaman sel (median bawah jika jumlahnya genap);
+  butuh pengurutan per sel, O(n log n).
+
+Seri dipecahkan dengan baris paling awal. Hasil berupa indeks baris urut naik, jadi urutan
+waktu sounding tetap terjaga di file export.
+"""
+
+import numpy as np
+import pandas as pd
+
+THIN_METHODS = {
+    "Terdangkal (shoal-biased)": "shoal",
+    "Median sel": "median",
+}
+
+# Sampai jumlah sel ini (atau jumlah titik jika lebih besar) nomor sel dipakai langsung tanpa hash
+DENSE_MIN_CELLS = 1 << 20
+
+
+def cell_codes(x, y, radius):
+    """ Nomor sel (0..jumlah sel-1) tiap titik dan jumlah nomor sel """
+    if radius <= 0:
+        raise ValueError("Radius thinning harus lebih besar dari 0")
+    col = np.floor(np.asarray(x, dtype=np.float64) / radius).astype(np.int64)
+    row = np.floor(np.asarray(y, dtype=np.float64) / radius).astype(np.int64)
+    if len(col) == 0:
+        return col, 0
+    col -= col.min()
+    row -= row.min()
+    n_rows = int(row.max()) + 1
+    key = col * n_rows + row
+    n_keys = (int(col.max()) + 1) * n_rows
+    if n_keys <= max(len(key), DENSE_MIN_CELLS):
+        # Grid cukup kecil: nomor sel langsung dipakai (sel kosong diabaikan saat seleksi)
+        return key, n_keys
+    codes, uniques = pd.factorize(key, sort=False)
+    return codes, len(uniques)
+
+
+def thin_indices(x, y, z, radius, method="shoal", codes=None):
+    """
+    Indeks baris (urut naik) satu sounding wakil per sel ``radius`` meter; titik dengan ``z``
+    NaN diabaikan. ``codes`` (hasil ``cell_codes``) dapat dipakai ulang untuk beberapa datum.
+    """
+    z = np.asarray(z, dtype=np.float64)
+    codes, n_cells = cell_codes(x, y, radius) if codes is None else codes
+    rows = np.flatnonzero(~np.isnan(z))
+    if len(rows) == 0:
+        return rows
+    if method == "shoal":
+        best = np.full(n_cells, -np.inf)
+        np.maximum.at(best, codes[rows], z[rows])
+        rows = rows[z[rows] == best[codes[rows]]]
+        pick = np.full(n_cells, len(z), dtype=np.int64)
+        np.minimum.at(pick, codes[rows], rows)
+    elif method == "median":
+        order = rows[np.lexsort((rows, z[rows], codes[rows]))]
+        counts = np.bincount(codes[order], minlength=n_cells)
+        starts = np.cumsum(counts) - counts
+        pick = np.where(counts > 0, order[np.minimum(starts + (counts - 1) // 2, len(order) - 1)], len(z))
+    else:
+        raise ValueError(f"Metode thinning tidak dikenal: {method!r}")
+    keep = np.zeros(len(z) + 1, dtype=bool)
+    keep[pick] = True
+    return np.flatnonzero(keep[:-1])
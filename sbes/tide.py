@@ -0,0 +1,188 @@
+"""
+Analisis harmonik pasang surut: fit konstanta (M2, S2, K1, O1, N2, ...) ke rekaman pasut dengan
+kuadrat terkecil, lalu turunkan MSL dan datum HWS/LWS.
+
+Model: h(t) = Z0 + sum(a_k cos(w_k t) + b_k sin(w_k t)), t dalam jam dari tengah rekaman.
+Matriks normal A^T A dijumlahkan per potongan baris sehingga rekaman berbulan-bulan dengan
+sampling 1 menit tidak membentuk matriks desain penuh. Koreksi nodal (f, u) tidak diterapkan:
+untuk rekaman beberapa bulan faktornya praktis konstan dan terserap ke amplitudo hasil fit.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Frekuensi konstanta (siklus/jam), urut prioritas untuk kriteria Rayleigh
+CONSTITUENTS = {
+    "M2": 0.0805114007,
+    "S2": 0.0833333333,
+    "K1": 0.0417807462,
+    "O1": 0.0387306544,
+    "N2": 0.0789992487,
+    "K2": 0.0835614924,
+    "P1": 0.0415525871,
+    "Q1": 0.0372185026,
+    "M4": 0.1610228013,
+    "MS4": 0.1638447340,
+    "MN4": 0.1595106494,
+    "M6": 0.2415342020,
+    "2N2": 0.0774870968,
+    "MU2": 0.0776894680,
+    "NU2": 0.0792016209,
+    "L2": 0.0820235526,
+    "J1": 0.0432928880,
+    "MF": 0.0030500918,
+    "MM": 0.0015121518,
+    "SSA": 0.0002281591,
+    "SA": 0.0001140741,
+}
+
+# Inferensi konstanta yang tidak terpisahkan (rasio amplitudo setimbang): anak -> (induk, rasio)
+INFERENCE = {"P1": ("K1", 0.331), "K2": ("S2", 0.272)}
+
+TIDE_DATUM_METHODS = {
+    "Admiralty: MSL ± (M2+S2+K1+O1+P1+K2)": "admiralty",
+    "Pasang purnama: MSL ± (M2+S2)": "spring",
+    "Prediksi 1 tahun (maks/min)": "prediksi",
+}
+
+_DATUM_SUMS = {
+    "admiralty": ("M2", "S2", "K1", "O1", "P1", "K2"),
+    "spring": ("M2", "S2"),
+}
+
+CHUNK_ROWS = 65_536
+
+
+def select_constituents(duration_hours, rayleigh=1.0, names=None):
+    """
+    Konstanta yang dapat dipisahkan dalam rekaman sepanjang ``duration_hours``.
+
+    Kriteria Rayleigh: selisih frekuensi x panjang rekaman >= ``rayleigh`` terhadap semua konstanta
+    yang sudah terpilih (urut prioritas ``CONSTITUENTS``).
+    """
+    chosen = []
+    for name in names or CONSTITUENTS:
+        freq = CONSTITUENTS[name]
+        if freq * duration_hours < rayleigh:
+            continue
+        if all(abs(freq - CONSTITUENTS[c]) * duration_hours >= rayleigh for c in chosen):
+            chosen.append(name)
+    return chosen
+
+
+def _design(hours, omega):
+    """ Kolom [1, cos(w t)..., sin(w t)...] untuk satu potongan waktu """
+    phase = np.multiply.outer(hours, omega)
+    return np.hstack([np.ones((len(hours), 1)), np.cos(phase), np.sin(phase)])
+
+
+@dataclass
+class TideAnalysis:
+    """ Hasil analisis harmonik: MSL (Z0), tabel konstanta dan residual terhadap rekaman """
+    msl: float
+    constituents: pd.DataFrame
+    t0: np.datetime64
+    timestamps: np.ndarray = field(repr=False)
+    residual: np.ndarray = field(repr=False)
+
+    @property
+    def rms(self):
+        return float(np.sqrt(np.mean(self.residual ** 2))) if len(self.residual) else float("nan")
+
+    def amplitude(self, name):
+        """ Amplitudo konstanta (m); 0 jika tidak ada di hasil fit maupun inferensi """
+        row = self.constituents.loc[self.constituents["konstanta"] == name, "amplitudo"]
+        return float(row.iloc[0]) if len(row) else 0.0
+
+    def predict(self, timestamps):
+        """ Tinggi muka air prediksi (m) pada ``timestamps`` """
+        hours = _hours(timestamps, self.t0)
+        omega = 2 * np.pi * self.constituents["frekuensi"].to_numpy()
+        phase_lag = np.radians(self.constituents["fase"].to_numpy())
+        amp = self.constituents["amplitudo"].to_numpy()
+        out = np.full(len(hours), self.msl)
+        for start in range(0, len(hours), CHUNK_ROWS):
+            h = hours[start:start + CHUNK_ROWS]
+            out[start:start + CHUNK_ROWS] += (amp * np.cos(np.multiply.outer(h, omega) - phase_lag)).sum(axis=1)
+        return out
+
+    def datums(self, method="admiralty"):
+        """ ``(HWS, MSL, LWS)`` dalam meter menurut ``method`` (lihat ``TIDE_DATUM_METHODS``) """
+        if method == "prediksi":
+            year = self.t0 + np.arange(0, 366 * 24 * 6) * np.timedelta64(10, "m")
+            level = self.predict(year)
+            return float(level.max()), self.msl, float(level.min())
+        if method not in _DATUM_SUMS:
+            raise ValueError(f"Metode datum pasut tidak dikenal: {method}")
+        half_range = sum(self.amplitude(name) for name in _DATUM_SUMS[method])
+        return self.msl + half_range, self.msl, self.msl - half_range
+
+
+def _hours(timestamps, t0):
+    ts = np.asarray(timestamps, dtype="datetime64[ns]")
+    return (ts - np.datetime64(t0, "ns")).astype(np.float64) / 3.6e12
+
+
+def harmonic_analysis(timestamps, heights, names=None, rayleigh=1.0):
+    """
+    Fit konstanta pasut ke rekaman ``heights`` (m) pada ``timestamps``.
+
+    Sampling tidak harus seragam dan boleh berlubang. Konstanta dipilih dengan
+    ``select_constituents``; P1 dan K2 yang tidak terpisahkan diinferensi dari K1 dan S2.
+    """
+    ts = np.asarray(timestamps, dtype="datetime64[ns]")
+    z = np.asarray(heights, dtype=np.float64)
+    ok = ~np.isnat(ts) & np.isfinite(z)
+    ts, z = ts[ok], z[ok]
+    if len(ts) < 3:
+        raise ValueError("Data pasut terlalu sedikit untuk analisis harmonik.")
+    t0 = ts.min() + (ts.max() - ts.min()) // 2
+    hours = _hours(ts, t0)
+    chosen = select_constituents(hours.max() - hours.min(), rayleigh, names)
+    if not chosen:
+        raise ValueError("Rekaman pasut terlalu pendek untuk memisahkan konstanta harmonik (minimal ~13 jam).")
+    freq = np.array([CONSTITUENTS[c] for c in chosen])
+    omega = 2 * np.pi * freq
+
+    # Persamaan normal dijumlahkan per potongan
+    m = 1 + 2 * len(chosen)
+    ata, atz = np.zeros((m, m)), np.zeros(m)
+    for start in range(0, len(hours), CHUNK_ROWS):
+        a = _design(hours[start:start + CHUNK_ROWS], omega)
+        ata += a.T @ a
+        atz += a.T @ z[start:start + CHUNK_ROWS]
+    coef = np.linalg.lstsq(ata, atz, rcond=None)[0]
+
+    k = len(chosen)
+    cos_c, sin_c = coef[1:k + 1], coef[k + 1:]
+    table = pd.DataFrame({
+        "konstanta": chosen,
+        "frekuensi": freq,
+        "periode_jam": 1.0 / freq,
+        "amplitudo": np.hypot(cos_c, sin_c),
+        "fase": np.degrees(np.arctan2(sin_c, cos_c)) % 360.0,
+        "inferensi": False,
+    })
+    # Residual dari konstanta hasil fit saja; konstanta inferensi hanya ditambahkan sesudahnya
+    analysis = TideAnalysis(msl=float(coef[0]), constituents=table, t0=t0, timestamps=ts,
+                            residual=np.empty(0))
+    analysis.residual = z - analysis.predict(ts)
+
+    inferred = []
+    for child, (parent, ratio) in INFERENCE.items():
+        if child not in chosen and parent in chosen:
+            row = table.loc[table["konstanta"] == parent].iloc[0]
+            inferred.append({
+                "konstanta": child, "frekuensi": CONSTITUENTS[child], "periode_jam": 1.0 / CONSTITUENTS[child],
+                "amplitudo": row["amplitudo"] * ratio, "fase": row["fase"], "inferensi": True,
+            })
+    if inferred:
+        analysis.constituents = pd.concat([table, pd.DataFrame(inferred)], ignore_index=True)
+    return analysis
+
+
+def analyze_pasut(data_pasut, **kwargs):
+    """ ``harmonic_analysis`` untuk tabel hasil ``load_pasut`` (kolom ``Timestamp`` dan ``Depth``) """
+    return harmonic_analysis(data_pasut["Timestamp"].to_numpy(), data_pasut["Depth"].to_numpy(), **kwargs)
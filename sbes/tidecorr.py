@@ -0,0 +1,232 @@
+"""
+Koreksi pasut multi-stasiun.
+
+Setiap stasiun pasut diinterpolasi ke waktu ping (pencarian biner: O(n log m) untuk n ping dan
+m sampel pasut). Yang digabung antar stasiun adalah reduksi ``datum - muka air`` sehingga nol
+rambu tiap stasiun boleh berbeda. Penggabungan: bobot jarak (IDW), stasiun terdekat, atau zona
+pasut (poligon dengan stasiun acuan, beda waktu dan rasio tunggang air).
+
+Ping di jeda rekaman pasut atau di luar rentang rekaman tidak dikoreksi: ``pasut_flag`` diisi
+dan kedalaman terkoreksi bernilai NaN.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+from matplotlib.path import Path
+
+from .tide import harmonic_analysis
+
+FLAG_OK, FLAG_GAP, FLAG_OUTSIDE = 0, 1, 2
+TIDE_FLAGS = {FLAG_OK: "valid", FLAG_GAP: "jeda rekaman pasut", FLAG_OUTSIDE: "di luar rekaman pasut"}
+
+BLEND_METHODS = {
+    "Bobot jarak (IDW)": "idw",
+    "Stasiun terdekat": "nearest",
+    "Zona pasut (poligon)": "zona",
+}
+
+# Jeda otomatis: kelipatan interval sampling median
+GAP_FACTOR = 3.0
+
+
+def _to_ns(timestamps):
+    """ Ubah kolom datetime menjadi int64 nanodetik (resolusi pandas bisa berbeda antar kolom) """
+    return np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64)
+
+
+@dataclass
+class TideStation:
+    """ Rekaman satu stasiun pasut; ``datums`` (HWS, MSL, LWS) None = dari analisis harmonik """
+    name: str
+    timestamps: np.ndarray
+    heights: np.ndarray
+    lon: float = np.nan
+    lat: float = np.nan
+    datums: tuple = None
+
+    def __post_init__(self):
+        ts = _to_ns(self.timestamps)
+        z = np.asarray(self.heights, dtype=np.float64)
+        ok = (ts != np.iinfo(np.int64).min) & np.isfinite(z)
+        ts, z = ts[ok], z[ok]
+        if len(ts) and np.any(ts[1:] < ts[:-1]):
+            order = np.argsort(ts, kind="stable")
+            ts, z = ts[order], z[order]
+        if len(ts) == 0:
+            raise ValueError(f"Stasiun pasut {self.name} tidak memiliki data valid.")
+        self.timestamps, self.heights = ts, z
+
+    @classmethod
+    def from_frame(cls, name, data_pasut, lon=np.nan, lat=np.nan, datums=None):
+        """ Stasiun dari tabel hasil ``load_pasut`` """
+        return cls(name, data_pasut["Timestamp"].to_numpy(), data_pasut["Depth"].to_numpy(), lon, lat, datums)
+
+    def datum_levels(self, method="admiralty"):
+        """ (HWS, MSL, LWS) stasiun; diturunkan dari analisis harmonik jika tidak diisi """
+        if self.datums is None:
+            self.datums = harmonic_analysis(self.timestamps.view("datetime64[ns]"), self.heights).datums(method)
+        return self.datums
+
+    def max_gap_ns(self, max_gap_s=None):
+        if max_gap_s is not None:
+            return max_gap_s * 1e9
+        if len(self.timestamps) < 2:
+            return np.inf
+        return GAP_FACTOR * float(np.median(np.diff(self.timestamps)))
+
+
+@dataclass
+class TideZone:
+    """ Zona pasut: poligon (lon, lat), stasiun acuan, beda waktu (menit) dan rasio tunggang air """
+    station: str
+    polygon: np.ndarray
+    time_offset_min: float = 0.0
+    range_ratio: float = 1.0
+
+
+def interp_station(station, ping_ns, max_gap_s=None):
+    """
+    Muka air stasiun pada ``ping_ns`` (int64 ns) beserta flag per ping.
+
+    Nilai sama dengan ``np.interp``; flag ``FLAG_GAP`` jika dua sampel pengapit berjarak lebih
+    dari ``max_gap_s`` detik (None = ``GAP_FACTOR`` x interval median), ``FLAG_OUTSIDE`` jika
+    ping di luar rentang rekaman.
+    """
+    tide_ns = station.timestamps
+    values = np.interp(ping_ns, tide_ns, station.heights)
+    flags = np.zeros(len(ping_ns), dtype=np.uint8)
+    if len(tide_ns) > 1:
+        j = np.clip(np.searchsorted(tide_ns, ping_ns, side="right"), 1, len(tide_ns) - 1)
+        flags[(tide_ns[j] - tide_ns[j - 1]) > station.max_gap_ns(max_gap_s)] = FLAG_GAP
+    flags[(ping_ns < tide_ns[0]) | (ping_ns > tide_ns[-1])] = FLAG_OUTSIDE
+    return values, flags
+
+
+def _distance_km(lon, lat, station):
+    """ Jarak pendekatan equirectangular (km) dari ping ke stasiun """
+    dx = np.radians(lon - station.lon) * np.cos(np.radians((lat + station.lat) / 2))
+    dy = np.radians(lat - station.lat)
+    return 6371.0 * np.hypot(dx, dy)
+
+
+def _sources(stations, lon, lat, method, power, zones):
+    """
+    Daftar ``(stasiun, beda waktu ns, rasio, bobot)`` per sumber; bobot array per ping (atau None = 1).
+    """
+    if len(stations) == 1 and method != "zona":
+        return [(stations[0], 0, 1.0, None)]
+    missing = [s.name for s in stations if not (np.isfinite(s.lon) and np.isfinite(s.lat))]
+    if missing:
+        raise ValueError(f"Koordinat stasiun pasut belum diisi: {', '.join(missing)}")
+
+    if method == "idw":
+        return [(s, 0, 1.0, 1.0 / np.maximum(_distance_km(lon, lat, s), 1e-6) ** power) for s in stations]
+
+    # Stasiun terdekat (juga dipakai untuk ping di luar semua zona)
+    nearest = np.zeros(len(lon), dtype=np.int32)
+    best = np.full(len(lon), np.inf)
+    for k, s in enumerate(stations):
+        d = _distance_km(lon, lat, s)
+        closer = d < best
+        nearest[closer], best[closer] = k, d[closer]
+    if method == "nearest":
+        return [(s, 0, 1.0, (nearest == k).astype(np.float64)) for k, s in enumerate(stations)]
+    if method != "zona":
+        raise ValueError(f"Metode penggabungan stasiun tidak dikenal: {method}")
+
+    by_name = {s.name: s for s in stations}
+    unzoned = np.ones(len(lon), dtype=bool)
+    sources = []
+    points = np.column_stack([lon, lat])
+    for zone in zones or []:
+        if zone.station not in by_name:
+            raise ValueError(f"Zona pasut mengacu ke stasiun yang tidak ada: {zone.station}")
+        inside = Path(zone.polygon).contains_points(points) & unzoned
+        unzoned &= ~inside
+        sources.append((by_name[zone.station], int(zone.time_offset_min * 60e9), zone.range_ratio,
+                        inside.astype(np.float64)))
+    sources += [(s, 0, 1.0, ((nearest == k) & unzoned).astype(np.float64)) for k, s in enumerate(stations)]
+    return sources
+
+
+def station_tide(timestamps, stations, lon=None, lat=None, method="idw", power=2.0, zones=None,
+                 max_gap_s=None, datum_method="admiralty"):
+    """
+    Muka air dan datum gabungan per ping.
+
+    Mengembalikan ``(tide, levels, flags)``: ``tide`` muka air gabungan, ``levels`` (HWS, MSL, LWS)
+    gabungan (skalar jika hanya satu stasiun, array per ping jika tidak) dan ``flags`` uint8.
+    Stasiun yang ter-flag pada suatu ping dikeluarkan dari bobot ping itu; ping baru ter-flag jika
+    semua stasiun berbobotnya ter-flag.
+    """
+    ping_ns = _to_ns(timestamps)
+    lon = None if lon is None else np.asarray(lon, dtype=np.float64)
+    lat = None if lat is None else np.asarray(lat, dtype=np.float64)
+    sources = _sources(stations, lon, lat, method, power, zones)
+
+    if len(sources) == 1:
+        station = sources[0][0]
+        tide, flags = interp_station(station, ping_ns, max_gap_s)
+        return tide, station.datum_levels(datum_method), flags
+
+    n = len(ping_ns)
+    tide_sum = np.zeros(n)
+    level_sums = [np.zeros(n) for _ in range(3)]
+    weight_sum = np.zeros(n)
+    worst_flag = np.zeros(n, dtype=np.uint8)
+    for station, offset_ns, ratio, weight in sources:
+        active = np.flatnonzero(weight > 0)
+        if len(active) == 0:
+            continue
+        if len(active) == n:
+            active = slice(None)  # IDW: semua ping, tanpa indeks acak
+        values, flags = interp_station(station, ping_ns[active] - offset_ns, max_gap_s)
+        datums = station.datum_levels(datum_method)
+        msl = datums[1]
+        w = weight[active] * (flags == FLAG_OK)
+        # Zona: muka air dan datum diskalakan terhadap MSL stasiun acuan
+        tide_sum[active] += w * (msl + ratio * (values - msl))
+        for level_sum, datum in zip(level_sums, datums):
+            level_sum[active] += w * (msl + ratio * (datum - msl))
+        weight_sum[active] += w
+        worst_flag[active] = np.maximum(worst_flag[active], flags)
+
+    valid = weight_sum > 0
+    flags = np.where(valid, FLAG_OK, np.maximum(worst_flag, FLAG_GAP)).astype(np.uint8)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tide = tide_sum / weight_sum
+        levels = tuple(level_sum / weight_sum for level_sum in level_sums)
+    return tide, levels, flags
+
+
+def load_tide_zones(source):
+    """
+    Zona pasut dari GeoJSON (path atau file): fitur Polygon/MultiPolygon dengan properti
+    ``stasiun``, opsional ``beda_waktu`` (menit) dan ``rasio``. Hanya ring luar yang dipakai.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding="utf-8") as f:
+            doc = json.load(f)
+    else:
+        doc = json.load(source)
+    zones = []
+    for feature in doc.get("features", []):
+        props = feature.get("properties") or {}
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") == "Polygon":
+            rings = [geometry["coordinates"][0]]
+        elif geometry.get("type") == "MultiPolygon":
+            rings = [poly[0] for poly in geometry["coordinates"]]
+        else:
+            continue
+        for ring in rings:
+            zones.append(TideZone(
+                station=str(props["stasiun"]),
+                polygon=np.asarray(ring, dtype=np.float64)[:, :2],
+                time_offset_min=float(props.get("beda_waktu", 0.0)),
+                range_ratio=float(props.get("rasio", 1.0)),
+            ))
+    return zones
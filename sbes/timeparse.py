@@ -0,0 +1,162 @@
+"""
+Parser timestamp tervektorisasi untuk kolom tanggal dan waktu terpisah (batimetri dan pasut).
+
+Menggantikan ``pd.to_datetime(kolom_tanggal + " " + kolom_waktu, format=...)`` per baris:
+
+- string tanggal unik (satu per hari survei) di-parse sekali, disimpan di cache antar
+  pemanggilan (chunk/file berikutnya tidak mem-parse ulang), lalu dipetakan kembali lewat
+  kode ``pd.factorize``;
+- waktu ``HH:MM:SS`` / ``HH:MM`` diubah ke nanodetik dengan aritmetika digit pada string
+  unik (format lain lewat pandas);
+- keduanya dijumlahkan tanpa membentuk string gabungan.
+
+Format dapat dideteksi otomatis (``"auto"``) dari sampel baris terhadap tabel pilihan format.
+"""
+
+import numpy as np
+import pandas as pd
+
+AUTO = "auto"
+
+# Pilihan format tanggal umum untuk data batimetri
+FORMAT_OPTIONS_BATI = {
+    "DD-Mon-YY (misal: 01-Jul-23)": "%d-%b-%y", # Format dari file contoh
+    "DD-MM-YY (misal: 01-07-23)": "%d-%m-%y",
+    "DD/MM/YY (misal: 01/07/23)": "%d/%m/%y",
+    "DD-MM-YYYY (misal: 01-07-2023)": "%d-%m-%Y",
+    "DD/MM/YYYY (misal: 01/07/2023)": "%d/%m/%Y",
+    "MM-DD-YY (misal: 07-01-23)": "%m-%d-%y",
+    "MM/DD/YY (misal: 07/01/23)": "%m/%d/%y",
+    "MM-DD-YYYY (misal: 07-01-2023)": "%m-%d-%Y",
+    "MM/DD/YYYY (misal: 07/01-2023)": "%m/%d/%Y",
+    # Tambahkan opsi lain jika diperlukan
+}
+
+# Pilihan format tanggal umum untuk pasut
+FORMAT_OPTIONS_PASUT_DATE = {
+    "DD/MM/YYYY (misal: 21/06/2023)": "%d/%m/%Y",
+    "YYYY-MM-DD (misal: 2023-06-21)": "%Y-%m-%d",
+    "DD-MM-YYYY (misal: 21-06-2023)": "%d-%m-%Y",
+    "DD-Mon-YYYY (misal: 21-Jun-2023)": "%d-%b-%Y",
+    # Tambahkan opsi lain jika diperlukan
+}
+
+# Pilihan format waktu umum untuk pasut
+FORMAT_OPTIONS_PASUT_TIME = {
+    "HH:MM:SS (misal: 13:30:00)": "%H:%M:%S",
+    "HH:MM (misal: 13:30)": "%H:%M",
+    # Tambahkan opsi lain jika diperlukan
+}
+
+_NAT = np.iinfo(np.int64).min
+_NS_PER_S = 1_000_000_000
+
+# Posisi digit (jam, menit, detik) pada format waktu lebar tetap
+_FIXED_TIME = {
+    "%H:%M:%S": ((0, 1), (3, 4), (6, 7)),
+    "%H:%M": ((0, 1), (3, 4), None),
+}
+
+# Cache tanggal hasil parsing: (format, teks) -> nanodetik
+_DATE_CACHE = {}
+_DATE_CACHE_MAX = 100_000
+
+
+def _factorize(values):
+    """ Kode per baris (-1 = kosong) dan array object string unik """
+    codes, uniques = pd.factorize(pd.Series(values, copy=False))
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _lookup(table, codes):
+    """ Ambil ``table[codes]``; kode -1 (kosong) menjadi NaT """
+    return np.append(table, _NAT)[codes]
+
+
+def parse_dates(uniques, date_format):
+    """ Nanodetik tengah malam untuk tiap string tanggal unik (NaT = int64 minimum); memakai cache """
+    found = {text: _DATE_CACHE.get((date_format, text)) for text in uniques}
+    missing = [text for text, ns in found.items() if ns is None]
+    if missing:
+        parsed = pd.to_datetime(pd.Series(missing, dtype=object), format=date_format, errors="coerce")
+        parsed = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        if len(_DATE_CACHE) + len(missing) > _DATE_CACHE_MAX:
+            _DATE_CACHE.clear()
+        for text, ns in zip(missing, parsed):
+            found[text] = _DATE_CACHE[(date_format, text)] = int(ns)
+    return np.fromiter((found[text] for text in uniques), dtype=np.int64, count=len(uniques))
+
+
+def parse_time_of_day(uniques, time_format):
+    """
+    Nanodetik sejak tengah malam untuk tiap string waktu unik (NaT = int64 minimum).
+
+    ``HH:MM:SS`` dan ``HH:MM`` lebar tetap dihitung dari kode digit; string lain (tanpa nol
+    di depan, pecahan detik, format lain) di-parse pandas dengan ``time_format``.
+    """
+    out = np.full(len(uniques), _NAT, dtype=np.int64)
+    fallback = np.ones(len(uniques), dtype=bool)
+    positions = _FIXED_TIME.get(time_format)
+    if positions is not None and len(uniques):
+        width = 8 if positions[2] else 5
+        text = np.asarray(uniques, dtype=str)
+        if text.dtype.itemsize // 4 >= width:
+            chars = text.view(np.uint32).reshape(len(text), -1)[:, :width].astype(np.int64)
+            digit = chars - ord("0")
+            fixed = (np.char.str_len(text) == width) & (chars[:, 2] == ord(":"))
+            if positions[2]:
+                fixed &= chars[:, 5] == ord(":")
+            parts = []
+            for pos in positions:
+                if pos is None:
+                    parts.append(np.zeros(len(text), dtype=np.int64))
+                    continue
+                hi, lo = digit[:, pos[0]], digit[:, pos[1]]
+                fixed &= (hi >= 0) & (hi <= 9) & (lo >= 0) & (lo <= 9)
+                parts.append(hi * 10 + lo)
+            hour, minute, second = parts
+            fixed &= (hour < 24) & (minute < 60) & (second < 60)
+            out[fixed] = ((hour * 60 + minute) * 60 + second)[fixed] * _NS_PER_S
+            fallback = ~fixed
+    if fallback.any():
+        parsed = pd.to_datetime(pd.Series(uniques[fallback], dtype=object), format=time_format, errors="coerce")
+        ns = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        midnight = parsed.dt.normalize().to_numpy(dtype="datetime64[ns]").view(np.int64)
+        out[fallback] = np.where(ns == _NAT, _NAT, ns - midnight)
+    return out
+
+
+def parse_timestamps(dates, times, date_format, time_format="%H:%M:%S"):
+    """
+    Timestamp ``datetime64[ns]`` dari kolom tanggal dan waktu terpisah.
+
+    Hasil sama dengan ``pd.to_datetime(dates + " " + times, format=f"{date_format} {time_format}",
+    errors="coerce")``; baris yang tidak dapat dibaca menjadi NaT.
+    """
+    date_codes, date_uniques = _factorize(dates)
+    time_codes, time_uniques = _factorize(times)
+    day = _lookup(parse_dates(date_uniques, date_format), date_codes)
+    tod = _lookup(parse_time_of_day(time_uniques, time_format), time_codes)
+    out = day + tod
+    out[(day == _NAT) | (tod == _NAT)] = _NAT
+    return out.view("datetime64[ns]")
+
+
+def detect_format(samples, options, min_ratio=0.9, max_unique=500):
+    """
+    Format (nilai tabel ``options``) yang paling banyak berhasil membaca ``samples``.
+
+    Hanya string unik (maksimal ``max_unique``) yang dicoba. Jika beberapa format sama baiknya
+    (misal tanggal <= 12 cocok untuk DD-MM dan MM-DD) dipilih yang lebih dulu di tabel. None jika
+    tidak ada format dengan rasio berhasil >= ``min_ratio``.
+    """
+    uniques = pd.Series(samples, copy=False).dropna().astype(str).str.strip().unique()[:max_unique]
+    if len(uniques) == 0:
+        return None
+    text = pd.Series(uniques, dtype=object)
+    best, best_ratio = None, 0.0
+    for fmt in options.values():
+        ratio = pd.to_datetime(text, format=fmt, errors="coerce").notna().mean()
+        if ratio > best_ratio:
+            best, best_ratio = fmt, ratio
+    return best if best_ratio >= min_ratio else None